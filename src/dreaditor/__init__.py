@@ -82,6 +82,8 @@ def setup_logging(default_level: str, file_level: str, log_to_file: Path | None,
     logging.config.dictConfig(
         {
             "version": 1,
+            # modules may be imported, and create their loggers, before logging is set up
+            "disable_existing_loggers": False,
             "formatters": {
                 "default": {
                     "format": "[%(asctime)s] [%(levelname)s] [%(name)s] %(funcName)s: %(message)s",
@@ -1,19 +1,106 @@
 from __future__ import annotations
 
+import argparse
+import multiprocessing
+import os
 import sys
 from pathlib import Path
 
-from PySide6.QtWidgets import QApplication
-
 from dreaditor import get_log_folder, setup_logging
-from dreaditor.main_window import DreaditorWindow
 
-log_dir = get_log_folder()
-setup_logging("WARNING", "INFO", Path.joinpath(log_dir, "log.txt"))
+# the render command's arguments are declared here, so starting the editor doesn't import the renderer
+RENDER_FORMATS = ["png", "svg"]
+DEFAULT_RENDER_WIDTH = 4096
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dreaditor", description="Metroid Dread data visualizer")
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record a trace of the editor session to the log folder, to be opened in ui.perfetto.dev or "
+        "chrome://tracing. Can also be enabled with the tracing config option.",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report how long the editor takes to show its window and index the RomFS, then close it.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    render = subparsers.add_parser("render", help="Render scenarios to PNG or SVG files without opening the editor")
+    add_render_arguments(render)
+    return parser
+
+
+def add_render_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        metavar="SCENARIO",
+        help="Scenarios to render, by name (ARTARIA) or id (s010_cave). Defaults to every scenario.",
+    )
+    parser.add_argument(
+        "--romfs",
+        action="append",
+        type=Path,
+        help="Extracted RomFS to render from. Can be given once per game version. Defaults to the configured RomFS.",
+    )
+    parser.add_argument("--output", type=Path, default=Path("renders"), help="Folder to write the renders to.")
+    parser.add_argument("--format", choices=RENDER_FORMATS, default="png")
+    parser.add_argument("--width", type=int, default=DEFAULT_RENDER_WIDTH, help="Width of the render in pixels.")
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="OPTION=VALUE",
+        help="Overrides a painting option for this run, e.g. paintLogicShapes=true. Any of the paint options of the "
+        "config, or levelOfDetail.",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of scenarios rendered in parallel.")
+
+
+def run_editor(trace: bool, profile_startup: bool):
+    profiler = None
+    if profile_startup:
+        from dreaditor.startup import StartupProfiler
+
+        profiler = StartupProfiler()
+
+    from PySide6.QtWidgets import QApplication
+
+    from dreaditor.main_window import DreaditorWindow
+    from dreaditor.tracing import save_trace, start_tracing_if_enabled
+
+    setup_logging("WARNING", "INFO", Path.joinpath(get_log_folder(), "log.txt"))
+    start_tracing_if_enabled(trace)
+    if profiler is not None:
+        profiler.mark("imports")
+
+    app = QApplication(sys.argv)
+
+    window = DreaditorWindow()
+    if profiler is not None:
+        profiler.mark("window created")
+        profiler.watch(window)
+    window.show()
+    app.exec()
+    save_trace()
+
+
+def main():
+    # the renderer's worker processes start from this module when frozen
+    multiprocessing.freeze_support()
+
+    args = create_parser().parse_args()
+    if args.command == "render":
+        from dreaditor.render import run_render
+
+        setup_logging("INFO", "INFO", Path.joinpath(get_log_folder(), "render_log.txt"))
+        sys.exit(run_render(args))
 
+    run_editor(args.trace, args.profile_startup)
 
-app = QApplication(sys.argv)
 
-window = DreaditorWindow()
-window.show()
-app.exec()
+if __name__ == "__main__":
+    main()
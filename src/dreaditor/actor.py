@@ -4,24 +4,32 @@ import logging
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from mercury_engine_data_structures.formats.bmsad import Bmsad
-from mercury_engine_data_structures.formats.bmscc import Bmscc
-from PySide6.QtCore import QRectF, Qt
+from PySide6.QtCore import QPointF, QRectF
 
+from dreaditor.scenario_data import to_container
 from dreaditor.utils import vector2f
 
 if TYPE_CHECKING:
-    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+    from construct import Container
 
     from dreaditor.actor_reference import ActorRef
+    from dreaditor.scenario_data import ActorData, ActorDefData
     from dreaditor.widgets.actor_data_tree import ActorDataTreeWidget
-    from dreaditor.widgets.entity_list_tree_item import EntityListTreeWidgetItem
+    from dreaditor.widgets.actor_tree_model import ActorTreeNode
     from dreaditor.widgets.scenario_actor_dot import ScenarioActorDot
     from dreaditor.widgets.scenario_viewer import ScenarioViewer
 
 
 DOT_SIZE = 25
 
+# actors with the same components share one set of their keys
+_shared_component_keys: dict[frozenset[str], frozenset[str]] = {}
+
+
+def _component_keys(components: dict[str, str]) -> frozenset[str]:
+    keys = frozenset(components.keys() | components.values())
+    return _shared_component_keys.setdefault(keys, keys)
+
 
 class ActorSelectionState(Enum):
     Toggle = 0
@@ -30,53 +38,106 @@ class ActorSelectionState(Enum):
 
 
 class Actor:
-    editor: FileTreeEditor
+    """
+    An actor of the loaded scenario, as shown in the scene and the actor lists.
+
+    Scenarios can have thousands of actors, so this only keeps what the UI needs and is slotted. The level data of the
+    actor is read from the BRFLD when the data tree asks for it, see RomManager.get_level_data.
+    """
+
+    __slots__ = (
+        "ref",
+        "data",
+        "actordef",
+        "position",
+        "component_keys",
+        "_components",
+        "_component_index",
+        "subarea_setups",
+        "tree_nodes",
+        "data_tree",
+        "scene_viewer",
+        "actor_dot",
+        "is_checked",
+        "is_filtered",
+        "is_hovered",
+        "is_selected",
+    )
+
+    # shared by all actors, rather than one per actor
+    logger = logging.getLogger("Actor")
+
     ref: ActorRef
-    level_data: dict
-    bmsad: Bmsad | None = None
-    bmscc: Bmscc | None = None
+    data: ActorData
+    actordef: ActorDefData
+    position: QPointF
+    # the names and types of the actor's components, see has_component
+    component_keys: frozenset[str]
+    # the painted components as Containers, converted the first time a painter asks for them
+    _components: dict[str, Container] | None
+    # the painted components by name and by type, see getComponent
+    _component_index: dict[str, Container] | None
     subarea_setups: dict[str, list[str]]
 
-    entity_list_items: list[EntityListTreeWidgetItem]
-    data_tree: ActorDataTreeWidget
+    # one node per row showing this actor in the entity and subarea trees
+    tree_nodes: list[ActorTreeNode]
+    # None when rendering without a window
+    data_tree: ActorDataTreeWidget | None
+    scene_viewer: ScenarioViewer | None
     actor_dot: ScenarioActorDot | None
-    actor_rect: QRectF
 
-    is_checked: bool = True
-    is_hovered: bool = False
-    is_selected: bool = False
+    is_checked: bool
+    # hidden by the filter of the actor and subarea trees, see RomManager.set_actor_filter
+    is_filtered: bool
+    is_hovered: bool
+    is_selected: bool
 
     def __init__(
         self,
         ref: ActorRef,
-        level_data: dict,
-        editor: FileTreeEditor,
-        data_tree: ActorDataTreeWidget,
+        data: ActorData,
+        actordef: ActorDefData,
+        data_tree: ActorDataTreeWidget | None,
         scene: ScenarioViewer,
     ):
-        self.logger = logging.getLogger(type(self).__name__)
-        self.editor = editor
-        self.level_data = level_data
         self.ref = ref
+        self.data = data
+        self.actordef = actordef
         self.data_tree = data_tree
         self.scene_viewer = scene
         self.subarea_setups = {}
 
-        bmsadLink = level_data.oActorDefLink[9:]
-
-        self.entity_list_items = []
+        self.tree_nodes = []
         self.actor_dot = None
         # Qt's y axis points down, so invert it
-        vpos = vector2f(level_data.vPos)
-        self.actor_rect = QRectF(vpos.x() - DOT_SIZE, vpos.y() - DOT_SIZE, 2 * DOT_SIZE, 2 * DOT_SIZE)
-
-        self.bmsad = editor.get_parsed_asset(bmsadLink, type_hint=Bmsad)
-        if "COLLISION" in self.bmsad.components:
-            coll: str = self.bmsad.components["COLLISION"].dependencies.file
-            if coll != "Unassigned":
-                self.bmscc = editor.get_parsed_asset(coll.replace("\\", "/"), type_hint=Bmscc)
-            else:
-                self.logger.info("actor %s/%s/%s has unassigned collision file!", ref.layer, ref.sublayer, ref.name)
+        self.position = vector2f(data.position)
+        self.component_keys = _component_keys(data.components)
+        self._components = None
+        self._component_index = None
+
+        self.is_checked = True
+        self.is_filtered = False
+        self.is_hovered = False
+        self.is_selected = False
+
+    @property
+    def actor_rect(self) -> QRectF:
+        return QRectF(self.position.x() - DOT_SIZE, self.position.y() - DOT_SIZE, 2 * DOT_SIZE, 2 * DOT_SIZE)
+
+    @property
+    def components(self) -> dict[str, Container]:
+        if self._components is None:
+            self._convert_components()
+        return self._components
+
+    def _convert_components(self):
+        self._components = {name: to_container(comp) for name, comp in self.data.component_data.items()}
+        # each key maps to the first component with that name or type, the one a scan of the components would find
+        index = {}
+        for name, comp in self._components.items():
+            index.setdefault(name, comp)
+            index.setdefault(comp["@type"], comp)
+        self._component_index = index
 
     def add_cc(self, setup_id: str, cc_name: str):
         if not self.subarea_setups.get(setup_id):
@@ -84,27 +145,44 @@ class Actor:
 
         self.subarea_setups[setup_id].append(cc_name)
 
+    def has_component(self, name_or_type: str) -> bool:
+        return name_or_type in self.component_keys
+
     def getComponent(self, name_or_type: str) -> dict | None:
-        for compName, comp in self.level_data.pComponents.items():
-            if compName == name_or_type:
-                return comp
-            if comp["@type"] == name_or_type:
-                return comp
-        return None
+        # only the components drawn by painters keep their data, see PAINTED_COMPONENTS
+        if self._component_index is None:
+            self._convert_components()
+        return self._component_index.get(name_or_type)
+
+    @property
+    def is_shown(self) -> bool:
+        return self.is_checked and not self.is_filtered
+
+    def _update_scene(self):
+        if self.actor_dot is not None:
+            self.actor_dot.update()
+        elif self.scene_viewer is not None:
+            # not built yet, but it may still be drawn in a cluster
+            self.scene_viewer.cluster_item.invalidate_actor(self)
 
     def OnHovered(self, val: bool):
-        for eli in self.entity_list_items:
-            eli.set_hovered(val)
-
         self.is_hovered = val
+        for node in self.tree_nodes:
+            node.model.on_actor_changed(node)
+
+    def build(self):
+        """Builds the actor's dot and painters, if the scene put that off, see ScenarioViewer.add_actor."""
+        if self.actor_dot is None and self.scene_viewer is not None:
+            self.scene_viewer.build_actor(self)
 
     def OnSelected(self, state: ActorSelectionState = ActorSelectionState.Toggle):
+        self.build()
         if state == ActorSelectionState.Selected or (state == ActorSelectionState.Toggle and not self.is_selected):
             # select
             self.is_selected = True
-            for eli in self.entity_list_items:
-                eli.setCheckState(0, Qt.CheckState.Checked)
-                eli.set_selected(True)
+            self.UpdateCheckState(True)
+            for node in self.tree_nodes:
+                node.model.on_actor_changed(node)
 
             # update scene to show change in selection
             self.actor_dot.scene().views()[0].centerOn(self.actor_dot)
@@ -114,8 +192,8 @@ class Actor:
         else:
             # unselect
             self.is_selected = False
-            for eli in self.entity_list_items:
-                eli.set_selected(False)
+            for node in self.tree_nodes:
+                node.model.on_actor_changed(node)
 
             self.data_tree.UnloadActor(self)
 
@@ -126,7 +204,17 @@ class Actor:
         if self.is_selected and not state:
             self.OnSelected(ActorSelectionState.Unselected)
 
+        if self.is_checked == state:
+            return
+
         self.is_checked = state
-        self.actor_dot.update()
-        for eli in self.entity_list_items:
-            eli.setCheckState(0, Qt.CheckState.Checked if state else Qt.CheckState.Unchecked)
+        self._update_scene()
+        for node in self.tree_nodes:
+            node.model.on_actor_check_changed(node, state)
+
+    def UpdateFilterState(self, filtered: bool):
+        if self.is_filtered == filtered:
+            return
+
+        self.is_filtered = filtered
+        self._update_scene()
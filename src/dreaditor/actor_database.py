@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import multiprocessing
+import operator
+import os
+import re
+import shlex
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any
+
+import dreaditor
+from dreaditor.actor_reference import ActorRef
+from dreaditor.constants import Scenario
+from dreaditor.rom_manager import open_romfs, shared_romfs
+from dreaditor.scenario_cache import SharedScenarioCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+
+    from dreaditor.scenario_data import ScenarioData
+
+DATABASE_FOLDER_NAME = "ActorDatabase"
+# bump whenever the layout of ActorRecord or of the sources changes, so stale databases are rebuilt
+DATABASE_FORMAT_VERSION = 2
+
+# query keys that select from an index, see ActorDatabase.query
+INDEXED_KEYS = ["scenario", "layer", "sublayer", "actordef", "component", "subarea"]
+COMPARISONS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+FIELD_TERM = re.compile(r"^([\w.@]+)(!=|<=|>=|=|<|>)(.*)$")
+
+
+class QueryError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(slots=True)
+class ActorRecord:
+    """What the actor database knows about an actor, without loading its scenario."""
+
+    scenario: str
+    layer: str
+    sublayer: str
+    name: str
+    actordef: str
+    position: list[float]
+    # component name -> @type
+    components: dict[str, str]
+    # component name -> data, only for the components the scenario data keeps, see PAINTED_COMPONENTS
+    component_data: dict[str, dict]
+    # "setup/subarea" of every subarea the actor is in
+    subareas: list[str]
+
+    @property
+    def ref(self) -> ActorRef:
+        return ActorRef(Scenario(self.scenario), self.layer, self.sublayer, self.name)
+
+    def field_values(self, path: str) -> Iterator[Any]:
+        """
+        Every value at a dotted path in the component data, e.g. CBreakableTileGroupComponent.aGridTiles.eTileType.
+
+        The path may start with a component name or type. Otherwise, it is looked up in every component. Lists along
+        the path are searched element by element.
+        """
+        first, _, rest = path.partition(".")
+        selected = [
+            data
+            for comp_name, data in self.component_data.items()
+            if first in (comp_name, self.components.get(comp_name))
+        ]
+        if selected:
+            for data in selected:
+                yield from _values_at(data, rest.split(".") if rest else [])
+        else:
+            for data in self.component_data.values():
+                yield from _values_at(data, path.split("."))
+
+    @classmethod
+    def from_scenario(cls, data: ScenarioData) -> list[ActorRecord]:
+        subareas: dict[tuple[str, str, str], list[str]] = {}
+        for group in data.subareas:
+            for layer, sublayer, name in group.actors:
+                subareas.setdefault((layer, sublayer, name), []).append(f"{group.setup_id}/{group.subarea_id}")
+
+        return [
+            cls(
+                data.scenario,
+                actor.layer,
+                actor.sublayer,
+                actor.name,
+                actor.actordef,
+                actor.position,
+                actor.components,
+                actor.component_data,
+                subareas.get((actor.layer, actor.sublayer, actor.name), []),
+            )
+            for actor in data.actors
+        ]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ActorRecord:
+        return cls(**data)
+
+
+def _values_at(value: Any, keys: list[str]) -> Iterator[Any]:
+    if isinstance(value, list):
+        for v in value:
+            yield from _values_at(v, keys)
+    elif not keys:
+        yield value
+    elif isinstance(value, dict) and keys[0] in value:
+        yield from _values_at(value[keys[0]], keys[1:])
+
+
+def _parse_value(text: str) -> Any:
+    for parse in (int, float):
+        try:
+            return parse(text)
+        except ValueError:
+            pass
+    return text.lower()
+
+
+def _compare(value: Any, op: Callable[[Any, Any], bool], expected: Any) -> bool:
+    if isinstance(expected, str):
+        return op(str(value).lower(), expected)
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return op(value, expected)
+    return False
+
+
+def _stem(actordef: str) -> str:
+    return actordef.rsplit("/", 1)[-1].removesuffix(".bmsad")
+
+
+class ActorDatabase:
+    """
+    Every actor of every scenario of a game version, indexed for queries across scenarios.
+
+    The database is built from each scenario's ScenarioData, in a process pool, and saved to the Dreaditor appdata
+    folder. A saved scenario is only rebuilt when the files it was built from change, like the scenario cache.
+
+    Queries are a list of terms, all of which have to match:
+
+    - scenario:, layer:, sublayer:, component:, subarea: and actordef: select from an index. components match by name
+      or type, actordefs by full link or file name (doorpowerpower), subareas by id or setup/id.
+    - name: matches part of the actor name, as does a term without a key
+    - a dotted path into the component data, compared with =, !=, <, <=, > or >=, for example
+      CBreakableTileGroupComponent.aGridTiles.eTileType=5. Lists along the path match if any element does.
+    """
+
+    game_version: str
+    records: list[ActorRecord]
+    # scenario -> source assets with their fingerprint and hashes, to tell if it needs to be rebuilt. checked like the
+    # scenario cache checks its entries, see ScenarioCache.is_unchanged
+    sources: dict[str, dict]
+    _indexes: dict[str, dict[str, list[int]]]
+
+    def __init__(self, game_version: str):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.game_version = game_version
+        self.records = []
+        self.sources = {}
+        self._indexes = {key: {} for key in INDEXED_KEYS}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ActorRecord]:
+        return iter(self.records)
+
+    def scenarios(self) -> list[Scenario]:
+        return [Scenario(value) for value in self.sources]
+
+    @classmethod
+    def open(
+        cls,
+        romfs: Path,
+        editor: FileTreeEditor | None = None,
+        jobs: int | None = None,
+        progress: Callable[[int, int, str], None] | None = None,
+    ) -> ActorDatabase:
+        """
+        The database of the RomFS at romfs, loaded from disk and updated with every scenario that changed.
+
+        Missing or stale scenarios are rebuilt in a pool of jobs processes (one per CPU by default), and reported to
+        progress as (done, total, message).
+        """
+        if editor is None:
+            editor = open_romfs(romfs)
+
+        db = cls.load(editor.version.name)
+        fingerprints = {value: sources["fingerprint"] for value, sources in db.sources.items()}
+        stale = [
+            scenario
+            for scenario in Scenario
+            if editor.version in scenario.game_versions and not db._is_current(editor, romfs, scenario)
+        ]
+        if not stale:
+            if any(db.sources[value]["fingerprint"] != fingerprint for value, fingerprint in fingerprints.items()):
+                # files were only touched. keep their new fingerprints, so the next check doesn't hash them again
+                db.save()
+            return db
+
+        db.logger.info("Indexing %i scenarios", len(stale))
+        jobs = jobs or os.cpu_count()
+        # spawn rather than fork, like the renderer, so this is safe from a process running Qt
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(jobs, len(stale))), mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = {pool.submit(_index_scenario, romfs, scenario): scenario for scenario in stale}
+            for done, future in enumerate(as_completed(futures), 1):
+                scenario = futures[future]
+                try:
+                    sources, records = future.result()
+                except Exception:
+                    db.logger.exception("Failed to index %s", scenario.name)
+                    message = f"Failed to index {scenario.long_name}"
+                else:
+                    db._replace_scenario(scenario, sources, records)
+                    message = f"Indexed {scenario.long_name}"
+
+                if progress is not None:
+                    progress(done, len(stale), message)
+
+        db._reindex()
+        db.save()
+        return db
+
+    def _is_current(self, editor: FileTreeEditor, romfs: Path, scenario: Scenario) -> bool:
+        sources = self.sources.get(scenario.value)
+        if sources is None:
+            return False
+
+        try:
+            return SharedScenarioCache.is_unchanged(editor, romfs, sources["assets"], sources)
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def _replace_scenario(self, scenario: Scenario, sources: dict, records: list[ActorRecord]):
+        self.records = [r for r in self.records if r.scenario != scenario.value]
+        self.records.extend(records)
+        self.sources[scenario.value] = sources
+
+    def _reindex(self):
+        self._indexes = {key: {} for key in INDEXED_KEYS}
+        for i, record in enumerate(self.records):
+            keys = {
+                "scenario": [record.scenario],
+                "layer": [record.layer],
+                "sublayer": [record.sublayer],
+                "actordef": [record.actordef, _stem(record.actordef)],
+                "component": {*record.components.keys(), *record.components.values()},
+                "subarea": {part for subarea in record.subareas for part in (subarea, subarea.split("/", 1)[1])},
+            }
+            for index_name, values in keys.items():
+                index = self._indexes[index_name]
+                for value in values:
+                    index.setdefault(value.lower(), []).append(i)
+
+    def uses_of_actordef(self, actordef: str) -> list[ActorRecord]:
+        return self.find(actordef=actordef)
+
+    def with_component(self, component: str) -> list[ActorRecord]:
+        return self.find(component=component)
+
+    def find(self, **terms: str) -> list[ActorRecord]:
+        """Keyword form of query, e.g. find(component="CBreakableTileGroupComponent", layer="rEntitiesLayer")."""
+        return self.query(" ".join(shlex.quote(f"{key}:{value}") for key, value in terms.items()))
+
+    def query(self, text: str) -> list[ActorRecord]:
+        """The records matching every term of text, see the class docstring. Raises QueryError if text is invalid."""
+        try:
+            terms = shlex.split(text)
+        except ValueError as e:
+            raise QueryError(str(e)) from e
+
+        candidates: set[int] | None = None
+        filters: list[Callable[[ActorRecord], bool]] = []
+        for term in terms:
+            key, sep, value = term.partition(":")
+            if sep and key in INDEXED_KEYS:
+                if key == "scenario":
+                    value = self._scenario_value(value)
+                matches = set(self._indexes[key].get(value.lower(), []))
+                candidates = matches if candidates is None else candidates & matches
+            elif sep and key == "name":
+                filters.append(lambda r, part=value.lower(): part in r.name.lower())
+            elif (match := FIELD_TERM.match(term)) is not None:
+                path, op, expected = match.groups()
+                filters.append(
+                    lambda r, path=path, op=COMPARISONS[op], expected=_parse_value(expected): any(
+                        _compare(v, op, expected) for v in r.field_values(path)
+                    )
+                )
+            elif sep:
+                raise QueryError(f"Unknown query key: {key}")
+            else:
+                filters.append(lambda r, part=term.lower(): part in r.name.lower())
+
+        indices = sorted(candidates) if candidates is not None else range(len(self.records))
+        return [self.records[i] for i in indices if all(f(self.records[i]) for f in filters)]
+
+    @staticmethod
+    def _scenario_value(name: str) -> str:
+        for scenario in Scenario:
+            if name.upper() == scenario.name or name == scenario.value:
+                return scenario.value
+        return name
+
+    @staticmethod
+    def _path(game_version: str) -> Path:
+        return dreaditor.get_appdata_folder().joinpath(DATABASE_FOLDER_NAME, f"{game_version}.json")
+
+    @classmethod
+    def load(cls, game_version: str) -> ActorDatabase:
+        """The saved database of a game version, or an empty one if there is none."""
+        db = cls(game_version)
+        path = cls._path(game_version)
+        if not path.exists():
+            return db
+
+        try:
+            saved = json.loads(path.read_text())
+            if saved["format"] != DATABASE_FORMAT_VERSION:
+                db.logger.info("Discarding actor database %s built by another version", path.as_posix())
+                return db
+
+            db.sources = saved["sources"]
+            db.records = [ActorRecord.from_dict(r) for r in saved["records"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            db.logger.exception("Actor database %s is unreadable", path.as_posix())
+            return cls(game_version)
+
+        db._reindex()
+        return db
+
+    def save(self):
+        path = self._path(self.game_version)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            saved = {
+                "format": DATABASE_FORMAT_VERSION,
+                "sources": self.sources,
+                "records": [dataclasses.asdict(r) for r in self.records],
+            }
+            path.write_text(json.dumps(saved, separators=(",", ":")))
+        except (OSError, ValueError):
+            self.logger.exception("Failed to write actor database %s", path.as_posix())
+
+
+def _index_scenario(romfs: Path, scenario: Scenario) -> tuple[dict, list[ActorRecord]]:
+    """Runs in a worker process. Reads the scenario through the scenario cache, parsing it if needed."""
+    from dreaditor.scenario_loader import ScenarioLoader
+
+    editor = shared_romfs(romfs)
+    data = ScenarioLoader(scenario, editor, romfs, None, None).load_data()
+
+    assets = data.source_assets()
+    sources = {"assets": assets, **SharedScenarioCache.source_state(editor, romfs, assets)}
+    return sources, ActorRecord.from_scenario(data)
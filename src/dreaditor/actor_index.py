@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from dreaditor.actor import Actor
+    from dreaditor.actor_reference import ActorRef
+
+
+class ActorIndex:
+    """
+    Constant-time lookup of a scenario's actors by reference, grouping by layer and sublayer, and by the names and
+    types of their components.
+    """
+
+    _by_ref: dict[ActorRef, Actor]
+    _by_layer: dict[str, dict[str, list[Actor]]]
+    # component name or type -> actors with such a component
+    _by_component: dict[str, list[Actor]]
+
+    def __init__(self):
+        self._by_ref = {}
+        self._by_layer = {}
+        self._by_component = {}
+
+    def __len__(self) -> int:
+        return len(self._by_ref)
+
+    def __iter__(self) -> Iterator[Actor]:
+        return iter(self._by_ref.values())
+
+    def __contains__(self, ref: ActorRef) -> bool:
+        return ref in self._by_ref
+
+    def add(self, actor: Actor):
+        if actor.ref in self._by_ref:
+            raise ValueError(f"Actor {actor.ref} is already indexed")
+
+        self._by_ref[actor.ref] = actor
+        self._by_layer.setdefault(actor.ref.layer, {}).setdefault(actor.ref.sublayer, []).append(actor)
+        for key in actor.component_keys:
+            self._by_component.setdefault(key, []).append(actor)
+
+    def get(self, ref: ActorRef) -> Actor | None:
+        return self._by_ref.get(ref)
+
+    def layers(self) -> list[str]:
+        return list(self._by_layer.keys())
+
+    def sublayers(self, layer: str) -> list[str]:
+        return list(self._by_layer.get(layer, {}).keys())
+
+    def in_layer(self, layer: str) -> list[Actor]:
+        return [actor for sublayer in self._by_layer.get(layer, {}).values() for actor in sublayer]
+
+    def in_sublayer(self, layer: str, sublayer: str) -> list[Actor]:
+        return list(self._by_layer.get(layer, {}).get(sublayer, []))
+
+    def with_component(self, name_or_type: str) -> list[Actor]:
+        return list(self._by_component.get(name_or_type, []))
+
+    def clear(self):
+        self._by_ref.clear()
+        self._by_layer.clear()
+        self._by_component.clear()
@@ -7,7 +7,7 @@ if TYPE_CHECKING:
     from dreaditor.constants import Scenario
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(frozen=True, slots=True)
 class ActorRef:
     scenario: Scenario
     layer: str
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dreaditor.actor import Actor
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class ActorSearchIndex:
+    """
+    Finds a scenario's actors by part of their name, actordef link or component types, as fast as the user types.
+
+    Actors share most of their actordefs and component types, so the index is built over the distinct strings rather
+    than per actor: a trigram index narrows a search down to the few strings that can contain it, which are then
+    checked directly. Searches shorter than a trigram check every string.
+    """
+
+    # lowercase string -> actors it belongs to
+    _actors: dict[str, list[Actor]]
+    _trigrams: dict[str, set[str]]
+
+    def __init__(self):
+        self._actors = {}
+        self._trigrams = {}
+
+    def __len__(self) -> int:
+        return len(self._actors)
+
+    def add(self, actor: Actor):
+        keys = {actor.ref.name, actor.data.actordef, *actor.data.components.values()}
+        for key in keys:
+            key = key.lower()
+            actors = self._actors.get(key)
+            if actors is None:
+                actors = self._actors[key] = []
+                for trigram in _trigrams(key):
+                    self._trigrams.setdefault(trigram, set()).add(key)
+            actors.append(actor)
+
+    def clear(self):
+        self._actors.clear()
+        self._trigrams.clear()
+
+    def match(self, text: str) -> set[Actor] | None:
+        """
+        The actors matching every word of text, or None if text has no words and nothing is filtered.
+        """
+        words = text.lower().split()
+        if not words:
+            return None
+
+        res: set[Actor] | None = None
+        # the longest words narrow the search down the most, so start with them
+        for word in sorted(words, key=len, reverse=True):
+            matches = {actor for key in self._keys_containing(word) for actor in self._actors[key]}
+            res = matches if res is None else res & matches
+            if not res:
+                break
+        return res
+
+    def _keys_containing(self, word: str) -> list[str]:
+        if len(word) < 3:
+            return [key for key in self._actors if word in key]
+
+        candidates: set[str] | None = None
+        for trigram in sorted(_trigrams(word), key=lambda t: len(self._trigrams.get(t, ()))):
+            keys = self._trigrams.get(trigram)
+            if keys is None:
+                return []
+            candidates = set(keys) if candidates is None else candidates & keys
+            if not candidates:
+                return []
+
+        # every trigram being present doesn't mean they are in the right order
+        return [key for key in candidates if word in key]
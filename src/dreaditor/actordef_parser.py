@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, TypeVar
+
+from dreaditor.asset_cache import SharedAssetCache
+from dreaditor.config import CurrentConfiguration
+from dreaditor.scenario_data import ActorDefData
+from dreaditor.tracing import SharedTracer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+    from mercury_engine_data_structures.game_check import Game
+
+    from dreaditor.scenario_data import CollisionShape
+
+R = TypeVar("R")
+
+# below this many actordefs, sending them to the workers costs more than parsing them on the loader thread
+MIN_PARALLEL_ACTORDEFS = 16
+# tasks per worker, so progress is reported and a cancelled load stops while the workers are busy
+TASKS_PER_JOB = 4
+
+
+class ActorDefParser:
+    """
+    Parses the actordefs (BMSAD) of a scenario and the collision files (BMSCC) they reference in a pool of worker
+    processes.
+
+    The raw files are read from the RomFS by the caller and sent to the workers, which send back ActorDefData rather
+    than the parsed assets: Construct containers are slow to pickle and much larger than what the scene needs.
+    Collision files are only known once the actordefs referencing them are parsed, so they are parsed in a second
+    round. The workers are started on first use and kept until shutdown, as each of them imports the asset formats.
+
+    The ActorDefData is kept in the SharedAssetCache, so an actordef is only parsed once per session as long as it
+    isn't evicted.
+    """
+
+    _pool: ProcessPoolExecutor | None
+    _pool_jobs: int
+
+    def __init__(self):
+        self.logger = logging.getLogger(type(self).__name__)
+        self._pool = None
+        self._pool_jobs = 0
+        self._lock = threading.Lock()
+
+    def jobs(self) -> int:
+        """The number of worker processes, from the parseJobs config. 0 means one per CPU."""
+        # the renderer and the actor database already load one scenario per CPU in their own workers
+        if multiprocessing.parent_process() is not None:
+            return 1
+        return CurrentConfiguration["parseJobs"] or os.cpu_count() or 1
+
+    def is_worthwhile(self, count: int) -> bool:
+        return count >= MIN_PARALLEL_ACTORDEFS and self.jobs() > 1
+
+    def parse(
+        self,
+        editor: FileTreeEditor,
+        links: list[str],
+        progress: Callable[[int], None],
+        cancelled: Callable[[], bool],
+    ) -> dict[str, ActorDefData]:
+        """
+        The ActorDefData of every link, with its collision. progress is called with the number of actordefs parsed so
+        far. Once cancelled returns True the remaining work is dropped, and the result is incomplete.
+        """
+        cached = {}
+        for link in links:
+            actordef = SharedAssetCache.get(_cache_key(link))
+            if actordef is not None:
+                cached[link] = actordef
+        missing = [link for link in links if link not in cached]
+        progress(len(cached))
+
+        with SharedTracer.span("parse actordefs", "parse", {"count": len(missing), "jobs": self.jobs()}):
+            parsed, sizes = self._map(
+                _parse_actordefs, editor, missing, lambda done: progress(len(cached) + done), cancelled
+            )
+            if cancelled():
+                return {}
+
+            actordefs = dict(zip(missing, parsed))
+            files = sorted({actordef.collision_file for actordef in actordefs.values() if actordef.collision_file})
+            shapes, collision_sizes = self._map(_parse_collision, editor, files, lambda _: None, cancelled)
+            if cancelled():
+                return {}
+
+        collision = dict(zip(files, shapes))
+        for link, actordef in actordefs.items():
+            # counted at the size of its files, it's much smaller than the parsed assets would be
+            size = sizes[link]
+            if actordef.collision_file is not None:
+                actordef.collision = collision[actordef.collision_file]
+                size += collision_sizes[actordef.collision_file]
+            SharedAssetCache.put(_cache_key(link), actordef, size)
+
+        return {link: cached[link] if link in cached else actordefs[link] for link in links}
+
+    def _map(
+        self,
+        function: Callable[[Game, list[tuple[str, bytes]]], list[R]],
+        editor: FileTreeEditor,
+        names: list[str],
+        progress: Callable[[int], None],
+        cancelled: Callable[[], bool],
+    ) -> tuple[list[R], dict[str, int]]:
+        """
+        Applies function to the raw files of names in the workers, in chunks. Returns the results, in the order of
+        names, and the size of each raw file.
+        """
+        if not names:
+            return [], {}
+
+        pool, jobs = self._get_pool()
+        size = max(1, math.ceil(len(names) / (jobs * TASKS_PER_JOB)))
+        chunks = [names[i : i + size] for i in range(0, len(names), size)]
+
+        sizes = {}
+        futures = {}
+        for i, chunk in enumerate(chunks):
+            assets = [(name, editor.get_raw_asset(name)) for name in chunk]
+            sizes.update((name, len(data)) for name, data in assets)
+            futures[pool.submit(function, editor.target_game, assets)] = i
+        results: list[list[R]] = [[] for _ in chunks]
+        done = 0
+        try:
+            for future in as_completed(futures):
+                if cancelled():
+                    break
+                results[futures[future]] = future.result()
+                done += len(chunks[futures[future]])
+                progress(done)
+        except BrokenProcessPool:
+            self.logger.exception("An actordef parser process died")
+            self.shutdown()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return [result for chunk in results for result in chunk], sizes
+
+    def _get_pool(self) -> tuple[ProcessPoolExecutor, int]:
+        with self._lock:
+            jobs = self.jobs()
+            if self._pool is not None and self._pool_jobs != jobs:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+            if self._pool is None:
+                self.logger.info("Starting %i actordef parser processes", jobs)
+                # spawn rather than fork, like the renderer, so this is safe from a process running Qt
+                self._pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+                self._pool_jobs = jobs
+
+            return self._pool, self._pool_jobs
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+def _cache_key(link: str) -> str:
+    # the SharedAssetCache keeps the parsed BMSAD under the link itself
+    return f"{link}#ActorDefData"
+
+
+def _parse_actordefs(game: Game, assets: list[tuple[str, bytes]]) -> list[ActorDefData]:
+    """Runs in a worker process. The collision of the results is filled in by ActorDefParser.parse."""
+    from mercury_engine_data_structures.formats.bmsad import Bmsad
+
+    return [ActorDefData.from_assets(link, Bmsad.parse(data, target_game=game), None) for link, data in assets]
+
+
+def _parse_collision(game: Game, assets: list[tuple[str, bytes]]) -> list[list[CollisionShape]]:
+    """Runs in a worker process."""
+    from mercury_engine_data_structures.formats.bmscc import Bmscc
+
+    return [ActorDefData.collision_shapes(Bmscc.parse(data, target_game=game)) for _, data in assets]
+
+
+SharedActorDefParser = ActorDefParser()
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, TypeVar
+
+from mercury_engine_data_structures.base_resource import BaseResource
+
+from dreaditor.config import CurrentConfiguration
+from dreaditor.memory import MIB
+from dreaditor.tracing import parse_span
+
+if TYPE_CHECKING:
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+
+    from dreaditor.constants import Scenario
+    from dreaditor.scenario_data import ActorDefData
+
+T = TypeVar("T", bound=BaseResource)
+
+# Construct containers are much larger than the bytes they were parsed from. This is a rough multiplier used to
+# turn the raw asset size into a memory estimate for the budget.
+PARSED_SIZE_FACTOR = 16
+
+# how long the parsed assets of a scenario are kept, see ScenarioAssetRetention
+KEEP_ALL = "keepAll"
+KEEP_LAST = "keepLast"
+RELEASE_AFTER_BUILD = "releaseAfterBuild"
+RETENTION_POLICIES = [KEEP_ALL, KEEP_LAST, RELEASE_AFTER_BUILD]
+
+
+class AssetCache:
+    """
+    Parsed assets keyed by asset path, shared between scenarios. The ActorDefParser also keeps the ActorDefData it
+    makes of an actordef here, so it isn't sent to its workers again.
+
+    Entries are evicted least-recently-used first once their estimated size exceeds the memory budget. The cache is
+    used from both the GUI thread and the scenario loader thread, so all bookkeeping happens under a lock; parsing
+    itself is done outside of it.
+    """
+
+    budget: int
+    used: int
+    hits: int
+    misses: int
+    _entries: OrderedDict[str, tuple[BaseResource | ActorDefData, int]]
+
+    def __init__(self, budget: int):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def get(self, name: str) -> BaseResource | ActorDefData | None:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return entry[0]
+
+    def get_parsed_asset(self, editor: FileTreeEditor, name: str, type_hint: type[T]) -> T:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        with parse_span(name):
+            data = editor.get_raw_asset(name)
+            asset = type_hint.parse(data, target_game=editor.target_game, editor=editor)
+        self.put(name, asset, len(data) * PARSED_SIZE_FACTOR)
+        return asset
+
+    def put(self, name: str, asset: BaseResource | ActorDefData, size: int):
+        with self._lock:
+            if size > self.budget:
+                self.logger.info("Not caching %s, estimated size %i exceeds the budget", name, size)
+                return
+
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self.used -= old[1]
+
+            self._entries[name] = (asset, size)
+            self.used += size
+            self._evict()
+
+    def set_budget(self, budget: int):
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used = 0
+
+    def _evict(self):
+        while self.used > self.budget and self._entries:
+            name, (_, size) = self._entries.popitem(last=False)
+            self.used -= size
+            self.logger.debug("Evicted %s from asset cache", name)
+
+    def stats(self) -> str:
+        return (
+            f"{len(self._entries)} assets, ~{self.used // MIB}/{self.budget // MIB} MiB, "
+            f"{self.hits} hits, {self.misses} misses"
+        )
+
+
+class ScenarioAssetRetention:
+    """
+    The parsed assets of the scenarios opened this session, currently their BRFLD, kept according to a policy:
+
+    - keepAll keeps the assets of every scenario opened, until another RomFS is selected.
+    - keepLast keeps the assets of the last few scenarios opened, including the current one.
+    - releaseAfterBuild drops the assets of a scenario once its scene is built. When the data tree needs them again
+      they are parsed again, and kept until another scenario is opened.
+
+    Unlike the AssetCache, this is only used from the GUI thread.
+    """
+
+    policy: str
+    count: int
+    # scenario -> asset name -> (asset, estimated size), least recently opened first
+    _scenarios: OrderedDict[Scenario, dict[str, tuple[BaseResource, int]]]
+
+    def __init__(self, policy: str, count: int):
+        self.logger = logging.getLogger(type(self).__name__)
+        self._scenarios = OrderedDict()
+        self.set_policy(policy, count)
+
+    @property
+    def used(self) -> int:
+        return sum(size for assets in self._scenarios.values() for _, size in assets.values())
+
+    def set_policy(self, policy: str, count: int):
+        if policy not in RETENTION_POLICIES:
+            self.logger.warning("Unknown scenario asset retention %s, using %s", policy, KEEP_LAST)
+            policy = KEEP_LAST
+
+        self.policy = policy
+        self.count = max(count, 1)
+        self._evict()
+
+    def get(self, scenario: Scenario, name: str) -> BaseResource | None:
+        entry = self._scenarios.get(scenario, {}).get(name)
+        return entry[0] if entry is not None else None
+
+    def put(self, scenario: Scenario, name: str, asset: BaseResource, size: int):
+        self._scenarios.setdefault(scenario, {})[name] = (asset, size)
+
+    def on_scenario_opened(self, scenario: Scenario):
+        self._scenarios.setdefault(scenario, {})
+        self._scenarios.move_to_end(scenario)
+        self._evict()
+
+    def on_scenario_built(self, scenario: Scenario):
+        if self.policy == RELEASE_AFTER_BUILD and self._scenarios.get(scenario):
+            self.logger.info("Released the assets of %s", scenario.name)
+            self._scenarios[scenario] = {}
+
+    def clear(self):
+        self._scenarios.clear()
+
+    def _evict(self):
+        if self.policy == KEEP_ALL:
+            return
+
+        kept = self.count if self.policy == KEEP_LAST else 1
+        while len(self._scenarios) > kept:
+            scenario, assets = self._scenarios.popitem(last=False)
+            if assets:
+                self.logger.info("Released the assets of %s", scenario.name)
+
+    def report(self) -> str:
+        """The estimated memory held by each retained asset."""
+        lines = [
+            f"Retained scenario assets ({self.policy}), estimated at {PARSED_SIZE_FACTOR}x their file size: "
+            f"~{self.used // MIB} MiB"
+        ]
+        for assets in self._scenarios.values():
+            lines.extend(f"  {name}: ~{size // MIB} MiB" for name, (_, size) in assets.items())
+        return "\n".join(lines)
+
+
+SharedAssetCache = AssetCache(CurrentConfiguration["assetCacheBudgetMB"] * MIB)
+SharedScenarioAssets = ScenarioAssetRetention(
+    CurrentConfiguration["scenarioAssetRetention"], CurrentConfiguration["scenarioAssetRetentionCount"]
+)
@@ -13,6 +13,7 @@ CONFIG_FILE_NAME = "config.json"
 DEFAULT_CONFIG = {
     "romfs_dir": None,
     "paintGeometry": True,
+    "mergeNavmeshOutlines": True,
     "paintCollisionCameras": True,
     "paintDoors": True,
     "paintCollision": True,
@@ -21,7 +22,19 @@ DEFAULT_CONFIG = {
     "paintLogicPaths": False,
     "paintWorldGraph": False,
     "paintPositionalSound": False,
+    "levelOfDetail": True,
+    "tileCache": True,
+    "tileCacheBudgetMB": 128,
+    "lazyActors": True,
+    "assetCacheBudgetMB": 512,
+    "scenarioAssetRetention": "keepLast",
+    "scenarioAssetRetentionCount": 1,
+    "parseJobs": 0,
+    "performanceHud": False,
+    "tracing": False,
 }
+# painting options that can be set from the command line, the rest of the config doesn't affect rendering
+PAINT_OPTIONS = [key for key in DEFAULT_CONFIG if key.startswith("paint")] + ["levelOfDetail"]
 
 
 class Config(dict):
@@ -53,6 +66,10 @@ class Config(dict):
 
         self.config_path.write_text(json.dumps(self, indent=4))
 
+    def override(self, values: dict):
+        """Sets values for this process only, without saving them to the config file."""
+        super().update(values)
+
     def __setitem__(self, key, value) -> None:
         super().__setitem__(key, value)
         self.logger.info("Set %s to %s", key, value)
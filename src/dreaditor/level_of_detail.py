@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from dreaditor.config import CurrentConfiguration
+
+if TYPE_CHECKING:
+    from PySide6.QtGui import QPainter
+    from PySide6.QtWidgets import QStyleOptionGraphicsItem
+
+# all thresholds are in screen pixels, except CLUSTER_BELOW_LOD which is in pixels per scene unit
+
+# painter paths smaller than this on screen are drawn as their bounding box
+SIMPLIFY_BELOW_PX = 6.0
+# text smaller than this on screen is not drawn
+MIN_TEXT_PX = 4.0
+# below this zoom, actor dots are less than 2.5 pixels wide and are merged into clusters
+CLUSTER_BELOW_LOD = 0.05
+# size of the screen-space cells actors are clustered in
+CLUSTER_CELL_PX = 24.0
+
+
+def level_of_detail(painter: QPainter, option: QStyleOptionGraphicsItem) -> float:
+    """How many screen pixels one scene unit covers, or infinity if level of detail is disabled."""
+    if not CurrentConfiguration["levelOfDetail"]:
+        return float("inf")
+    return option.levelOfDetailFromTransform(painter.worldTransform())
+
+
+def is_clustered(lod: float) -> bool:
+    return lod < CLUSTER_BELOW_LOD
@@ -2,21 +2,30 @@ from __future__ import annotations
 
 import logging
 import os
+from typing import TYPE_CHECKING
 
-from PySide6.QtCore import QSize, Qt
-from PySide6.QtGui import QAction, QCloseEvent
-from PySide6.QtWidgets import QDockWidget, QFileDialog, QMainWindow, QMenu, QTabWidget
+from PySide6.QtCore import QSize, Qt, QTimer
+from PySide6.QtGui import QAction, QCloseEvent, QPaintEvent
+from PySide6.QtWidgets import QDockWidget, QFileDialog, QLabel, QMainWindow, QMenu, QProgressBar, QTabWidget
 
 from dreaditor import VERSION_STRING, get_log_folder, get_stylesheet
+from dreaditor.actor import ActorSelectionState
 from dreaditor.config import CurrentConfiguration
 from dreaditor.constants import Scenario
 from dreaditor.rom_manager import RomManager
+from dreaditor.scenario_cache import SharedScenarioCache
+from dreaditor.tracing import SharedTracer, save_trace
 from dreaditor.widgets.actor_data_tree import ActorDataTreeWidget
+from dreaditor.widgets.actor_list_tree import ActorListPanel
+from dreaditor.widgets.actor_query_widget import ActorQueryWidget
 from dreaditor.widgets.entity_list_tree import EntityListTreeWidget
 from dreaditor.widgets.scenario_scene import ScenarioScene
 from dreaditor.widgets.scenario_viewer import ScenarioViewer
 from dreaditor.widgets.subareas_list_tree import SubareasListTree
 
+if TYPE_CHECKING:
+    from dreaditor.actor_reference import ActorRef
+
 DEFAULT_WINDOW_DIMENSIONS: QSize = QSize(1280, 720)
 MINIMUM_DOCK_WIDTH: int = 256
 
@@ -27,10 +36,18 @@ class DreaditorWindow(QMainWindow):
 
     actor_list_dock: QDockWidget
     entity_list_tree: EntityListTreeWidget
+    # the actor and subarea trees with their filter boxes, which always hold the same text
+    filter_panels: list[ActorListPanel]
     central_dock: QDockWidget
     data_dock: QDockWidget
     actor_data_tree: ActorDataTreeWidget
+    search_dock: QDockWidget
+    actor_query_widget: ActorQueryWidget
+    # actor to select once its scenario finishes loading, see on_search_result_activated
+    pending_selection: ActorRef | None
     scenario_viewer: ScenarioViewer
+    load_label: QLabel
+    load_progress: QProgressBar
 
     rom_manager: RomManager
 
@@ -38,6 +55,7 @@ class DreaditorWindow(QMainWindow):
         super().__init__(*args, *kwargs)
         self.logger = logging.getLogger(type(self).__name__)
         self.rom_manager = RomManager(self)
+        self.pending_selection = None
 
         self.setWindowTitle(f"Dreaditor v{VERSION_STRING}")
         self.resize(DEFAULT_WINDOW_DIMENSIONS)
@@ -51,6 +69,9 @@ class DreaditorWindow(QMainWindow):
         menuBar.addMenu(fileMenu)
         fileMenu.addAction("Select RomFS").triggered.connect(self.select_rom_fs)
         fileMenu.addAction("Open Log Folder").triggered.connect(self.open_log_folder)
+        fileMenu.addAction("Clear Scenario Cache").triggered.connect(self.clear_scenario_cache)
+        if SharedTracer.enabled:
+            fileMenu.addAction("Save Trace").triggered.connect(self.save_trace)
 
         self.edit_menu = QMenu("&Load Scenario", self)
         menuBar.addMenu(self.edit_menu)
@@ -85,6 +106,12 @@ class DreaditorWindow(QMainWindow):
         _add_paint_menu_action("Logic Paths", "paintLogicPaths")
         _add_paint_menu_action("World Graph", "paintWorldGraph")
         _add_paint_menu_action("Positional Sounds", "paintPositionalSound")
+        paintMenu.addSeparator()
+        _add_paint_menu_action("Merge Navmesh Outlines", "mergeNavmeshOutlines")
+        _add_paint_menu_action("Level of Detail", "levelOfDetail")
+        _add_paint_menu_action("Tile Cache", "tileCache")
+        _add_paint_menu_action("Build Actors in View", "lazyActors")
+        _add_paint_menu_action("Performance HUD", "performanceHud")
 
         self.update_menu_for_rom_versions()
 
@@ -104,7 +131,8 @@ class DreaditorWindow(QMainWindow):
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.actor_list_dock)
 
         self.entity_list_tree = EntityListTreeWidget(self.actor_data_tree, None)
-        self.actor_list_dock.setWidget(self.entity_list_tree)
+        entity_panel = ActorListPanel(self.entity_list_tree, None)
+        self.actor_list_dock.setWidget(entity_panel)
 
         # create subareas dock
         self.subareas_dock = QDockWidget("Subareas")
@@ -113,7 +141,22 @@ class DreaditorWindow(QMainWindow):
         self.tabifyDockWidget(self.actor_list_dock, self.subareas_dock)
 
         self.subareas_list_tree = SubareasListTree(self.actor_data_tree, None)
-        self.subareas_dock.setWidget(self.subareas_list_tree)
+        subareas_panel = ActorListPanel(self.subareas_list_tree, None)
+        self.subareas_dock.setWidget(subareas_panel)
+
+        self.filter_panels = [entity_panel, subareas_panel]
+        for panel in self.filter_panels:
+            panel.filter_edit.textChanged.connect(self.on_actor_filter_changed)
+
+        # create search dock
+        self.search_dock = QDockWidget("Search")
+        self.search_dock.setFeatures(QDockWidget.DockWidgetFeature.NoDockWidgetFeatures)
+        self.search_dock.setMinimumWidth(MINIMUM_DOCK_WIDTH)
+        self.tabifyDockWidget(self.subareas_dock, self.search_dock)
+
+        self.actor_query_widget = ActorQueryWidget(self.rom_manager, None)
+        self.actor_query_widget.actor_activated.connect(self.on_search_result_activated)
+        self.search_dock.setWidget(self.actor_query_widget)
 
         # ensure actors dock is the default left-side dock
         self.actor_list_dock.raise_()
@@ -127,15 +170,62 @@ class DreaditorWindow(QMainWindow):
         self.central_dock.setWidget(self.scenario_viewer)
         self.setCentralWidget(self.central_dock)
 
+        # scenario loading progress
+        self.load_label = QLabel()
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(MINIMUM_DOCK_WIDTH)
+        self.statusBar().addWidget(self.load_label)
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.load_progress.hide()
+        self.rom_manager.scenario_load_progress.connect(self.on_scenario_load_progress)
+        self.rom_manager.scenario_load_finished.connect(self.on_scenario_load_finished)
+        self.rom_manager.scenario_load_failed.connect(self.on_scenario_load_failed)
+        self.rom_manager.rom_selected.connect(self.on_rom_selected)
+        self._rom_requested = False
+
+    def paintEvent(self, event: QPaintEvent):
+        super().paintEvent(event)
+        if not self._rom_requested:
+            self._rom_requested = True
+            # index the configured RomFS once the window is up, so importing the asset formats doesn't hold it up
+            QTimer.singleShot(0, self.select_configured_rom)
+
+    def select_configured_rom(self):
+        if self.rom_manager.path and self.rom_manager.editor is None and not self.rom_manager.is_indexing():
+            self.rom_manager.select_rom(self.rom_manager.path)
+            self.load_label.setText("Indexing RomFS...")
+
     def on_paint_option_triggered(self, checked: bool, config_name: str):
         CurrentConfiguration[config_name] = checked
-        self.scenario_viewer.viewport().update()
+        self.scenario_viewer.on_paint_options_changed(config_name)
+
+    def on_actor_filter_changed(self, text: str):
+        for panel in self.filter_panels:
+            if panel.filter_edit.text() != text:
+                panel.filter_edit.blockSignals(True)
+                panel.filter_edit.setText(text)
+                panel.filter_edit.blockSignals(False)
+
+        self.rom_manager.set_actor_filter(text)
 
     def select_rom_fs(self):
         filename = QFileDialog.getExistingDirectory(self, "Open RomFS Folder")
         self.logger.info("Selected Directory: %s", filename)
+        if not filename:
+            return
+
         self.rom_manager.select_rom(filename)
         self.update_menu_for_rom_versions()
+        self.actor_query_widget.on_rom_selected()
+        self.load_label.setText("Indexing RomFS...")
+
+    def on_rom_selected(self):
+        # the Load Scenario menu is filled in once the RomFS is indexed
+        self.update_menu_for_rom_versions()
+        if self.rom_manager.editor is not None:
+            self.load_label.setText(f"Indexed RomFS at {self.rom_manager.path}")
+        else:
+            self.load_label.setText("RomFS is not valid!")
 
     def update_menu_for_rom_versions(self):
         for act in self.edit_menu.actions():
@@ -151,6 +241,15 @@ class DreaditorWindow(QMainWindow):
         self.logger.info("Opening logging dir")
         os.startfile(get_log_folder())
 
+    def clear_scenario_cache(self):
+        self.logger.info("Clearing scenario cache")
+        SharedScenarioCache.clear()
+
+    def save_trace(self):
+        path = save_trace()
+        if path is not None:
+            self.load_label.setText(f"Saved trace to {path}")
+
     def open_region(self, scenario: Scenario):
         self.setWindowTitle(f"Dreaditor v{VERSION_STRING}: {scenario.long_name}")
         self.entity_list_tree.on_new_scenario_selected()
@@ -159,5 +258,41 @@ class DreaditorWindow(QMainWindow):
         self.actor_data_tree.clear()
         self.rom_manager.open_scenario(scenario)
 
+    def on_scenario_load_progress(self, done: int, total: int, message: str):
+        self.load_label.setText(message)
+        # a total of 0 puts the bar in its busy state until the actor count is known
+        self.load_progress.setRange(0, total)
+        self.load_progress.setValue(done)
+        self.load_progress.show()
+
+    def on_scenario_load_finished(self, scenario: Scenario):
+        self.load_label.setText(f"Loaded {scenario.long_name}")
+        self.load_progress.hide()
+
+        ref, self.pending_selection = self.pending_selection, None
+        if ref is not None and ref.scenario == scenario:
+            self.select_actor(ref)
+
+    def on_scenario_load_failed(self, scenario: Scenario, message: str):
+        self.load_label.setText(f"Failed to load {scenario.long_name}: {message}")
+        self.load_progress.hide()
+        self.pending_selection = None
+
+    def on_search_result_activated(self, ref: ActorRef):
+        rm = self.rom_manager
+        if rm.isScenarioLoaded and not rm.is_loading() and rm.scenario == ref.scenario:
+            self.select_actor(ref)
+            return
+
+        self.pending_selection = ref
+        self.open_region(ref.scenario)
+
+    def select_actor(self, ref: ActorRef):
+        actor = self.rom_manager.get_actor_from_ref(ref)
+        if actor is not None:
+            actor.OnSelected(ActorSelectionState.Selected)
+
     def closeEvent(self, a0: QCloseEvent | None) -> None:
+        self.rom_manager.shutdown()
+        self.actor_query_widget.shutdown()
         CurrentConfiguration._save()
@@ -1,20 +1,47 @@
 from __future__ import annotations
 
+import dataclasses
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QRectF, Qt
-from PySide6.QtGui import QBrush, QColor, QPen
+from PySide6.QtGui import QBrush, QColor, QPainterPath, QPen
 from PySide6.QtWidgets import QGraphicsItem
 
-from dreaditor.actor import ActorSelectionState
 from dreaditor.config import CurrentConfiguration
+from dreaditor.level_of_detail import SIMPLIFY_BELOW_PX, level_of_detail
+from dreaditor.tile_cache import tile_cache_enabled
+from dreaditor.tracing import traced
 
 if TYPE_CHECKING:
+    from PySide6.QtCore import QPointF
     from PySide6.QtGui import QPainter
-    from PySide6.QtWidgets import QGraphicsSceneMouseEvent, QStyleOptionGraphicsItem, QWidget
+    from PySide6.QtWidgets import QStyleOptionGraphicsItem, QWidget
 
     from dreaditor.actor import Actor
 
+NO_BRUSH = QBrush(Qt.BrushStyle.NoBrush)
+NO_PEN = QPen(Qt.PenStyle.NoPen)
+
+
+@dataclasses.dataclass()
+class PaintLayer:
+    """A precompiled path, drawn with its own pen and brush or with the widget's (pen/brush of None)."""
+
+    path: QPainterPath
+    pen: QPen | None = None
+    brush: QBrush | None = None
+    bounds: QRectF = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        self.bounds = self.path.boundingRect()
+
+    def draw(self, painter: QPainter, lod: float):
+        # when zoomed out far enough that the details would blur together, only draw the outline of the layer
+        if max(self.bounds.width(), self.bounds.height()) * lod < SIMPLIFY_BELOW_PX:
+            painter.drawRect(self.bounds)
+        else:
+            painter.drawPath(self.path)
+
 
 class BasePainterWidget(QGraphicsItem):
     bounding_rect: QRectF
@@ -22,10 +49,12 @@ class BasePainterWidget(QGraphicsItem):
     brush: QBrush
     pen: QPen
     config_val: str
+    layers: list[PaintLayer]
+    # static widgets are drawn into the ScenarioViewer's tile cache, and only their hover highlight is painted live
+    tile_cached: bool = False
 
     def __init__(self, actor: Actor, parent: QGraphicsItem | None = ...) -> None:
         super().__init__(parent)
-        self.bounding_rect = QRectF(actor.actor_dot.bounding_rect)
         self.actor = actor
         brush_color = QColor(actor.actor_dot.base_color)
         brush_color.setAlpha(32)
@@ -33,13 +62,58 @@ class BasePainterWidget(QGraphicsItem):
         self.pen = QPen(actor.actor_dot.base_color, 20)
         self.highlight_pen = QPen(QColor(255, 255, 255, 255), 20)
 
-        # TODO hover on these when visible to user
-        #      will likely have to un-child the painter widgets from actor dots,
-        #      or make them not QGraphicsItem and make the actor dots handle everything
+        # hover and clicks are hit-tested by the ScenarioViewer's spatial index, see ScenarioViewer.items_at
         self.setAcceptHoverEvents(False)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+
+        self.layers = []
+        self.bounding_rect = QRectF()
+        # whether the widget was visible the last time it was painted
+        self.drawn = False
+        # whether the widget was drawn into the tile cache, as of the last update
+        self.in_tiles = self.is_in_tiles()
+        self.compile_geometry()
+
+    @traced("compile")
+    def compile_geometry(self):
+        """
+        Builds the painter paths from the actor's data. Paint only draws the result, so this has to be called again if
+        the actor's data changes.
+        """
+        layers = self._compile()
+        bounds = self._decoration_bounds()
+        pen_width = max(self.pen.widthF(), self.highlight_pen.widthF())
+        for layer in layers:
+            bounds = bounds.united(layer.bounds)
+            if layer.pen is not None:
+                pen_width = max(pen_width, layer.pen.widthF())
+        if bounds.isNull():
+            bounds = QRectF(self.actor.actor_rect)
+
+        # only the region inside the bounds is repainted, so it has to include the strokes
+        margin = pen_width / 2
+        bounds = bounds.adjusted(-margin, -margin, margin, margin)
+        if bounds == self.bounding_rect:
+            self.layers = layers
+            return
+
+        self.prepareGeometryChange()
+        self.layers = layers
+        self.bounding_rect = bounds
+        if self.scene() is not None:
+            self.scene().views()[0].update_item_bounds(self)
+
+    def request_update(self):
+        if self.tile_cached and self.is_in_tiles() != self.in_tiles:
+            self.in_tiles = not self.in_tiles
+            self.scene().views()[0].tile_cache.invalidate(self.sceneBoundingRect())
+
+        # widgets that are hidden both before and after a change don't need to be repainted
+        if self.drawn or self.is_visible():
+            self.update()
 
     def is_visible(self):
-        if not self.actor.is_checked:
+        if not self.actor.is_shown:
             return False
 
         if self.actor.is_selected or CurrentConfiguration[self.config_val]:
@@ -47,33 +121,59 @@ class BasePainterWidget(QGraphicsItem):
 
         return False
 
+    def is_in_tiles(self) -> bool:
+        return (
+            self.tile_cached and tile_cache_enabled() and self.actor.is_shown and CurrentConfiguration[self.config_val]
+        )
+
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        if self.is_visible():
-            painter.setPen(self.highlight_pen if self.actor.is_hovered else self.pen)
-            painter.setBrush(self.brush)
-            self._paint(painter, option, widget)
+        self.drawn = self.is_visible()
+        if not self.drawn:
+            return
+
+        if not self.is_in_tiles():
+            self._draw(painter, option, widget, self.highlight_pen if self.actor.is_hovered else self.pen, None)
+        elif self.actor.is_hovered:
+            # the widget is already in the tiles below, only outline it
+            self._draw(painter, option, widget, self.highlight_pen, NO_BRUSH)
+
+    def paint_tile(self, painter: QPainter, option: QStyleOptionGraphicsItem) -> None:
+        if self.is_in_tiles():
+            self._draw(painter, option, None, self.pen, None)
+
+    @traced("paint")
+    def _draw(
+        self,
+        painter: QPainter,
+        option: QStyleOptionGraphicsItem,
+        widget: QWidget | None,
+        pen: QPen,
+        brush: QBrush | None,
+    ) -> None:
+        # brush overrides the brush of every layer
+        lod = level_of_detail(painter, option)
+        for layer in self.layers:
+            painter.setPen(layer.pen if layer.pen is not None else pen)
+            if brush is not None:
+                painter.setBrush(brush)
+            else:
+                painter.setBrush(layer.brush if layer.brush is not None else self.brush)
+            layer.draw(painter, lod)
+        self._paint(painter, option, widget, lod)
 
     def boundingRect(self) -> QRectF:
         return self.bounding_rect
 
-    def mousePressEvent(self, event: QGraphicsSceneMouseEvent | None) -> None:
-        if not self.is_visible():
-            event.ignore()
-            return
-
-        if event.button() == Qt.MouseButton.RightButton:
-            # clear selection on all items below cursor if right clicked
-            self.actor.OnSelected(ActorSelectionState.Unselected)
-            event.ignore()
-        else:
-            return super().mousePressEvent(event)
+    def hit_test(self, point: QPointF) -> bool:
+        return self.is_visible() and self.shape().contains(point)
 
-    def mouseDoubleClickEvent(self, event: QGraphicsSceneMouseEvent | None) -> None:
-        if event.button() == Qt.MouseButton.LeftButton and self.is_visible():
-            if not self.actor.actor_rect.contains(event.scenePos()):
-                self.actor.OnSelected()
+    def _decoration_bounds(self) -> QRectF:
+        # the bounds of anything _paint draws on top of the layers
+        return QRectF()
 
-        event.ignore()
+    def _compile(self) -> list[PaintLayer]:
+        raise NotImplementedError("Child classes must implement _compile()!")
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        return NotImplementedError("Child classes must implement _paint(painter, option, widget)!")
+    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None, lod: float) -> None:
+        # anything that can't be precompiled into a path, drawn on top of the layers
+        pass
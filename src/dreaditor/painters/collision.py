@@ -1,148 +1,98 @@
 from __future__ import annotations
 
-import logging
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QPointF, QRectF
-from PySide6.QtGui import QBrush, QColor, QPainter, QPainterPath, QPen, QPolygonF
-from PySide6.QtWidgets import QStyleOptionGraphicsItem, QWidget
+from PySide6.QtGui import QBrush, QColor, QPainterPath, QPen, QPolygonF
 
-from dreaditor.painters.base_painter import BasePainterWidget
-from dreaditor.utils import vector2f
+from dreaditor.painters.base_painter import NO_BRUSH, BasePainterWidget, PaintLayer
+from dreaditor.utils import polygon2f, vector2f
 
 if TYPE_CHECKING:
-    from PySide6.QtWidgets import QStyleOptionGraphicsItem, QWidget
+    from dreaditor.scenario_data import CollisionShape
 
-LOGGER = logging.getLogger(__name__)
 
-
-def aabox2d_to_rect(aabox2d: dict, vPos: QPointF) -> QRectF:
-    halfsize = vector2f(aabox2d["data"]["size"]) / 2
-    position = vector2f(aabox2d["data"]["position"])
+def aabox2d_to_rect(shape: CollisionShape, vPos: QPointF) -> QRectF:
+    halfsize = vector2f(shape.size) / 2
+    position = vector2f(shape.position)
     p1 = vPos + position - halfsize
     p2 = vPos + position + halfsize
     return QRectF(p1, p2)
 
 
-def polycollection_to_polys(polycollection: dict, vPos: QPointF) -> list[QPolygonF]:
-    res = []
-    poly_pos = vPos + QPointF(polycollection.data.position[0], -polycollection.data.position[1])
-    for polygon in polycollection.data.polys:
-        if polygon.num_points == 0:
-            continue
-
-        poly = QPolygonF()
-        for p in polygon.points:
-            poly.append(poly_pos + vector2f([p.x, p.y]))
-        if polygon.loop:
-            poly.append(poly.first())
+def polycollection_to_polys(shape: CollisionShape, vPos: QPointF) -> list[QPolygonF]:
+    return [polygon2f(points, vPos) for points in shape.polys]
 
-        res.append(poly)
 
-    return res
+def circle_to_rect(shape: CollisionShape, vPos: QPointF) -> QRectF:
+    center = vPos + vector2f(shape.position)
+    size = shape.size[0]
+    return QRectF(center - QPointF(size, size), center + QPointF(size, size))
 
 
 class CollisionDataFileWidget(BasePainterWidget):
     config_val = "paintCollision"
+    tile_cached = True
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        rect = QRectF()
-        vPos = vector2f(self.actor.level_data.vPos)
-
-        for layer in self.actor.bmscc.raw.layers:
-            for entry in layer.entries:
-                if entry.type == "AABOX2D":
-                    r = aabox2d_to_rect(entry, vPos)
-                    painter.drawRect(r)
-                    rect = rect.united(r)
+    def _compile(self) -> list[PaintLayer]:
+        filled = QPainterPath()
+        # polylines are open, so they must not be filled
+        outlines = QPainterPath()
+        vPos = self.actor.position
 
-                elif entry.type == "POLYCOLLECTION2D":
-                    polys = polycollection_to_polys(entry, vPos)
-                    for p in polys:
-                        painter.drawPolyline(p)
-                        rect = rect.united(p.boundingRect())
+        for shape in self.actor.actordef.collision:
+            if shape.type == "AABOX2D":
+                filled.addRect(aabox2d_to_rect(shape, vPos))
 
-                elif entry.type == "CIRCLE":
-                    center = vPos + vector2f(entry.data.position)
-                    size = entry.data.size
-                    topLeft = center - QPointF(size, size)
-                    bottomRight = center + QPointF(size, size)
-                    circle_rect = QRectF(topLeft, bottomRight)
+            elif shape.type == "POLYCOLLECTION2D":
+                for p in polycollection_to_polys(shape, vPos):
+                    outlines.addPolygon(p)
 
-                    painter.drawEllipse(circle_rect)
-                    rect = rect.united(circle_rect)
+            elif shape.type == "CIRCLE":
+                filled.addEllipse(circle_to_rect(shape, vPos))
 
-        if rect != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+        return [PaintLayer(filled), PaintLayer(outlines, brush=NO_BRUSH)]
 
 
 class BmsadCollisionWidget(BasePainterWidget):
     config_val = "paintCollision"
+    tile_cached = True
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        rect = QRectF()
-        vPos = vector2f(self.actor.level_data.vPos)
-
-        for func in self.actor.bmsad.components["COLLISION"].functions:
-            if func.name == "CreateCollider":
-                if func.get_param(5) == "AABOX2D":
-                    entry = {
-                        "data": {
-                            "position": [
-                                func.get_param(6),
-                                func.get_param(7),
-                                func.get_param(8),
-                            ],
-                            "size": [func.get_param(9), func.get_param(10)],
-                        }
-                    }
-                    r = aabox2d_to_rect(entry, vPos)
-                    painter.drawRect(r)
-                    rect = rect.united(r)
-                else:
-                    LOGGER.warning(
-                        "Unknown collider type in BMSAD for actor (%s/%s/%s): %s",
-                        self.actor.ref.layer,
-                        self.actor.ref.sublayer,
-                        self.actor.ref.name,
-                        func.get_param(5),
-                    )
-
-        if rect != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+    def _compile(self) -> list[PaintLayer]:
+        path = QPainterPath()
+
+        # only AABOX2D colliders are kept in the actordef data, see ActorDefData.from_assets
+        for shape in self.actor.actordef.colliders:
+            path.addRect(aabox2d_to_rect(shape, self.actor.position))
+
+        return [PaintLayer(path)]
 
 
 class DoorPainterWidget(BasePainterWidget):
     DOOR_PEN = QPen(QColor(0, 0, 0, 255), 10)
+    DOOR_BRUSH = QBrush(QColor(255, 255, 255, 128))
     ADDITIONAL_COLLIDER_PEN = QPen(QColor(64, 0, 255, 32), 10)
     config_val = "paintDoors"
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        vPos = vector2f(self.actor.level_data.vPos)
-        door_type: str = self.actor.level_data.oActorDefLink.split("/")[2]
+    def _compile(self) -> list[PaintLayer]:
+        vPos = self.actor.position
+        door_type: str = self.actor.data.actordef.split("/")[2]
         entry_name = door_type if door_type in ["doorframe", "tunnelframe"] else "door"
 
-        col_layer = [layer for layer in self.actor.bmscc.raw.layers if layer.name == "collision_layer"][0]
-        aabox = [entry for entry in col_layer.entries if entry.name == entry_name][0]
-        rect = aabox2d_to_rect(aabox, vPos)
-
-        painter.setPen(self.DOOR_PEN)
-        painter.setBrush(QBrush(QColor(255, 255, 255, 128)))
-        painter.drawRect(rect)
+        col_layer = [shape for shape in self.actor.actordef.collision if shape.layer == "collision_layer"]
+        aabox = [shape for shape in col_layer if shape.name == entry_name][0]
+        door = QPainterPath()
+        door.addRect(aabox2d_to_rect(aabox, vPos))
+        layers = [PaintLayer(door, self.DOOR_PEN, self.DOOR_BRUSH)]
 
         # add sensor box if it's a presence door
         if "presence" in door_type:
-            sensor_aabox = [entry for entry in col_layer.entries if entry.name == "sensor"][0]
-            sensor_rect = aabox2d_to_rect(sensor_aabox, vPos)
-            painter.setBrush(QBrush(QColor(0, 0, 0, 0)))
-            painter.setPen(self.ADDITIONAL_COLLIDER_PEN)
-            painter.drawRect(sensor_rect)
+            sensor_aabox = [shape for shape in col_layer if shape.name == "sensor"][0]
+            sensor = QPainterPath()
+            sensor.addRect(aabox2d_to_rect(sensor_aabox, vPos))
+            layers.append(PaintLayer(sensor, self.ADDITIONAL_COLLIDER_PEN, NO_BRUSH))
 
-        if rect != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+        return layers
 
 
 class ShieldPainterWidget(BasePainterWidget):
@@ -162,31 +112,25 @@ class ShieldPainterWidget(BasePainterWidget):
 
     config_val = "paintDoors"
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        vPos = vector2f(self.actor.level_data.vPos)
-        side = "collision_L" if self.actor.level_data.vAng[1] < 0 else "collision_R"
-        shield_type: str = self.actor.level_data.oActorDefLink.split("/")[2]
+    def _compile(self) -> list[PaintLayer]:
+        side = "collision_L" if self.actor.data.angle[1] < 0 else "collision_R"
+        shield_type: str = self.actor.data.actordef.split("/")[2]
 
-        col_layer = [layer for layer in self.actor.bmscc.raw.layers if layer.name == "collision_layer"][0]
-        aabox = [entry for entry in col_layer.entries if entry.name == side][0]
-        polys = polycollection_to_polys(aabox, vPos)
+        col_layer = [shape for shape in self.actor.actordef.collision if shape.layer == "collision_layer"]
+        aabox = [shape for shape in col_layer if shape.name == side][0]
+        path = QPainterPath()
+        for p in polycollection_to_polys(aabox, self.actor.position):
+            path.addPolygon(p)
+            path.closeSubpath()
 
-        painter.setPen(QPen(self.SHIELD_COLORS[shield_type], 10))
-        painter.setBrush(QBrush(self.SHIELD_COLORS[shield_type]))
-        painter.brush().color().setAlpha(48)
-        bbox = QRectF()
-        for p in polys:
-            painter.drawPolygon(p)
-            bbox = bbox.united(p.boundingRect())
-
-        if polys != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = bbox
+        color = self.SHIELD_COLORS[shield_type]
+        return [PaintLayer(path, QPen(color, 10), QBrush(color))]
 
 
 class TilegroupPainterWidget(BasePainterWidget):
     config_val = "paintBreakables"
 
+    TILE_PEN = QPen(QColor(0, 0, 0), 1)
     TILE_BRUSHES: dict[int, QBrush] = {
         1: QBrush(QColor(255, 255, 255, 128)),  # powerbeam
         2: QBrush(QColor(255, 0, 255, 128)),  # bomb
@@ -199,35 +143,20 @@ class TilegroupPainterWidget(BasePainterWidget):
         9: QBrush(QColor(255, 255, 0, 128)),  # speedboost
     }
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        vPos = vector2f(self.actor.level_data.vPos)
+    def _compile(self) -> list[PaintLayer]:
+        vPos = self.actor.position
         tile_comp = self.actor.getComponent("CBreakableTileGroupComponent")
-        rect = QRectF()
-        painter.setPen(QPen(QColor(0, 0, 0), 1))
 
+        # one path per tile type, so each brush is only set once
+        paths: dict[int, QPainterPath] = {}
+        self.tiles_shape = QPainterPath()
         for tile in tile_comp.aGridTiles:
             bottomleft = vector2f(tile.vGridCoords) * 100.0 + vPos
             tile_rect = QRectF(bottomleft + QPointF(0, -100), bottomleft + QPointF(100, 0))
-            painter.setBrush(self.TILE_BRUSHES[tile.eTileType])
-            painter.drawRect(tile_rect)
-            rect = rect.united(tile_rect)
+            paths.setdefault(tile.eTileType, QPainterPath()).addRect(tile_rect)
+            self.tiles_shape.addRect(tile_rect)
 
-        if rect != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+        return [PaintLayer(path, self.TILE_PEN, self.TILE_BRUSHES[tile_type]) for tile_type, path in paths.items()]
 
     def shape(self) -> QPainterPath:
-        res = QPainterPath()
-        vPos = vector2f(self.actor.level_data.vPos)
-        tile_comp = self.actor.getComponent("CBreakableTileGroupComponent")
-
-        for tile in tile_comp.aGridTiles:
-            bottomleft = vector2f(tile.vGridCoords) * 100.0 + vPos
-            res.addRect(
-                QRectF(
-                    bottomleft + QPointF(0, -100),
-                    bottomleft + QPointF(100, 0),
-                )
-            )
-
-        return res
+        return self.tiles_shape
@@ -1,37 +1,31 @@
 from __future__ import annotations
 
 from math import cos, radians, sin
-from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QPointF, QRectF
-from PySide6.QtGui import QPainter, QPolygonF
+from PySide6.QtGui import QPainterPath, QPolygonF
 
-from dreaditor.painters.base_painter import BasePainterWidget
+from dreaditor.painters.base_painter import NO_BRUSH, BasePainterWidget, PaintLayer
 from dreaditor.utils import vector2f
 
-if TYPE_CHECKING:
-    from PySide6.QtWidgets import QStyleOptionGraphicsItem, QWidget
-
 
 class LogicShapeWidget(BasePainterWidget):
     config_val = "paintLogicShapes"
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
-        rect = QRectF(self.actor.actor_dot.bounding_rect)
+    def _geometry(self) -> tuple[list[QRectF], list[QPolygonF], list[QPolygonF]]:
+        """The rects, closed polygons and open polylines making up the logic shape."""
+        rects: list[QRectF] = []
+        polygons: list[QPolygonF] = []
+        polylines: list[QPolygonF] = []
 
         logicshape_comp = self.actor.getComponent("CLogicShapeComponent")
         if not logicshape_comp.pLogicShape:
-            if rect != self.bounding_rect:
-                self.prepareGeometryChange()
-                self.bounding_rect = rect
-
-            return
+            return rects, polygons, polylines
 
-        vPos = vector2f(self.actor.level_data.vPos) + vector2f(logicshape_comp.pLogicShape.vPos)
+        vPos = self.actor.position + vector2f(logicshape_comp.pLogicShape.vPos)
         ls_type = logicshape_comp.pLogicShape["@type"]
 
         if ls_type == "game::logic::collision::CPolygonCollectionShape":
-            rect = QRectF()
             for poly in logicshape_comp.pLogicShape.oPolyCollection.vPolys:
                 qpoly = QPolygonF()
                 for segment in poly.oSegmentData:
@@ -39,25 +33,21 @@ class LogicShapeWidget(BasePainterWidget):
 
                 if poly.bClosed:
                     qpoly.append(qpoly.first())
-                    painter.drawPolygon(qpoly)
+                    polygons.append(qpoly)
                 else:
-                    painter.drawPolyline(qpoly)
-
-                rect = rect.united(qpoly.boundingRect())
+                    polylines.append(qpoly)
 
         elif ls_type == "game::logic::collision::CAABoxShape2D":
             p1 = vPos + vector2f(logicshape_comp.pLogicShape.v2Min)
             p2 = vPos + vector2f(logicshape_comp.pLogicShape.v2Max)
-            rect = QRectF(p1, p2)
-            painter.drawRect(rect)
+            rects.append(QRectF(p1, p2))
         elif ls_type == "game::logic::collision::COBoxShape2D":
             halfExtent = vector2f(logicshape_comp.pLogicShape.v2Extent) / 2
             rads = radians(logicshape_comp.pLogicShape.fDegrees)
 
             # do a simple rect draw if aligned
             if rads == 0:
-                rect = QRectF(vPos - halfExtent, vPos + halfExtent)
-                painter.drawRect(rect)
+                rects.append(QRectF(vPos - halfExtent, vPos + halfExtent))
             else:
                 # cache some values for rotations
                 s = sin(rads)
@@ -83,8 +73,7 @@ class LogicShapeWidget(BasePainterWidget):
                 poly.append(bottomright)
                 poly.append(bottomleft)
                 poly.append(topleft)
-                rect = poly.boundingRect()
-                painter.drawPolygon(poly)
+                polygons.append(poly)
 
         else:
             self.actor.logger.warning(
@@ -95,6 +84,19 @@ class LogicShapeWidget(BasePainterWidget):
                 self.actor.ref.name,
             )
 
-        if rect != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+        return rects, polygons, polylines
+
+    def _compile(self) -> list[PaintLayer]:
+        rects, polygons, polylines = self._geometry()
+        filled = QPainterPath()
+        for r in rects:
+            filled.addRect(r)
+        for p in polygons:
+            filled.addPolygon(p)
+            filled.closeSubpath()
+
+        outlines = QPainterPath()
+        for p in polylines:
+            outlines.addPolygon(p)
+
+        return [PaintLayer(filled), PaintLayer(outlines, brush=NO_BRUSH)]
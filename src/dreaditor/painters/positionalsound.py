@@ -1,15 +1,9 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-
 from PySide6.QtCore import QPointF, QRectF
-from PySide6.QtGui import QColor, QPainter, QPainterPath, QRadialGradient
-
-from dreaditor.painters.base_painter import BasePainterWidget
-from dreaditor.utils import vector2f
+from PySide6.QtGui import QBrush, QColor, QPainterPath, QRadialGradient
 
-if TYPE_CHECKING:
-    from PySide6.QtWidgets import QStyleOptionGraphicsItem, QWidget
+from dreaditor.painters.base_painter import BasePainterWidget, PaintLayer
 
 
 class PositionalSoundWidget(BasePainterWidget):
@@ -18,14 +12,15 @@ class PositionalSoundWidget(BasePainterWidget):
     COLOR_WEAK = QColor(0, 255, 255, 48)
     config_val = "paintPositionalSound"
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
+    def _compile(self) -> list[PaintLayer]:
         ps_comp = self.actor.getComponent("CPositionalSoundComponent")
-        vPos = vector2f(self.actor.level_data.vPos)
+        vPos = self.actor.position
         minAtt = ps_comp.fMinAtt
         maxAtt = ps_comp.fMaxAtt
 
         sizePoint = QPointF(maxAtt, maxAtt)
-        rect = QRectF(vPos - sizePoint, vPos + sizePoint)
+        self.sound_shape = QPainterPath()
+        self.sound_shape.addEllipse(QRectF(vPos - sizePoint, vPos + sizePoint))
 
         gradient = QRadialGradient(vPos, maxAtt)
         gradient.setColorAt(0, self.COLOR_MAX)
@@ -33,14 +28,7 @@ class PositionalSoundWidget(BasePainterWidget):
         gradient.setColorAt(minAtt / maxAtt + 0.001, self.COLOR_STRONG)
         gradient.setColorAt(1, self.COLOR_WEAK)
 
-        painter.setBrush(gradient)
-        painter.drawEllipse(rect)
-
-        if self.bounding_rect != rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+        return [PaintLayer(self.sound_shape, brush=QBrush(gradient))]
 
     def shape(self) -> QPainterPath:
-        res = QPainterPath()
-        res.addEllipse(self.bounding_rect)
-        return res
+        return self.sound_shape
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import math
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QPointF, QRectF
-from PySide6.QtGui import QColor, QFont, QPainter, QPen
+from PySide6.QtGui import QBrush, QColor, QFont, QFontMetricsF, QPainter, QPainterPath, QPen
 
-from dreaditor.painters.base_painter import BasePainterWidget
+from dreaditor.level_of_detail import MIN_TEXT_PX
+from dreaditor.painters.base_painter import NO_BRUSH, NO_PEN, BasePainterWidget, PaintLayer
 from dreaditor.utils import vector2f
 
 if TYPE_CHECKING:
@@ -14,49 +14,53 @@ if TYPE_CHECKING:
 
 GRAPH_COLOR = QColor(255, 255, 255, 128)
 TEXT_COLOR = QColor(0, 0, 0, 150)
+EDGE_PEN = QPen(GRAPH_COLOR, 25)
+NODE_SIZE = 75
+NODE_OFFSET = QPointF(NODE_SIZE / 2, NODE_SIZE / 2)
+LABEL_SIZE = 75
 
 
 class WorldGraphWidget(BasePainterWidget):
     config_val = "paintWorldGraph"
+    labels: list[tuple[QPointF, str]]
 
-    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
+    def _compile(self) -> list[PaintLayer]:
         worldgraph = self.actor.getComponent("CWorldGraph")
-        nodes: dict[str, QPointF] = {}
-        topLeft = QPointF(math.inf, math.inf)
-        bottomRight = QPointF(-math.inf, -math.inf)
-
-        for node in worldgraph.tNodes:
-            point = vector2f(node.vPos)
-            nodes[node.sID] = point
-
-            if point.x() < topLeft.x():
-                topLeft.setX(point.x())
-            if point.x() > bottomRight.x():
-                bottomRight.setX(point.x())
-            if point.y() < topLeft.y():
-                topLeft.setY(point.y())
-            if point.y() > bottomRight.y():
-                bottomRight.setY(point.y())
-
-        for node in worldgraph.tNodes:
-            # Draw lines
-            painter.setPen(QPen(GRAPH_COLOR, 25))
+        nodes: dict[str, QPointF] = {node.sID: vector2f(node.vPos) for node in worldgraph.tNodes}
+
+        edges = QPainterPath()
+        points = QPainterPath()
+        self.labels = []
+        for i, node in enumerate(worldgraph.tNodes):
+            pos = nodes[node.sID]
             for other in node.tNeighboursIds:
-                painter.drawLine(nodes[node.sID], nodes[other])
+                edges.moveTo(pos)
+                edges.lineTo(nodes[other])
+
+            # same footprint as drawPoint with a square-capped pen of width NODE_SIZE
+            points.addRect(QRectF(pos - NODE_OFFSET, pos + NODE_OFFSET))
+            self.labels.append((pos, f"{i}: {node.sID}"))
+
+        return [PaintLayer(edges, EDGE_PEN, NO_BRUSH), PaintLayer(points, NO_PEN, QBrush(GRAPH_COLOR))]
 
-            # Draw node
-            painter.setPen(QPen(GRAPH_COLOR, 75))
-            painter.drawPoint(nodes[node.sID])
+    def _decoration_bounds(self) -> QRectF:
+        font = QFont()
+        font.setPixelSize(LABEL_SIZE)
+        metrics = QFontMetricsF(font)
+
+        bounds = QRectF()
+        for pos, label in self.labels:
+            bounds = bounds.united(metrics.boundingRect(label).translated(pos))
+        return bounds
+
+    def _paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None, lod: float) -> None:
+        if LABEL_SIZE * lod < MIN_TEXT_PX:
+            return
 
         # Draw node ID
         font = QFont(painter.font())
-        font.setPixelSize(75)
+        font.setPixelSize(LABEL_SIZE)
         painter.setFont(font)
         painter.setPen(QPen(TEXT_COLOR, 75))
-        for i, node in enumerate(worldgraph.tNodes):
-            painter.drawText(nodes[node.sID], f"{i}: {node.sID}")
-
-        rect = QRectF(topLeft, bottomRight)
-        if rect != self.bounding_rect:
-            self.prepareGeometryChange()
-            self.bounding_rect = rect
+        for pos, label in self.labels:
+            painter.drawText(pos, label)
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QRectF, QSize
+from PySide6.QtGui import QImage, QPainter, QTransform
+from PySide6.QtSvg import QSvgGenerator
+from PySide6.QtWidgets import QApplication
+
+from dreaditor import setup_logging
+from dreaditor.config import PAINT_OPTIONS, CurrentConfiguration
+from dreaditor.constants import Scenario
+from dreaditor.rom_manager import shared_romfs
+from dreaditor.widgets.scenario_scene import ScenarioScene
+from dreaditor.widgets.scenario_viewer import BACKGROUND, ScenarioViewer
+
+if TYPE_CHECKING:
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+
+    from dreaditor.actor import Actor
+    from dreaditor.scenario_data import ScenarioData
+
+LOGGER = logging.getLogger(__name__)
+
+# margin around the scenario's content, in scene units
+RENDER_PADDING = 500.0
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderJob:
+    romfs: Path
+    scenario: Scenario
+    output: Path
+    format: str
+    width: int
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderResult:
+    job: RenderJob
+    # the file that was written, or None if the scenario was skipped or failed
+    path: Path | None
+    message: str
+    seconds: float
+    skipped: bool = False
+
+
+def parse_scenario(name: str) -> Scenario:
+    for scenario in Scenario:
+        if name.upper() == scenario.name or name == scenario.value:
+            return scenario
+    raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+
+
+def parse_paint_options(values: list[str]) -> dict[str, bool]:
+    options = {}
+    for value in values:
+        key, _, flag = value.partition("=")
+        if key not in PAINT_OPTIONS:
+            raise argparse.ArgumentTypeError(f"Unknown painting option: {key}")
+        if flag.lower() not in ("true", "false", "1", "0", "on", "off"):
+            raise argparse.ArgumentTypeError(f"Invalid value for {key}: {flag}")
+        options[key] = flag.lower() in ("true", "1", "on")
+    return options
+
+
+def run_render(args: argparse.Namespace) -> int:
+    """Renders every requested scenario of every RomFS in a process pool. Returns the exit code."""
+    try:
+        scenarios = [parse_scenario(name) for name in args.scenarios] or list(Scenario)
+        options = parse_paint_options(args.set)
+    except argparse.ArgumentTypeError as e:
+        LOGGER.error("%s", e)
+        return 2
+
+    romfs_dirs = args.romfs or ([Path(CurrentConfiguration["romfs_dir"])] if CurrentConfiguration["romfs_dir"] else [])
+    if not romfs_dirs:
+        LOGGER.error("No RomFS selected! Pass --romfs or select one in the editor first.")
+        return 2
+
+    jobs = [
+        RenderJob(romfs, scenario, args.output, args.format, args.width)
+        for romfs in romfs_dirs
+        for scenario in scenarios
+    ]
+
+    start = time.perf_counter()
+    failed = 0
+    # spawn rather than fork, Qt can't be used from a forked process
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(args.jobs, len(jobs))),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(options,),
+    ) as pool:
+        futures = [pool.submit(render_scenario, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.path is None and not result.skipped:
+                failed += 1
+            LOGGER.info("%s %s: %s (%.1fs)", result.job.romfs, result.job.scenario.name, result.message, result.seconds)
+
+    LOGGER.info("Rendered %i scenarios in %.1fs, %i failed", len(jobs) - failed, time.perf_counter() - start, failed)
+    return 1 if failed else 0
+
+
+def _init_worker(options: dict[str, bool]):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    setup_logging("WARNING", "WARNING", None)
+
+    # static items only draw themselves through the viewer's tile cache when it is enabled, and the scene is rendered
+    # without the viewer, which never paints and so would never build its actors
+    CurrentConfiguration.override({**options, "tileCache": False, "lazyActors": False})
+    QApplication([])
+
+
+def render_scenario(job: RenderJob) -> RenderResult:
+    start = time.perf_counter()
+    try:
+        editor = shared_romfs(job.romfs)
+        if editor.version not in job.scenario.game_versions:
+            return RenderResult(
+                job, None, f"skipped, not in {editor.version.name}", time.perf_counter() - start, skipped=True
+            )
+
+        viewer = _load_scenario(editor, job)
+        path = job.output.joinpath(editor.version.name, f"{job.scenario.value}.{job.format}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _render(viewer, path, job)
+        return RenderResult(job, path, f"wrote {path}", time.perf_counter() - start)
+    except Exception as e:
+        LOGGER.exception("Failed to render %s", job.scenario.name)
+        return RenderResult(job, None, f"failed: {e}", time.perf_counter() - start)
+
+
+def _load_scenario(editor: FileTreeEditor, job: RenderJob) -> ScenarioViewer:
+    """Builds the scene of a scenario the same way the editor does, from the loader's signals."""
+    # the editor imports this module for its command line, but shouldn't import the asset formats until it needs them
+    from dreaditor.scenario_loader import ScenarioLoader
+
+    viewer = ScenarioViewer(ScenarioScene(), None)
+    loader = ScenarioLoader(job.scenario, editor, job.romfs, None, viewer)
+    errors = []
+
+    def on_map_loaded(data: ScenarioData):
+        viewer.set_bounds(data.bounds_min, data.bounds_max)
+        viewer.add_map_geo(data.navmeshes, None, -1000)
+
+    def on_actors_loaded(actors: list[Actor]):
+        for actor in actors:
+            viewer.add_actor(actor)
+
+    def on_subareas_loaded(data: ScenarioData):
+        for cc in data.collision_cameras:
+            viewer.add_collision_camera(cc)
+
+    # the loader runs on this thread, so the signals are delivered immediately
+    loader.map_loaded.connect(on_map_loaded)
+    loader.actors_loaded.connect(on_actors_loaded)
+    loader.subareas_loaded.connect(on_subareas_loaded)
+    loader.failed.connect(errors.append)
+    loader.run()
+
+    if errors:
+        raise RuntimeError(errors[0])
+    return viewer
+
+
+def _content_rect(viewer: ScenarioViewer) -> QRectF:
+    # the cluster item pads its bounds for markers sized in pixels, so it doesn't count
+    rect = QRectF()
+    for item in viewer.scene().items():
+        if item is not viewer.cluster_item:
+            rect = rect.united(item.sceneBoundingRect())
+    return rect.adjusted(-RENDER_PADDING, -RENDER_PADDING, RENDER_PADDING, RENDER_PADDING)
+
+
+def _render(viewer: ScenarioViewer, path: Path, job: RenderJob):
+    source = _content_rect(viewer)
+    scale = job.width / source.width()
+    size = QSize(job.width, max(1, round(source.height() * scale)))
+
+    # cluster the actors like the editor would at this zoom
+    viewer.setTransform(QTransform.fromScale(scale, scale))
+    viewer.update_level_of_detail()
+
+    if job.format == "svg":
+        device = QSvgGenerator()
+        device.setFileName(str(path))
+        device.setSize(size)
+        device.setViewBox(QRectF(0, 0, size.width(), size.height()))
+        device.setTitle(f"{job.scenario.long_name} ({job.scenario.value})")
+    else:
+        device = QImage(size, QImage.Format.Format_RGB32)
+
+    painter = QPainter(device)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    target = QRectF(0, 0, size.width(), size.height())
+    painter.fillRect(target, BACKGROUND)
+    viewer.scene().render(painter, target, source)
+    painter.end()
+
+    if job.format == "png" and not device.save(str(path)):
+        raise OSError(f"Could not write {path}")
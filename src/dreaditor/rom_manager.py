@@ -1,90 +1,319 @@
 from __future__ import annotations
 
 import logging
+import time
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
-from mercury_engine_data_structures.formats.bmmap import Bmmap
-from mercury_engine_data_structures.formats.bmsad import Bmsad
-from mercury_engine_data_structures.formats.bmscc import Bmscc
-from mercury_engine_data_structures.formats.brfld import ActorLayer, Brfld
-from mercury_engine_data_structures.formats.brsa import Brsa
-from mercury_engine_data_structures.game_check import Game
-from mercury_engine_data_structures.romfs import ExtractedRomFs
-from PySide6.QtCore import Qt
-
-from dreaditor.actor import Actor
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from dreaditor.actor_index import ActorIndex
 from dreaditor.actor_reference import ActorRef
+from dreaditor.actor_search import ActorSearchIndex
+from dreaditor.actordef_parser import SharedActorDefParser
+from dreaditor.asset_cache import PARSED_SIZE_FACTOR, SharedAssetCache, SharedScenarioAssets
 from dreaditor.config import CurrentConfiguration
+from dreaditor.tracing import SharedTracer, parse_span, traced
 
 if TYPE_CHECKING:
+    from construct import Container
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+    from mercury_engine_data_structures.formats.bmsad import Bmsad
+    from mercury_engine_data_structures.formats.bmscc import Bmscc
+    from mercury_engine_data_structures.formats.brfld import Brfld
+
+    from dreaditor.actor import Actor
     from dreaditor.constants import Scenario
     from dreaditor.main_window import DreaditorWindow
+    from dreaditor.scenario_data import ScenarioData
+    from dreaditor.scenario_loader import ScenarioLoader
     from dreaditor.widgets.collision_camera_item import CollisionCameraItem
 
 
-class RomManager:
+def open_romfs(path: Path) -> FileTreeEditor:
+    """
+    Raises ValueError if path is not an extracted Metroid Dread RomFS. The file index is reused from an earlier run if
+    the RomFS didn't change since, see RomFsIndex.
+    """
+    # importing any format imports all of them, which takes longer than the rest of startup
+    from mercury_engine_data_structures.game_check import Game
+
+    from dreaditor.romfs_index import IndexedFileTreeEditor, IndexedRomFs
+
+    with SharedTracer.span("index romfs", "load", {"path": path.as_posix()}):
+        return IndexedFileTreeEditor(IndexedRomFs(path), target_game=Game.DREAD)
+
+
+# worker processes open every RomFS once and keep it for the rest of their jobs
+_shared_editors: dict[Path, FileTreeEditor] = {}
+
+
+def shared_romfs(path: Path) -> FileTreeEditor:
+    """Like open_romfs, but reuses the editor of an earlier call in this process."""
+    if path not in _shared_editors:
+        _shared_editors[path] = open_romfs(path)
+    return _shared_editors[path]
+
+
+class RomIndexer(QObject):
+    """Indexes the files of a RomFS on a worker thread. The result is also kept, for whoever waits on the thread."""
+
+    finished = Signal(object)
+    failed = Signal(str)
+
+    path: str
+    editor: FileTreeEditor | None
+
+    def __init__(self, path: str):
+        super().__init__(None)
+        self.logger = logging.getLogger(type(self).__name__)
+        self.path = path
+        self.editor = None
+
+    @Slot()
+    def run(self):
+        try:
+            self.editor = open_romfs(Path(self.path))
+        except (ValueError, OSError) as e:
+            self.logger.warning("RomFS is not valid! path=%s", self.path)
+            self.failed.emit(str(e))
+        except Exception as e:
+            self.logger.exception("Failed to index RomFS at %s", self.path)
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(self.editor)
+
+
+class RomManager(QObject):
+    scenario_load_progress = Signal(int, int, str)
+    scenario_load_finished = Signal(object)
+    # emitted instead of scenario_load_finished when loading the scenario raised, with the error
+    scenario_load_failed = Signal(object, str)
+    # emitted once a RomFS finished indexing, or failed to
+    rom_selected = Signal()
+
     main_window: DreaditorWindow
     editor: FileTreeEditor | None
     path: str | None
+    indexer: RomIndexer | None
 
     isScenarioLoaded: bool = False
     scenario: Scenario | None
     actors: list[Actor]
-    brfld: Brfld | None
+    actor_index: ActorIndex
+    search_index: ActorSearchIndex
+    # actors matching the filter of the actor and subarea trees, or None if nothing is filtered
+    actor_filter: set[Actor] | None
+    filter_text: str
+    scenario_data: ScenarioData | None
+    loader: ScenarioLoader | None
 
     def __init__(self, main_window: DreaditorWindow):
+        super().__init__(None)
         self.logger = logging.getLogger(type(self).__name__)
         self.main_window = main_window
         self.editor = None
         self.path = CurrentConfiguration["romfs_dir"]
         self.logger.info("Path loaded from config: %s", self.path)
         self.actors = []
-        self.select_rom(self.path)
+        self.actor_index = ActorIndex()
+        self.search_index = ActorSearchIndex()
+        self.actor_filter = None
+        self.filter_text = ""
+        self.scenario_data = None
+        self.collision_cameras = {}
+        self.loader = None
+        self._load_threads: dict[QThread, ScenarioLoader] = {}
+        self.indexer = None
+        self._index_threads: dict[QThread, RomIndexer] = {}
+        # when the current load started, for its trace span
+        self._load_started = 0
+        # the error the current load failed with, if any
+        self._load_error: str | None = None
 
     def select_rom(self, path: str):
-        if path is None:
+        """
+        Starts indexing the RomFS at path on a worker thread; rom_selected is emitted once it's done. Indexing a RomFS
+        takes a while, and the first one also imports the asset formats, so the window can be shown in the meantime.
+        """
+        if not path:
             return
 
         self.path = path
-        try:
-            self.editor = FileTreeEditor(ExtractedRomFs(Path(path)), target_game=Game.DREAD)
-            self.logger.info(f"Selected RomFS at {path} with version {self.editor.version}")
-            CurrentConfiguration["romfs_dir"] = path
-        except ValueError:
-            self.editor = None
+        self.editor = None
+        # parsed assets belong to the previous RomFS
+        SharedAssetCache.clear()
+        SharedScenarioAssets.clear()
+
+        self.indexer = RomIndexer(path)
+        thread = QThread()
+        self.indexer.moveToThread(thread)
+        thread.started.connect(self.indexer.run)
+        self.indexer.finished.connect(self.on_rom_indexed)
+        self.indexer.failed.connect(self.on_rom_index_failed)
+        self.indexer.finished.connect(thread.quit)
+        self.indexer.failed.connect(thread.quit)
+        thread.finished.connect(lambda: self._index_threads.pop(thread, None))
+
+        # like scenario loads, an indexer that was replaced still runs to the end
+        self._index_threads[thread] = self.indexer
+        thread.start()
+
+    def is_indexing(self) -> bool:
+        return self.indexer is not None
+
+    def wait_for_rom(self):
+        """Blocks until the RomFS being indexed, if any, is ready."""
+        indexer = self.indexer
+        if indexer is None:
+            return
+
+        for thread, thread_indexer in list(self._index_threads.items()):
+            if thread_indexer is indexer:
+                # its finished signal can't quit the thread while this one is blocked, so quit it right away. the
+                # thread still runs the indexer to the end first
+                thread.quit()
+                thread.wait()
+        # the signals of the indexer are still queued, and are ignored once it's no longer current
+        self._set_editor(indexer.editor)
+
+    def _is_current_indexer(self) -> bool:
+        return self.indexer is not None and self.sender() is self.indexer
+
+    @Slot(object)
+    def on_rom_indexed(self, editor: FileTreeEditor):
+        if self._is_current_indexer():
+            self._set_editor(editor)
+
+    @Slot(str)
+    def on_rom_index_failed(self, message: str):
+        if self._is_current_indexer():
+            self._set_editor(None)
+
+    def _set_editor(self, editor: FileTreeEditor | None):
+        self.indexer = None
+        self.editor = editor
+        if editor is not None:
+            self.logger.info(f"Selected RomFS at {self.path} with version {editor.version}")
+            CurrentConfiguration["romfs_dir"] = self.path
+        else:
             self.path = None
-            self.logger.warning("RomFS is not valid! path=%s", path)
+        self.rom_selected.emit()
 
     def assert_rom_selected(self) -> bool:
-        if self.editor is None:
-            if self.path is None:
-                return False
-
+        if self.editor is None and not self.is_indexing():
             self.select_rom(self.path)
-            return self.assert_rom_selected()
-
-        return True
+        self.wait_for_rom()
+        return self.editor is not None
 
     def open_scenario(self, scenario: Scenario):
+        from dreaditor.scenario_loader import ScenarioLoader
+
         if not self.assert_rom_selected():
             self.logger.warning("No ROM selected!")
             return
 
+        # drop whatever is still in flight for the previous scenario
+        self.cancel_scenario_load()
+        self.reset_scenario(scenario)
+        SharedScenarioAssets.on_scenario_opened(scenario)
+        self._load_started = time.perf_counter_ns()
+        self._load_error = None
+
+        self.loader = ScenarioLoader(
+            scenario,
+            self.editor,
+            Path(self.path),
+            self.main_window.actor_data_tree,
+            self.main_window.scenario_viewer,
+        )
+        thread = QThread()
+        self.loader.moveToThread(thread)
+        thread.started.connect(self.loader.run)
+        self.loader.progress.connect(self.on_load_progress)
+        self.loader.brfld_loaded.connect(self.on_brfld_loaded)
+        self.loader.map_loaded.connect(self.on_map_loaded)
+        self.loader.actors_loaded.connect(self.on_actors_loaded)
+        self.loader.subareas_loaded.connect(self.on_subareas_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader.finished.connect(self.on_load_finished)
+        self.loader.finished.connect(thread.quit)
+        thread.finished.connect(lambda: self._load_threads.pop(thread, None))
+
+        # keep the thread and its worker alive until the thread exits, even if a newer load replaces them
+        self._load_threads[thread] = self.loader
+        thread.start()
+
+    def reset_scenario(self, scenario: Scenario):
         self.scenario = scenario
-        self.brfld = self.editor.get_parsed_asset(scenario.scenario_file("brfld"), type_hint=Brfld)
-        self.isScenarioLoaded = True
-
+        self.isScenarioLoaded = False
+        self.scenario_data = None
         self.actors.clear()
-
-        self.bmmap = self.editor.get_parsed_asset(scenario.scenario_file("bmmap"), type_hint=Bmmap)
+        self.actor_index.clear()
+        self.search_index.clear()
+        # actors are added unfiltered, the filter is applied again once they are all loaded
+        self.actor_filter = None
+        self.collision_cameras = {}
+
+    def cancel_scenario_load(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+
+    def is_loading(self) -> bool:
+        return self.loader is not None
+
+    def shown_actor_count(self) -> int:
+        """The number of actors checked and not filtered out. The actor list keeps it up to date as they change."""
+        return self.main_window.entity_list_tree.tree_model.top.shown_count
+
+    def shutdown(self):
+        self.cancel_scenario_load()
+        for thread in [*self._load_threads.keys(), *self._index_threads.keys()]:
+            thread.quit()
+            thread.wait()
+        SharedActorDefParser.shutdown()
+
+    def _is_current_loader(self) -> bool:
+        # results queued by a cancelled loader may still arrive after a new scenario was chosen
+        return self.loader is not None and self.sender() is self.loader
+
+    @Slot(int, int, str)
+    def on_load_progress(self, done: int, total: int, message: str):
+        if self._is_current_loader():
+            self.scenario_load_progress.emit(done, total, message)
+
+    @Slot(object, int)
+    def on_brfld_loaded(self, brfld: Brfld, size: int):
+        if self._is_current_loader():
+            name = self.scenario.scenario_file("brfld")
+            SharedScenarioAssets.put(self.scenario, name, brfld, size * PARSED_SIZE_FACTOR)
+
+    @Slot(object)
+    def on_map_loaded(self, data: ScenarioData):
+        if self._is_current_loader():
+            self.show_map(data)
+
+    @Slot(list)
+    def on_actors_loaded(self, actors: list[Actor]):
+        if self._is_current_loader():
+            self.add_actors(actors)
+
+    @Slot(object)
+    def on_subareas_loaded(self, data: ScenarioData):
+        if self._is_current_loader():
+            self.populate_subareas(data)
+
+    # the steps of building a scenario from the loader's results. they are separate from the slots above so they can be
+    # run and timed without a loader, see tools/benchmark_scenario_load.py
+    @traced("load", "show map")
+    def show_map(self, data: ScenarioData):
+        self.scenario_data = data
+        self.isScenarioLoaded = True
 
         # draw map
-        gridDef = self.bmmap.raw.Root.gridDef
-        self.main_window.scenario_viewer.set_bounds(gridDef.vGridMin, gridDef.vGridMax)
-        for geo in self.bmmap.raw.Root.aNavmeshGeos:
-            self.main_window.scenario_viewer.add_map_geo(geo.aVertex, geo.aIndex, None, -1000)
+        self.main_window.scenario_viewer.set_bounds(data.bounds_min, data.bounds_max)
+        self.main_window.scenario_viewer.add_map_geo(data.navmeshes, None, -1000)
 
         # TODO fix the bug where these disappear
         # might be fixed when i make it only use the outline and draw borders correctly?
@@ -100,73 +329,137 @@ class RomManager:
         #     for _, geo in outgeo.items():
         #         self.main_window.scenario_viewer.addMapGeo(geo.aVertex, geo.aIndex, QColor(255, 255, 255, 128), -800)
 
-        for layerName, layer in self.brfld.raw.Root.pScenario.items():
-            if layerName in ["sLevelID", "sScenarioID", "vLayerFiles"]:
-                continue
-
-            for sublayerName, sublayer in layer.dctSublayers.items():
-                for actorName, actorData in sublayer.dctActors.items():
-                    actor = Actor(
-                        ActorRef(self.scenario, layerName, sublayerName, actorName),
-                        actorData,
-                        self.editor,
-                        self.main_window.actor_data_tree,
-                        self.main_window.scenario_viewer,
-                    )
-                    self.actors.append(actor)
-                    self.main_window.entity_list_tree.add_actor(actor)
-                    self.main_window.scenario_viewer.add_actor(actor)
-
-        self.bmscc = self.editor.get_parsed_asset(scenario.scenario_file("bmscc"), type_hint=Bmscc)
+    def add_actors(self, actors: list[Actor]):
+        with SharedTracer.span("add actors to scene", "load", {"count": len(actors)}):
+            for actor in actors:
+                self.actors.append(actor)
+                self.actor_index.add(actor)
+                self.search_index.add(actor)
+                self.main_window.scenario_viewer.add_actor(actor)
+        with SharedTracer.span("add actors to tree", "tree", {"count": len(actors)}):
+            self.main_window.entity_list_tree.add_actors(actors)
+
+    @traced("tree", "populate subareas")
+    def populate_subareas(self, data: ScenarioData):
+        scenario = self.scenario
         ccs: dict[str, CollisionCameraItem] = {}
-        for cc in self.bmscc.raw.layers[0].entries:
+        for cc in data.collision_cameras:
             ccs[cc.name] = self.main_window.scenario_viewer.add_collision_camera(cc)
+        self.collision_cameras = ccs
+
+        for group in data.subareas:
+            actors = []
+            for layer, sublayer, name in group.actors:
+                actor = self.get_actor_from_ref(ActorRef(scenario, layer, sublayer, name))
+                if actor is None:
+                    continue
+                actor.add_cc(group.setup_id, group.subarea_id)
+                actors.append(actor)
+
+            self.main_window.subareas_list_tree.add_actor_group(
+                group.setup_id,
+                group.subarea_id,
+                group.group_name,
+                actors,
+                ccs.get(group.subarea_id, None),
+            )
+
+    def finish_scenario(self):
+        with SharedTracer.span("sort trees", "tree"):
+            self.main_window.entity_list_tree.on_scenario_loaded()
+            self.main_window.subareas_list_tree.on_scenario_loaded()
+        self.set_actor_filter(self.filter_text)
+
+    @Slot(str)
+    def on_load_failed(self, message: str):
+        if self._is_current_loader():
+            self.logger.error("Loading %s failed: %s", self.scenario.name, message)
+            self._load_error = message
+
+    @Slot()
+    def on_load_finished(self):
+        if not self._is_current_loader():
+            return
 
-        self.brsa = self.editor.get_parsed_asset(scenario.scenario_file("brsa"), type_hint=Brsa)
-        for setup in self.brsa.raw.Root.pSubareaManager.vSubareaSetups:
-            setup_id = setup.sId
-            for subarea in setup.vSubareaConfigs:
-                subarea_id = subarea.sId
-                actor_groups = {
-                    ActorLayer.LIGHTS: subarea.asItemsIds[1],
-                    ActorLayer.SOUNDS: subarea.asItemsIds[2],
-                    ActorLayer.ENTITIES: subarea.asItemsIds[4],
-                }
-
-                for actor_layer, actor_group_name in actor_groups.items():
-                    if actor_group_name == "":
-                        continue
-                    try:
-                        ag = self.brfld.get_actor_group(actor_group_name, actor_layer)
-                        for actor_link in ag:
-                            actor_link_parts = actor_link.split(":")
-                            actor = self.get_actor_from_ref(
-                                ActorRef(scenario, actor_link_parts[2], actor_link_parts[4], actor_link_parts[6])
-                            )
-                            actor.add_cc(setup_id, subarea_id)
-                            self.main_window.subareas_list_tree.add_actor(
-                                setup_id,
-                                subarea_id,
-                                actor_group_name,
-                                actor,
-                                ccs.get(subarea_id, None),
-                            )
-                    except KeyError:
-                        self.logger.info("Missing actor group: %s", actor_group_name)
-                        continue
-        self.main_window.subareas_list_tree.root_node.setCheckState(0, Qt.CheckState.Checked)
+        self.loader = None
+        # the loader also finishes after failing, with only part of the scenario built
+        if self._load_error is not None:
+            self.scenario_load_failed.emit(self.scenario, self._load_error)
+            return
+
+        self.finish_scenario()
+        SharedTracer.add_event(
+            "open scenario", "load", self._load_started, time.perf_counter_ns(), {"scenario": self.scenario.value}
+        )
+        SharedScenarioAssets.on_scenario_built(self.scenario)
+        self.logger.info("Loaded %s; asset cache: %s", self.scenario.name, SharedAssetCache.stats())
+        self.logger.info(SharedScenarioAssets.report())
+        self.scenario_load_finished.emit(self.scenario)
+
+    @traced("filter", "filter actors")
+    def set_actor_filter(self, text: str):
+        """
+        Hides the actors not matching text from the actor and subarea trees and the scene.
+
+        Only the actors whose filter state changed since the last call are updated, so refining a search as it is typed
+        stays cheap on scenarios with thousands of actors.
+        """
+        self.filter_text = text
+        if self.is_loading():
+            # applied to all actors at once when loading finishes
+            return
+
+        matches = self.search_index.match(text)
+        if matches is None and self.actor_filter is None:
+            return
+
+        # None matches every actor. only the actors outside of the other set change, so no set of every actor is made
+        if self.actor_filter is None:
+            changed_actors = [actor for actor in self.actors if actor not in matches]
+        elif matches is None:
+            changed_actors = [actor for actor in self.actors if actor not in self.actor_filter]
+        else:
+            changed_actors = list(self.actor_filter ^ matches)
+        self.actor_filter = matches
+
+        for actor in changed_actors:
+            actor.UpdateFilterState(matches is not None and actor not in matches)
+
+        self.main_window.entity_list_tree.on_actors_filtered(changed_actors, matches)
+        self.main_window.subareas_list_tree.on_actors_filtered(changed_actors, matches)
 
     def get_actor_from_ref(self, ref: ActorRef) -> Actor | None:
-        actors = [actor for actor in self.actors if actor.ref == ref]
+        actor = self.actor_index.get(ref)
+
+        if actor is None:
+            self.logger.warning("Actor not retrieved! No actor matches %s", ref)
 
-        if len(actors) != 1:
-            self.logger.warning("Actor not retrieved! Found %i matching actors", len(actors))
-            return None
+        return actor
 
-        return actors[0]
+    def get_level_data(self, ref: ActorRef) -> Container:
+        # scenarios loaded from the scenario cache never parse the brfld, and the retention policy may have released it,
+        # so parse it when it's needed
+        name = ref.scenario.scenario_file("brfld")
+        brfld = SharedScenarioAssets.get(ref.scenario, name)
+        if brfld is None:
+            from mercury_engine_data_structures.formats.brfld import Brfld
+
+            with parse_span(name):
+                data = self.editor.get_raw_asset(name)
+                brfld = Brfld.parse(data, target_game=self.editor.target_game, editor=self.editor)
+            SharedScenarioAssets.put(ref.scenario, name, brfld, len(data) * PARSED_SIZE_FACTOR)
+
+        return brfld.raw.Root.pScenario[ref.layer].dctSublayers[ref.sublayer].dctActors[ref.name]
 
     def get_actor_def(self, adef: str) -> Bmsad:
         if adef.startswith("actordef:"):
             adef = adef[9:]
 
-        return self.editor.get_parsed_asset(adef, type_hint=Bmsad)
+        from mercury_engine_data_structures.formats.bmsad import Bmsad
+
+        return SharedAssetCache.get_parsed_asset(self.editor, adef, Bmsad)
+
+    def get_collision_file(self, path: str) -> Bmscc:
+        from mercury_engine_data_structures.formats.bmscc import Bmscc
+
+        return SharedAssetCache.get_parsed_asset(self.editor, path, Bmscc)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import collections
+import copy
+import functools
+import hashlib
+import json
+import logging
+import os
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING
+
+from construct import Container, ListContainer
+from mercury_engine_data_structures.base_resource import resolve_asset_id
+from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+from mercury_engine_data_structures.formats.toc import Toc
+from mercury_engine_data_structures.game_check import GameVersion
+from mercury_engine_data_structures.romfs import ExtractedRomFs
+
+import dreaditor
+from dreaditor.tracing import SharedTracer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+INDEX_FOLDER_NAME = "RomFsIndex"
+# bump whenever the layout of the index changes, so stale indexes are rebuilt
+INDEX_FORMAT_VERSION = 1
+
+# the entries of a pkg header, as parsed by mercury_engine_data_structures.formats.pkg
+PkgEntry = collections.namedtuple("PkgEntry", ["asset_id", "start_offset", "end_offset"])
+
+
+class RomFsIndex:
+    """
+    Stores the file index a FileTreeEditor builds for each RomFS: the files in it, the headers of its pkgs and its game
+    version. Building it lists every file of the RomFS and reads every pkg, which is slow on network drives and cold
+    disks.
+
+    An index is validated against the mtimes of the folders holding the files, which change whenever a file is added,
+    removed or renamed in them, and the size and mtime of the pkgs and the toc. That only takes a stat of each.
+    """
+
+    folder: Path
+
+    def __init__(self, folder: Path):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.folder = folder
+
+    def _index_path(self, romfs: Path) -> Path:
+        key = hashlib.sha1(romfs.as_posix().encode(), usedforsecurity=False).hexdigest()
+        return self.folder.joinpath(f"{key}.json")
+
+    def fingerprint(self, romfs: Path, folders: list[str], files: list[str]) -> dict[str, dict]:
+        return {
+            "folders": {folder: romfs.joinpath(folder).stat().st_mtime_ns for folder in folders},
+            "files": {file: _stat(romfs.joinpath(file)) for file in files},
+        }
+
+    def load(self, romfs: Path) -> dict | None:
+        with SharedTracer.span("load romfs index", "cache", {"path": romfs.as_posix()}):
+            return self._load(romfs)
+
+    def _load(self, romfs: Path) -> dict | None:
+        path = self._index_path(romfs)
+        if not path.exists():
+            return None
+
+        try:
+            index = json.loads(path.read_text())
+            if index["format"] != INDEX_FORMAT_VERSION or index["romfs"] != romfs.as_posix():
+                self.logger.info("Discarding RomFS index %s built by another version", path.as_posix())
+                return None
+
+            saved = index["fingerprint"]
+            if self.fingerprint(romfs, list(saved["folders"]), list(saved["files"])) != saved:
+                self.logger.info("RomFS at %s changed, indexing it again", romfs.as_posix())
+                return None
+
+        except FileNotFoundError:
+            self.logger.info("RomFS at %s changed, indexing it again", romfs.as_posix())
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            self.logger.exception("RomFS index %s is unreadable", path.as_posix())
+            return None
+
+        self.logger.info("Loaded index of RomFS at %s", romfs.as_posix())
+        return index
+
+    def save(self, romfs: Path, editor: IndexedFileTreeEditor):
+        with SharedTracer.span("save romfs index", "cache", {"path": romfs.as_posix()}):
+            self._save(romfs, editor)
+
+    def _save(self, romfs: Path, editor: IndexedFileTreeEditor):
+        path = self._index_path(romfs)
+        files = editor.romfs.files
+
+        # every folder on the way to a file, so new subfolders are noticed too
+        folders = {""}
+        for name in files:
+            folders.update(parent.as_posix() for parent in PurePosixPath(name).parents if parent.name)
+
+        try:
+            index = {
+                "format": INDEX_FORMAT_VERSION,
+                "romfs": romfs.as_posix(),
+                "game_version": editor.version.name,
+                "fingerprint": self.fingerprint(romfs, sorted(folders), [Toc.system_files_name(), *editor.all_pkgs]),
+                "files": [[name, resolve_asset_id(name, editor.target_game)] for name in files],
+                "loose": [asset_id for asset_id, pkgs in editor._files_for_asset_id.items() if None in pkgs],
+                "pkgs": {
+                    name: {
+                        "header_size": header.header_size,
+                        "data_section_size": header.data_section_size,
+                        "entries": [[e.asset_id, e.start_offset, e.end_offset] for e in header.file_entries],
+                    }
+                    for name, header in editor.headers.items()
+                },
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # worker processes may index the same RomFS at once, so never leave a half written index behind
+            temp = path.with_suffix(f".{os.getpid()}.tmp")
+            temp.write_text(json.dumps(index, separators=(",", ":")))
+            os.replace(temp, path)
+        except (OSError, ValueError):
+            self.logger.exception("Failed to write RomFS index %s", path.as_posix())
+            return
+
+        self.logger.info("Saved index of RomFS at %s", romfs.as_posix())
+
+    def clear(self):
+        for file in self.folder.glob("*.json"):
+            file.unlink()
+
+
+def _stat(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class IndexedRomFs(ExtractedRomFs):
+    """An extracted RomFS that remembers the files it listed, for the RomFS index."""
+
+    files: list[str]
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.files = []
+
+    def all_files(self) -> Iterator[str]:
+        self.files = []
+        for name in super().all_files():
+            self.files.append(name)
+            yield name
+
+
+class IndexedFileTreeEditor(FileTreeEditor):
+    """
+    A FileTreeEditor that restores its file index from the RomFS index when it's still valid, instead of listing the
+    RomFS and reading every pkg header again.
+    """
+
+    romfs: IndexedRomFs
+
+    def _update_headers(self):
+        index = SharedRomFsIndex.load(self.romfs.root)
+        if index is not None:
+            self._restore_headers(index)
+            return
+
+        super()._update_headers()
+        SharedRomFsIndex.save(self.romfs.root, self)
+
+    def _restore_headers(self, index: dict):
+        # the same state FileTreeEditor._update_headers builds
+        self.version = GameVersion[index["game_version"]]
+        self._name_for_asset_id = copy.copy(self.version.all_asset_id_for_version())
+        for name, asset_id in index["files"]:
+            self._name_for_asset_id[asset_id] = name
+
+        self._files_for_asset_id = {asset_id: {None} for asset_id in index["loose"]}
+        self.all_pkgs = list(index["pkgs"])
+        self.headers = {}
+        self._ensured_asset_ids = {}
+        for name, pkg in index["pkgs"].items():
+            entries = ListContainer(PkgEntry(*entry) for entry in pkg["entries"])
+            header = Container(
+                header_size=pkg["header_size"],
+                data_section_size=pkg["data_section_size"],
+                file_entries=entries,
+            )
+            header.entries_by_id = {}
+            for entry in entries:
+                self._add_pkg_name_for_asset_id(entry.asset_id, name)
+                header.entries_by_id[entry.asset_id] = entry
+
+            self.headers[name] = header
+            self._ensured_asset_ids[name] = set()
+
+    @functools.cached_property
+    def _toc(self) -> Toc:
+        # only needed to save modifications, which the editor never does. FileTreeEditor._update_headers sets it
+        # directly when the RomFS is indexed from scratch
+        return Toc.parse(self.romfs.get_file(Toc.system_files_name()), target_game=self.target_game)
+
+
+SharedRomFsIndex = RomFsIndex(dreaditor.get_appdata_folder().joinpath(INDEX_FOLDER_NAME))
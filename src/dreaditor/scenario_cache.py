@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING
+
+import dreaditor
+from dreaditor.scenario_data import ScenarioData
+from dreaditor.tracing import SharedTracer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+
+    from dreaditor.constants import Scenario
+
+CACHE_FOLDER_NAME = "ScenarioCache"
+# bump whenever the layout of ScenarioData changes, so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 2
+
+
+def _hash_asset(editor: FileTreeEditor, name: str) -> str:
+    return hashlib.sha1(editor.get_raw_asset(name), usedforsecurity=False).hexdigest()
+
+
+class ScenarioCache:
+    """
+    Stores the ScenarioData digest of each scenario on disk, so later opens don't have to parse anything.
+
+    A cache entry is tied to a game version and is validated against the files it was built from. The size and mtime
+    of the pkgs (or loose files) holding each source asset are compared first. If those changed, the assets are
+    re-hashed, and the entry is only discarded if their contents changed too.
+    """
+
+    folder: Path
+
+    def __init__(self, folder: Path):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.folder = folder
+
+    def _cache_path(self, editor: FileTreeEditor, scenario: Scenario) -> Path:
+        return self.folder.joinpath(editor.version.name, f"{scenario.value}.json")
+
+    def fingerprint(self, editor: FileTreeEditor, romfs: Path, assets: list[str]) -> dict[str, list[int]]:
+        files = set()
+        for asset in assets:
+            pkgs = list(editor.find_pkgs(asset))
+            files.update(pkgs if pkgs else [asset])
+
+        res = {}
+        for file in sorted(files):
+            stat = romfs.joinpath(file).stat()
+            res[file] = [stat.st_size, stat.st_mtime_ns]
+        return res
+
+    def source_state(self, editor: FileTreeEditor, romfs: Path, assets: list[str]) -> dict:
+        """The fingerprint and content hashes of assets, for is_unchanged to check them against later."""
+        return {
+            "fingerprint": self.fingerprint(editor, romfs, assets),
+            "hashes": {asset: _hash_asset(editor, asset) for asset in assets},
+        }
+
+    def is_unchanged(self, editor: FileTreeEditor, romfs: Path, assets: list[str], state: dict) -> bool:
+        """
+        Whether assets have the contents they had when state was taken with source_state. Their contents are only hashed
+        if the files were touched, in which case state gets the new fingerprint so the next check is cheap again.
+        """
+        fingerprint = self.fingerprint(editor, romfs, assets)
+        if fingerprint == state["fingerprint"]:
+            return True
+
+        if {asset: _hash_asset(editor, asset) for asset in assets} != state["hashes"]:
+            return False
+
+        state["fingerprint"] = fingerprint
+        return True
+
+    def load(self, editor: FileTreeEditor, romfs: Path, scenario: Scenario) -> ScenarioData | None:
+        with SharedTracer.span("load scenario cache", "cache", {"scenario": scenario.value}):
+            return self._load(editor, romfs, scenario)
+
+    def _load(self, editor: FileTreeEditor, romfs: Path, scenario: Scenario) -> ScenarioData | None:
+        path = self._cache_path(editor, scenario)
+        if not path.exists():
+            return None
+
+        try:
+            cached = json.loads(path.read_text())
+            if cached["format"] != CACHE_FORMAT_VERSION or cached["game_version"] != editor.version.name:
+                self.logger.info("Discarding scenario cache %s built by another version", path.as_posix())
+                return None
+
+            data = ScenarioData.from_dict(cached["scenario"])
+            assets = data.source_assets()
+
+            fingerprint = cached["fingerprint"]
+            if not self.is_unchanged(editor, romfs, assets, cached):
+                self.logger.info("Source assets of %s changed, discarding cache", scenario.name)
+                return None
+
+            if cached["fingerprint"] != fingerprint:
+                self.logger.info("Source files of %s were touched but are unchanged", scenario.name)
+                path.write_text(json.dumps(cached, separators=(",", ":")))
+
+        except (OSError, ValueError, KeyError, TypeError):
+            self.logger.exception("Scenario cache %s is unreadable", path.as_posix())
+            return None
+
+        self.logger.info("Loaded %s from scenario cache", scenario.name)
+        return data
+
+    def save(self, editor: FileTreeEditor, romfs: Path, scenario: Scenario, data: ScenarioData):
+        with SharedTracer.span("save scenario cache", "cache", {"scenario": scenario.value}):
+            self._save(editor, romfs, scenario, data)
+
+    def _save(self, editor: FileTreeEditor, romfs: Path, scenario: Scenario, data: ScenarioData):
+        path = self._cache_path(editor, scenario)
+        assets = data.source_assets()
+
+        try:
+            cached = {
+                "format": CACHE_FORMAT_VERSION,
+                "game_version": editor.version.name,
+                **self.source_state(editor, romfs, assets),
+                "scenario": data.to_dict(),
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(cached, separators=(",", ":")))
+        except (OSError, ValueError, TypeError):
+            self.logger.exception("Failed to write scenario cache %s", path.as_posix())
+            return
+
+        self.logger.info("Saved %s to scenario cache", scenario.name)
+
+    def clear(self):
+        for file in self.folder.rglob("*.json"):
+            try:
+                file.unlink(missing_ok=True)
+            except OSError:
+                # on Windows, a file open elsewhere can't be deleted. it's checked again when its scenario is loaded
+                self.logger.warning("Could not delete scenario cache %s", file.as_posix(), exc_info=True)
+
+
+SharedScenarioCache = ScenarioCache(dreaditor.get_appdata_folder().joinpath(CACHE_FOLDER_NAME))
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import sys
+from typing import TYPE_CHECKING, Any
+
+from construct import Container, ListContainer
+from mercury_engine_data_structures.common_types import Vec2
+
+from dreaditor.constants import Scenario
+
+if TYPE_CHECKING:
+    from mercury_engine_data_structures.formats.bmsad import Bmsad
+    from mercury_engine_data_structures.formats.bmscc import Bmscc
+
+LOGGER = logging.getLogger(__name__)
+
+# components whose full data is kept, because the painters draw them. Every other component is only recorded by name
+# and type.
+PAINTED_COMPONENTS = {
+    "CBreakableTileGroupComponent",
+    "CLogicShapeComponent",
+    "CLogicPathComponent",
+    "CWorldGraph",
+    "CPositionalSoundComponent",
+}
+
+
+def to_plain(value: Any) -> Any:
+    """Converts a Construct container into plain dicts/lists so it can be stored as json."""
+    if isinstance(value, dict):
+        return {str(k): to_plain(v) for k, v in value.items() if k != "_io"}
+    # vectors are parsed as Vec2/Vec3/Vec4, which aren't lists
+    if isinstance(value, list | tuple | Vec2):
+        return [to_plain(v) for v in value]
+    if isinstance(value, str):
+        return str(value)
+    return value
+
+
+def to_container(value: Any) -> Any:
+    """Inverse of to_plain, so the painters can keep using attribute access on the data."""
+    if isinstance(value, dict):
+        return Container({k: to_container(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return ListContainer(to_container(v) for v in value)
+    return value
+
+
+def _flatten_points(points: list, position: list[float], loop: bool) -> list[float]:
+    res = []
+    for p in points:
+        res.extend([position[0] + p.x, position[1] + p.y])
+    if loop and res:
+        res.extend(res[:2])
+    return res
+
+
+@dataclasses.dataclass()
+class CollisionShape:
+    """A single collision primitive, in game coordinates relative to the actor position."""
+
+    layer: str
+    name: str
+    type: str
+    position: list[float]
+    # AABOX2D: [width, height], CIRCLE: [radius]
+    size: list[float]
+    # POLYCOLLECTION2D: one flat [x0, y0, x1, y1, ...] list per polygon, closed if the polygon loops
+    polys: list[list[float]]
+
+    @classmethod
+    def from_entry(cls, layer: str, entry: Container) -> CollisionShape | None:
+        if entry.type == "AABOX2D":
+            return cls(layer, entry.name, entry.type, list(entry.data.position[:2]), list(entry.data.size[:2]), [])
+
+        if entry.type == "POLYCOLLECTION2D":
+            position = list(entry.data.position[:2])
+            polys = [
+                _flatten_points(polygon.points, position, polygon.loop)
+                for polygon in entry.data.polys
+                if polygon.num_points != 0
+            ]
+            return cls(layer, entry.name, entry.type, position, [], polys)
+
+        if entry.type == "CIRCLE":
+            return cls(layer, entry.name, entry.type, list(entry.data.position[:2]), [entry.data.size], [])
+
+        LOGGER.info("Unknown collision entry type %s in layer %s", entry.type, layer)
+        return None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CollisionShape:
+        return cls(**data)
+
+
+@dataclasses.dataclass()
+class ActorDefData:
+    """What the scene needs from an actordef (BMSAD) and the collision file (BMSCC) it references."""
+
+    link: str
+    collision_file: str | None
+    collision: list[CollisionShape]
+    colliders: list[CollisionShape]
+
+    @classmethod
+    def from_assets(cls, link: str, bmsad: Bmsad, bmscc: Bmscc | None) -> ActorDefData:
+        collision_file = None
+        collision = []
+        colliders = []
+
+        coll_comp = bmsad.components.get("COLLISION")
+        if coll_comp is not None:
+            coll: str = coll_comp.dependencies.file
+            if coll != "Unassigned":
+                collision_file = coll.replace("\\", "/")
+
+            for func in coll_comp.functions:
+                if func.name != "CreateCollider":
+                    continue
+
+                if func.get_param(5) == "AABOX2D":
+                    position = [func.get_param(6), func.get_param(7)]
+                    size = [func.get_param(9), func.get_param(10)]
+                    colliders.append(CollisionShape("bmsad", "CreateCollider", "AABOX2D", position, size, []))
+                else:
+                    LOGGER.warning("Unknown collider type in BMSAD %s: %s", link, func.get_param(5))
+
+        if bmscc is not None:
+            collision = cls.collision_shapes(bmscc)
+
+        return cls(link, collision_file, collision, colliders)
+
+    @staticmethod
+    def collision_shapes(bmscc: Bmscc) -> list[CollisionShape]:
+        shapes = []
+        for layer in bmscc.raw.layers:
+            for entry in layer.entries:
+                shape = CollisionShape.from_entry(layer.name, entry)
+                if shape is not None:
+                    shapes.append(shape)
+        return shapes
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ActorDefData:
+        return cls(
+            data["link"],
+            data["collision_file"],
+            [CollisionShape.from_dict(s) for s in data["collision"]],
+            [CollisionShape.from_dict(s) for s in data["colliders"]],
+        )
+
+
+@dataclasses.dataclass(slots=True)
+class ActorData:
+    """
+    An actor's placement in the BRFLD and a summary of its components.
+
+    The layer, sublayer, actordef and component names repeat across thousands of actors, so they are interned.
+    """
+
+    layer: str
+    sublayer: str
+    name: str
+    actordef: str
+    position: list[float]
+    angle: list[float]
+    # component name -> @type
+    components: dict[str, str]
+    # component name -> data, only for PAINTED_COMPONENTS
+    component_data: dict[str, dict]
+
+    def __post_init__(self):
+        # str() as sys.intern doesn't take the str subclasses Construct may parse into
+        self.layer = sys.intern(str(self.layer))
+        self.sublayer = sys.intern(str(self.sublayer))
+        self.actordef = sys.intern(str(self.actordef))
+        self.components = {sys.intern(str(k)): sys.intern(str(v)) for k, v in self.components.items()}
+
+    @classmethod
+    def from_level_data(cls, layer: str, sublayer: str, name: str, level_data: Container) -> ActorData:
+        components = {}
+        component_data = {}
+        for comp_name, comp in level_data.pComponents.items():
+            comp_type = comp["@type"]
+            components[comp_name] = comp_type
+            if comp_name in PAINTED_COMPONENTS or comp_type in PAINTED_COMPONENTS:
+                component_data[comp_name] = to_plain(comp)
+
+        return cls(
+            layer,
+            sublayer,
+            name,
+            level_data.oActorDefLink.removeprefix("actordef:"),
+            list(level_data.vPos),
+            list(level_data.vAng),
+            components,
+            component_data,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ActorData:
+        return cls(**data)
+
+
+@dataclasses.dataclass()
+class NavmeshData:
+    vertices: list[list[float]]
+    indices: list[int]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> NavmeshData:
+        return cls(**data)
+
+
+@dataclasses.dataclass()
+class CollisionCameraData:
+    name: str
+    # one flat [x0, y0, x1, y1, ...] list per polygon, in game coordinates
+    polys: list[list[float]]
+
+    @classmethod
+    def from_entry(cls, entry: Container) -> CollisionCameraData:
+        position = list(entry.data.position[:2])
+        return cls(entry.name, [_flatten_points(p.points, position, False) for p in entry.data.polys])
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CollisionCameraData:
+        return cls(**data)
+
+
+@dataclasses.dataclass()
+class SubareaGroupData:
+    """An actor group of one subarea in a subarea setup, with its links already resolved."""
+
+    setup_id: str
+    subarea_id: str
+    group_name: str
+    # [layer, sublayer, name] of each actor in the group
+    actors: list[list[str]]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> SubareaGroupData:
+        return cls(**data)
+
+
+@dataclasses.dataclass()
+class ScenarioData:
+    """
+    A compact, json-serializable digest of a scenario's BRFLD, BMMAP, BMSCC, BRSA and the actordefs it uses.
+
+    This is everything needed to build the scene, the actor list and the subarea list without the parsed assets.
+    """
+
+    scenario: str
+    bounds_min: list[float]
+    bounds_max: list[float]
+    navmeshes: list[NavmeshData]
+    collision_cameras: list[CollisionCameraData]
+    actors: list[ActorData]
+    actordefs: dict[str, ActorDefData]
+    subareas: list[SubareaGroupData]
+
+    def source_assets(self) -> list[str]:
+        """Every asset the digest was built from."""
+        scenario = Scenario(self.scenario)
+        res = [scenario.scenario_file(ext) for ext in ["brfld", "bmmap", "bmscc", "brsa"]]
+        for actordef in self.actordefs.values():
+            res.append(actordef.link)
+            if actordef.collision_file is not None:
+                res.append(actordef.collision_file)
+        return res
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ScenarioData:
+        return cls(
+            data["scenario"],
+            data["bounds_min"],
+            data["bounds_max"],
+            [NavmeshData.from_dict(n) for n in data["navmeshes"]],
+            [CollisionCameraData.from_dict(c) for c in data["collision_cameras"]],
+            [ActorData.from_dict(a) for a in data["actors"]],
+            {k: ActorDefData.from_dict(v) for k, v in data["actordefs"].items()},
+            [SubareaGroupData.from_dict(s) for s in data["subareas"]],
+        )
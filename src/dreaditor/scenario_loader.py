@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, TypeVar
+
+from mercury_engine_data_structures.formats.bmmap import Bmmap
+from mercury_engine_data_structures.formats.bmsad import Bmsad
+from mercury_engine_data_structures.formats.bmscc import Bmscc
+from mercury_engine_data_structures.formats.brfld import ActorLayer, Brfld
+from mercury_engine_data_structures.formats.brsa import Brsa
+from PySide6.QtCore import QObject, Signal, Slot
+
+from dreaditor.actor import Actor
+from dreaditor.actor_reference import ActorRef
+from dreaditor.actordef_parser import SharedActorDefParser
+from dreaditor.asset_cache import SharedAssetCache
+from dreaditor.scenario_cache import SharedScenarioCache
+from dreaditor.scenario_data import (
+    ActorData,
+    ActorDefData,
+    CollisionCameraData,
+    NavmeshData,
+    ScenarioData,
+    SubareaGroupData,
+)
+from dreaditor.tracing import SharedTracer, parse_span, traced
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from mercury_engine_data_structures.base_resource import BaseResource
+    from mercury_engine_data_structures.file_tree_editor import FileTreeEditor
+
+    from dreaditor.constants import Scenario
+    from dreaditor.widgets.actor_data_tree import ActorDataTreeWidget
+    from dreaditor.widgets.scenario_viewer import ScenarioViewer
+
+T = TypeVar("T", bound="BaseResource")
+
+ACTOR_BATCH_SIZE = 64
+IGNORED_LAYER_KEYS = ["sLevelID", "sScenarioID", "vLayerFiles"]
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class ScenarioLoader(QObject):
+    """
+    Loads a scenario on a worker thread.
+
+    The scenario is read from the scenario cache if possible, otherwise its assets are parsed into a ScenarioData and
+    the cache is updated. Results are emitted in the order the scene needs them (map, actor batches, subareas), so a
+    receiver living on the GUI thread can build the scene incrementally. A load can be cancelled at any time; the
+    worker stops at the next asset boundary.
+    """
+
+    progress = Signal(int, int, str)
+    # the brfld and the size of its raw data
+    brfld_loaded = Signal(object, int)
+    map_loaded = Signal(object)
+    actors_loaded = Signal(list)
+    subareas_loaded = Signal(object)
+    failed = Signal(str)
+    finished = Signal()
+
+    scenario: Scenario
+    editor: FileTreeEditor
+    romfs: Path
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        editor: FileTreeEditor,
+        romfs: Path,
+        data_tree: ActorDataTreeWidget | None,
+        scene: ScenarioViewer | None,
+    ):
+        super().__init__(None)
+        self.logger = logging.getLogger(type(self).__name__)
+        self.scenario = scenario
+        self.editor = editor
+        self.romfs = romfs
+        self.data_tree = data_tree
+        self.scene_viewer = scene
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _check_cancelled(self):
+        if self.is_cancelled():
+            raise LoadCancelled
+
+    @Slot()
+    def run(self):
+        try:
+            self._emit_scenario(self.load_data())
+        except LoadCancelled:
+            self.logger.info("Cancelled loading %s", self.scenario.name)
+        except Exception as e:
+            self.logger.exception("Failed to load scenario %s", self.scenario.name)
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    @traced("load", "load scenario data")
+    def load_data(self) -> ScenarioData:
+        self.progress.emit(0, 0, "Reading scenario cache")
+        data = SharedScenarioCache.load(self.editor, self.romfs, self.scenario)
+        if data is None:
+            data = self._parse_scenario()
+            SharedScenarioCache.save(self.editor, self.romfs, self.scenario, data)
+        return data
+
+    def _parse_scenario(self) -> ScenarioData:
+        scenario = self.scenario
+
+        self.progress.emit(0, 0, f"Parsing {scenario.scenario_file('brfld')}")
+        brfld, brfld_size = self._parse_asset(scenario.scenario_file("brfld"), Brfld)
+        self._check_cancelled()
+        self.brfld_loaded.emit(brfld, brfld_size)
+
+        actors = [
+            ActorData.from_level_data(layer_name, sublayer_name, actor_name, level_data)
+            for layer_name, layer in brfld.raw.Root.pScenario.items()
+            if layer_name not in IGNORED_LAYER_KEYS
+            for sublayer_name, sublayer in layer.dctSublayers.items()
+            for actor_name, level_data in sublayer.dctActors.items()
+        ]
+        links = sorted({actor.actordef for actor in actors})
+        # brfld, bmmap, every actordef, bmscc and brsa
+        total = len(links) + 4
+        done = 1
+
+        self.progress.emit(done, total, f"Parsing {scenario.scenario_file('bmmap')}")
+        bmmap, _ = self._parse_asset(scenario.scenario_file("bmmap"), Bmmap)
+        gridDef = bmmap.raw.Root.gridDef
+        navmeshes = [NavmeshData(list(map(list, geo.aVertex)), list(geo.aIndex)) for geo in bmmap.raw.Root.aNavmeshGeos]
+        done += 1
+
+        actordefs = self._parse_actordefs(links, done, total)
+        done += len(links)
+
+        self.progress.emit(done, total, f"Parsing {scenario.scenario_file('bmscc')}")
+        bmscc, _ = self._parse_asset(scenario.scenario_file("bmscc"), Bmscc)
+        collision_cameras = [CollisionCameraData.from_entry(cc) for cc in bmscc.raw.layers[0].entries]
+        done += 1
+
+        self._check_cancelled()
+        self.progress.emit(done, total, f"Parsing {scenario.scenario_file('brsa')}")
+        brsa, _ = self._parse_asset(scenario.scenario_file("brsa"), Brsa)
+        subareas = []
+        for setup in brsa.raw.Root.pSubareaManager.vSubareaSetups:
+            for subarea in setup.vSubareaConfigs:
+                actor_groups = {
+                    ActorLayer.LIGHTS: subarea.asItemsIds[1],
+                    ActorLayer.SOUNDS: subarea.asItemsIds[2],
+                    ActorLayer.ENTITIES: subarea.asItemsIds[4],
+                }
+
+                for actor_layer, actor_group_name in actor_groups.items():
+                    if actor_group_name == "":
+                        continue
+                    try:
+                        ag = brfld.get_actor_group(actor_group_name, actor_layer)
+                    except KeyError:
+                        self.logger.info("Missing actor group: %s", actor_group_name)
+                        continue
+
+                    link_parts = [actor_link.split(":") for actor_link in ag]
+                    subareas.append(
+                        SubareaGroupData(
+                            setup.sId,
+                            subarea.sId,
+                            actor_group_name,
+                            [[parts[2], parts[4], parts[6]] for parts in link_parts],
+                        )
+                    )
+
+        return ScenarioData(
+            scenario.value,
+            list(gridDef.vGridMin),
+            list(gridDef.vGridMax),
+            navmeshes,
+            collision_cameras,
+            actors,
+            actordefs,
+            subareas,
+        )
+
+    def _parse_asset(self, name: str, type_hint: type[T]) -> tuple[T, int]:
+        """The parsed asset and the size of its raw data."""
+        with parse_span(name):
+            data = self.editor.get_raw_asset(name)
+            return type_hint.parse(data, target_game=self.editor.target_game, editor=self.editor), len(data)
+
+    def _parse_actordefs(self, links: list[str], done: int, total: int) -> dict[str, ActorDefData]:
+        if SharedActorDefParser.is_worthwhile(len(links)):
+            self.progress.emit(done, total, "Parsing actordefs")
+            actordefs = SharedActorDefParser.parse(
+                self.editor,
+                links,
+                lambda parsed: self.progress.emit(done + parsed, total, "Parsing actordefs"),
+                self.is_cancelled,
+            )
+            self._check_cancelled()
+            return actordefs
+
+        actordefs = {}
+        for i, link in enumerate(links):
+            self._check_cancelled()
+            self.progress.emit(done + i, total, f"Parsing {link}")
+            actordefs[link] = self._parse_actordef(link)
+        return actordefs
+
+    def _parse_actordef(self, link: str) -> ActorDefData:
+        bmsad = SharedAssetCache.get_parsed_asset(self.editor, link, Bmsad)
+
+        bmscc = None
+        coll = bmsad.components.get("COLLISION")
+        if coll is not None:
+            coll_file: str = coll.dependencies.file
+            if coll_file != "Unassigned":
+                bmscc = SharedAssetCache.get_parsed_asset(self.editor, coll_file.replace("\\", "/"), Bmscc)
+            else:
+                self.logger.info("actordef %s has unassigned collision file!", link)
+
+        return ActorDefData.from_assets(link, bmsad, bmscc)
+
+    def _emit_scenario(self, data: ScenarioData):
+        self._check_cancelled()
+        self.map_loaded.emit(data)
+
+        total = len(data.actors)
+        for start in range(0, total, ACTOR_BATCH_SIZE):
+            self._check_cancelled()
+            with SharedTracer.span("create actors", "load", {"first": start}):
+                batch = [
+                    Actor(
+                        ActorRef(self.scenario, actor_data.layer, actor_data.sublayer, actor_data.name),
+                        actor_data,
+                        data.actordefs[actor_data.actordef],
+                        self.data_tree,
+                        self.scene_viewer,
+                    )
+                    for actor_data in data.actors[start : start + ACTOR_BATCH_SIZE]
+                ]
+            self.actors_loaded.emit(batch)
+            self.progress.emit(start + len(batch), total, "Loading actors")
+
+        self._check_cancelled()
+        self.subareas_loaded.emit(data)
+        self.progress.emit(total, total, "Done")
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from PySide6.QtCore import QPointF, QRectF
+
+T = TypeVar("T")
+
+# scene units per grid cell. actor dots are 50 units wide and rooms are a few thousand units across
+DEFAULT_CELL_SIZE = 1000.0
+
+
+class SpatialIndex(Generic[T]):
+    """
+    A uniform grid over the scene, mapping each cell to the items whose bounds overlap it.
+
+    Items are registered with their bounds, and re-inserted if those change. Point and rect queries only look at the
+    cells they touch, and never more cells than are occupied, so their cost does not depend on how many items are in
+    the scene or how far the rect reaches past them.
+    """
+
+    cell_size: float
+    _bounds: dict[T, QRectF]
+    _cells: dict[tuple[int, int], list[T]]
+    # (x0, y0, x1, y1) of the cells items were inserted in since the index was last empty. It only grows, so it can
+    # include cells that were emptied since
+    _extent: tuple[int, int, int, int] | None
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._bounds = {}
+        self._cells = {}
+        self._extent = None
+
+    def _cell_bounds(self, rect: QRectF) -> tuple[int, int, int, int]:
+        return (
+            math.floor(rect.left() / self.cell_size),
+            math.floor(rect.top() / self.cell_size),
+            math.floor(rect.right() / self.cell_size),
+            math.floor(rect.bottom() / self.cell_size),
+        )
+
+    def _cell_range(self, rect: QRectF) -> Iterator[tuple[int, int]]:
+        x0, y0, x1, y1 = self._cell_bounds(rect)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield x, y
+
+    def _cells_in(self, rect: QRectF) -> Iterator[list[T]]:
+        """The items of the occupied cells rect touches."""
+        if self._extent is None:
+            return
+
+        x0, y0, x1, y1 = self._cell_bounds(rect)
+        ex0, ey0, ex1, ey1 = self._extent
+        x0, y0, x1, y1 = max(x0, ex0), max(y0, ey0), min(x1, ex1), min(y1, ey1)
+        if x0 > x1 or y0 > y1:
+            return
+
+        # zoomed far out, rect covers more cells than are occupied, and it's cheaper to go over those
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            for (x, y), items in self._cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield items
+            return
+
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                items = self._cells.get((x, y))
+                if items is not None:
+                    yield items
+
+    def insert(self, item: T, bounds: QRectF):
+        if item in self._bounds:
+            self.remove(item)
+
+        bounds = bounds.normalized()
+        self._bounds[item] = bounds
+        for cell in self._cell_range(bounds):
+            self._cells.setdefault(cell, []).append(item)
+
+        x0, y0, x1, y1 = self._cell_bounds(bounds)
+        if self._extent is not None:
+            ex0, ey0, ex1, ey1 = self._extent
+            x0, y0, x1, y1 = min(x0, ex0), min(y0, ey0), max(x1, ex1), max(y1, ey1)
+        self._extent = (x0, y0, x1, y1)
+
+    def remove(self, item: T):
+        bounds = self._bounds.pop(item, None)
+        if bounds is None:
+            return
+
+        for cell in self._cell_range(bounds):
+            items = self._cells.get(cell)
+            if items is not None:
+                items.remove(item)
+                if not items:
+                    del self._cells[cell]
+        if not self._cells:
+            self._extent = None
+
+    def bounds(self, item: T) -> QRectF | None:
+        return self._bounds.get(item)
+
+    def query_point(self, point: QPointF) -> list[T]:
+        """Items whose bounds contain point."""
+        cell = (math.floor(point.x() / self.cell_size), math.floor(point.y() / self.cell_size))
+        return [item for item in self._cells.get(cell, []) if self._bounds[item].contains(point)]
+
+    def query_rect(self, rect: QRectF) -> list[T]:
+        """Items whose bounds intersect rect, each reported once."""
+        rect = rect.normalized()
+        seen = set()
+        res = []
+        for items in self._cells_in(rect):
+            for item in items:
+                if item not in seen and self._bounds[item].intersects(rect):
+                    seen.add(item)
+                    res.append(item)
+        return res
+
+    def clear(self):
+        self._bounds.clear()
+        self._cells.clear()
+        self._extent = None
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._bounds)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._bounds
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import ctypes
+import logging
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+if TYPE_CHECKING:
+    from dreaditor.main_window import DreaditorWindow
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    def process_age() -> float | None:
+        """Seconds since this process was created, or None if it can't be read."""
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        created, exited, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+        if not kernel32.GetProcessTimes(
+            kernel32.GetCurrentProcess(),
+            ctypes.byref(created),
+            ctypes.byref(exited),
+            ctypes.byref(kernel),
+            ctypes.byref(user),
+        ):
+            return None
+        kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+
+        def ticks(t: wintypes.FILETIME) -> int:
+            return (t.dwHighDateTime << 32) | t.dwLowDateTime
+
+        # filetimes count 100 ns
+        return (ticks(now) - ticks(created)) / 1e7
+
+else:
+    import os
+
+    def process_age() -> float | None:
+        """Seconds since this process was created, or None if it can't be read."""
+        try:
+            with open("/proc/self/stat") as f:
+                # the fields after the command name, which may contain spaces. starttime is the 22nd field
+                started = int(f.read().rpartition(")")[2].split()[19]) / os.sysconf("SC_CLK_TCK")
+            with open("/proc/uptime") as f:
+                uptime = float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        return uptime - started
+
+
+class StartupProfiler(QObject):
+    """
+    Times the steps of starting the editor, from the process being created until the window is first painted and the
+    RomFS is indexed, then closes the editor and reports them. See --profile-startup.
+    """
+
+    window: DreaditorWindow | None
+    # step name, seconds since the process started
+    marks: list[tuple[str, float]]
+
+    def __init__(self):
+        super().__init__(None)
+        self.logger = logging.getLogger(type(self).__name__)
+        age = process_age()
+        self.from_process_start = age is not None
+        self.origin = time.perf_counter() - (age or 0.0)
+        self.window = None
+        self.marks = [("command line parsed", age or 0.0)]
+        self._painted = False
+
+    def mark(self, step: str):
+        self.marks.append((step, time.perf_counter() - self.origin))
+
+    def watch(self, window: DreaditorWindow):
+        """Marks the first paint of window, and closes it once it's painted and its RomFS is indexed."""
+        self.window = window
+        window.installEventFilter(self)
+        window.rom_manager.rom_selected.connect(self.on_rom_selected)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint and not self._painted:
+            self._painted = True
+            # the rest of the window is painted in the same pass, mark it once that's done
+            QTimer.singleShot(0, self.on_first_paint)
+        return False
+
+    def on_first_paint(self):
+        self.mark("first paint")
+        self._finish_if_done()
+
+    def on_rom_selected(self):
+        self.mark("romfs indexed")
+        self._finish_if_done()
+
+    def _finish_if_done(self):
+        rom_manager = self.window.rom_manager
+        # the configured RomFS is indexed after the first paint, and its path is cleared if it's not valid
+        if not self._painted or (rom_manager.path and rom_manager.editor is None):
+            return
+
+        self.window.removeEventFilter(self)
+        self.report()
+        self.window.close()
+
+    def report(self):
+        start = "process start" if self.from_process_start else "python start"
+        lines = [f"Startup profile, seconds since {start}:"]
+        lines.extend(f"  {step:<20} {seconds:7.3f}" for step, seconds in self.marks)
+        report = "\n".join(lines)
+
+        self.logger.info(report)
+        # there's no console to print to in the release build
+        if sys.stdout is not None:
+            print(report)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import logging
+import math
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QPoint, QPointF, QRect, QRectF
+from PySide6.QtGui import QColor, QPainter, QPixmap
+from PySide6.QtWidgets import QStyleOptionGraphicsItem
+
+from dreaditor.config import CurrentConfiguration
+from dreaditor.spatial_index import SpatialIndex
+from dreaditor.tracing import traced
+
+if TYPE_CHECKING:
+    from PySide6.QtWidgets import QGraphicsItem
+
+# width and height of a tile in device pixels
+TILE_PX = 512
+TILE_BYTES = TILE_PX * TILE_PX * 4
+# zoom buckets are the log2 of the scale, rounded to this many digits. tiles are drawn at most a fraction of a pixel
+# larger or smaller than they were rendered, which rounds away
+BUCKET_DIGITS = 6
+
+
+def tile_cache_enabled() -> bool:
+    return CurrentConfiguration["tileCache"]
+
+
+class TileCache:
+    """
+    Static scene content (the navmesh, collision cameras and actor collision), rendered into offscreen tiles.
+
+    Tiles are grouped in zoom buckets and rendered at the scale of the view, so drawing them is a plain copy of pixels.
+    Tiles of the other zoom levels the view was at are kept around for when it zooms back, until the tiles exceed the
+    memory budget and the least recently drawn ones are evicted.
+
+    Static items are drawn into the tiles with paint_tile(painter, option) instead of paint, and have to invalidate
+    their scene bounds whenever what they draw into the tiles changes.
+    """
+
+    budget: int
+    used: int
+    hits: int
+    misses: int
+    items: SpatialIndex[QGraphicsItem]
+    # (bucket, x, y) -> (tile, scene rect). tiles without any items are None
+    _tiles: OrderedDict[tuple[float, int, int], tuple[QPixmap | None, QRectF]]
+
+    def __init__(self, budget: int):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.items = SpatialIndex()
+        self._tiles = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def add_item(self, item: QGraphicsItem):
+        bounds = item.sceneBoundingRect()
+        self.items.insert(item, bounds)
+        self.invalidate(bounds)
+
+    def update_item_bounds(self, item: QGraphicsItem):
+        old = self.items.bounds(item)
+        if old is not None:
+            self.invalidate(old)
+            self.add_item(item)
+
+    def clear(self):
+        self.items.clear()
+        self.invalidate()
+
+    def invalidate(self, rect: QRectF | None = None):
+        """Drops the tiles overlapping rect, or every tile if rect is None."""
+        if rect is None:
+            self._tiles.clear()
+            self.used = 0
+            return
+
+        stale = [key for key, (_, tile_rect) in self._tiles.items() if tile_rect.intersects(rect)]
+        for key in stale:
+            tile, _ = self._tiles.pop(key)
+            if tile is not None:
+                self.used -= TILE_BYTES
+
+    def draw(self, painter: QPainter, exposed: QRectF, background: QColor):
+        """
+        Draws the tiles covering exposed, a rect in scene coordinates. painter maps scene to device coordinates.
+
+        Tiles are opaque, filled with background where there is no content, so drawing them is a copy instead of a
+        blend. Tiles without any items are not drawn at all.
+        """
+        transform = painter.worldTransform()
+        # zooming in and back out rarely gives back the exact same scale, so tiles are shared by nearly equal scales
+        bucket = round(math.log2(transform.m11() * painter.device().devicePixelRatioF()), BUCKET_DIGITS)
+        scale = 2**bucket
+        tile_size = TILE_PX / scale
+
+        x0 = math.floor(exposed.left() / tile_size)
+        x1 = math.floor(exposed.right() / tile_size)
+        y0 = math.floor(exposed.top() / tile_size)
+        y1 = math.floor(exposed.bottom() / tile_size)
+
+        painter.save()
+        painter.resetTransform()
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                tile = self._tile(bucket, x, y, scale, tile_size, painter.renderHints(), background)
+                if tile is None:
+                    continue
+
+                # round both corners, so neighboring tiles share their edges exactly
+                top_left = transform.map(QPointF(x * tile_size, y * tile_size))
+                bottom_right = transform.map(QPointF((x + 1) * tile_size, (y + 1) * tile_size))
+                target = QRect(
+                    QPoint(round(top_left.x()), round(top_left.y())),
+                    QPoint(round(bottom_right.x()) - 1, round(bottom_right.y()) - 1),
+                )
+                if target.size() == tile.size():
+                    painter.drawPixmap(target.topLeft(), tile)
+                else:
+                    painter.drawPixmap(target, tile)
+        painter.restore()
+
+        self._evict()
+
+    def _tile(
+        self,
+        bucket: float,
+        x: int,
+        y: int,
+        scale: float,
+        tile_size: float,
+        hints: QPainter.RenderHint,
+        background: QColor,
+    ) -> QPixmap | None:
+        key = (bucket, x, y)
+        entry = self._tiles.get(key)
+        if entry is not None:
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        rect = QRectF(x * tile_size, y * tile_size, tile_size, tile_size)
+        tile = self._render(rect, scale, hints, background)
+        self._tiles[key] = (tile, rect)
+        if tile is not None:
+            self.used += TILE_BYTES
+        return tile
+
+    @traced("paint", "render tile")
+    def _render(self, rect: QRectF, scale: float, hints: QPainter.RenderHint, background: QColor) -> QPixmap | None:
+        items = self.items.query_rect(rect)
+        if not items:
+            return None
+        items.sort(key=lambda item: item.zValue())
+
+        tile = QPixmap(TILE_PX, TILE_PX)
+        tile.fill(background)
+        painter = QPainter(tile)
+        painter.setRenderHints(hints)
+        painter.scale(scale, scale)
+        painter.translate(-rect.topLeft())
+
+        option = QStyleOptionGraphicsItem()
+        for item in items:
+            painter.save()
+            painter.setTransform(item.sceneTransform(), True)
+            option.exposedRect = item.mapRectFromScene(rect)
+            item.paint_tile(painter, option)
+            painter.restore()
+
+        painter.end()
+        return tile
+
+    def _evict(self):
+        while self.used > self.budget and self._tiles:
+            _, (tile, _) = self._tiles.popitem(last=False)
+            if tile is not None:
+                self.used -= TILE_BYTES
+
+    def stats(self) -> str:
+        return (
+            f"{len(self._tiles)} tiles, ~{self.used // (1024 * 1024)}/{self.budget // (1024 * 1024)} MiB, "
+            f"{self.hits} hits, {self.misses} misses"
+        )
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import dreaditor
+from dreaditor.config import CurrentConfiguration
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextlib import AbstractContextManager
+    from pathlib import Path
+
+F = TypeVar("F", bound="Callable[..., Any]")
+
+# spans kept in memory, the oldest are dropped first. ~100 bytes each
+MAX_EVENTS = 1_000_000
+# trace files kept in the log folder, like the rotated logs
+TRACE_FILES_KEPT = 5
+TRACE_FILE_PREFIX = "trace-"
+
+# returned by span while nothing is recorded, so the hot paths only pay for a function call
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict[str, Any] | None):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> _Span:
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.tracer.end_span(self.name, self.category, self.start, time.perf_counter_ns(), self.args)
+
+
+class Tracer:
+    """
+    Records named, nested spans of time and saves them as a Chrome trace, which can be opened in Perfetto
+    (ui.perfetto.dev) or chrome://tracing.
+
+    Tracing is off unless started, and a span costs a function call until then. Spans can be recorded from any thread;
+    each one is kept as a tuple until the trace is saved.
+
+    Independently of tracing, the tracer can also count the spans by category and name, without keeping them. The
+    performance HUD uses this to break a frame down by painter.
+    """
+
+    enabled: bool
+    counting: bool
+    # enabled or counting, checked once per span
+    active: bool
+    _events: deque[tuple]
+    # (category, name) -> [spans, total ns]
+    _counts: dict[tuple[str, str], list[int]]
+
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.enabled = False
+        self.counting = False
+        self.active = False
+        self._events = deque(maxlen=max_events)
+        self._counts = {}
+        self._thread_names: dict[int, str] = {}
+        self._origin = time.perf_counter_ns()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def start(self):
+        self._events.clear()
+        self._thread_names.clear()
+        self._origin = time.perf_counter_ns()
+        self.enabled = True
+        self.active = True
+        self.logger.info("Started tracing")
+
+    def stop(self):
+        self.enabled = False
+        self.active = self.counting
+
+    def set_counting(self, counting: bool):
+        self.counting = counting
+        self.active = self.enabled or counting
+        self._counts = {}
+
+    def take_counts(self, category: str) -> dict[str, tuple[int, int]]:
+        """The number of spans of category and their total duration in ns by name, since the last call."""
+        counts, self._counts = self._counts, {}
+        return {name: (spans, ns) for (cat, name), (spans, ns) in counts.items() if cat == category}
+
+    def span(self, name: str, category: str, args: dict[str, Any] | None = None) -> AbstractContextManager:
+        """Times the body of a with block. args are shown with the span, and should be cheap to build."""
+        if not self.active:
+            return _NO_SPAN
+        return _Span(self, name, category, args)
+
+    def end_span(self, name: str, category: str, start_ns: int, end_ns: int, args: dict[str, Any] | None):
+        if self.counting:
+            stats = self._counts.get((category, name))
+            if stats is None:
+                stats = self._counts[(category, name)] = [0, 0]
+            stats[0] += 1
+            stats[1] += end_ns - start_ns
+        self.add_event(name, category, start_ns, end_ns, args)
+
+    def add_event(self, name: str, category: str, start_ns: int, end_ns: int, args: dict[str, Any] | None = None):
+        if not self.enabled:
+            return
+
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        # deques are safe to append to from several threads
+        self._events.append((name, category, start_ns, end_ns - start_ns, tid, args))
+
+    def to_json(self) -> dict:
+        pid = os.getpid()
+        events: list[dict] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "Dreaditor"}},
+        ]
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._thread_names.items())
+        )
+        for name, category, start, duration, tid, args in list(self._events):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                # microseconds since tracing started
+                "ts": (start - self._origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"version": dreaditor.VERSION_STRING},
+        }
+
+    def save(self, path: Path):
+        path.write_text(json.dumps(self.to_json(), separators=(",", ":")))
+        self.logger.info("Saved %i trace events to %s", len(self._events), path.as_posix())
+
+
+def traced(category: str, name: str | None = None) -> Callable[[F], F]:
+    """
+    Records every call of the decorated method as a span. Without a name, the span is named after the class of the
+    instance it's called on, so subclasses show up separately.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not SharedTracer.active:
+                return func(self, *args, **kwargs)
+            with _Span(SharedTracer, name or type(self).__name__, category, None):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def parse_span(asset: str) -> AbstractContextManager:
+    """A span around parsing an asset, named by its file type so each format adds up separately."""
+    if not SharedTracer.active:
+        return _NO_SPAN
+    return _Span(SharedTracer, f"parse {asset.rpartition('.')[2]}", "parse", {"asset": asset})
+
+
+def start_tracing_if_enabled(force: bool = False):
+    """Starts tracing if requested from the command line (force) or the config."""
+    if force or CurrentConfiguration["tracing"]:
+        SharedTracer.start()
+
+
+def save_trace() -> Path | None:
+    """Saves the trace to a new file in the log folder and removes the oldest ones. Returns the file, if any."""
+    if not SharedTracer.enabled:
+        return None
+
+    folder = dreaditor.get_log_folder()
+    path = folder.joinpath(f"{TRACE_FILE_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}.json")
+    try:
+        SharedTracer.save(path)
+    except OSError:
+        SharedTracer.logger.exception("Failed to save trace to %s", path.as_posix())
+        return None
+
+    old = sorted(folder.glob(f"{TRACE_FILE_PREFIX}*.json"))[:-TRACE_FILES_KEPT]
+    for file in old:
+        file.unlink(missing_ok=True)
+    return path
+
+
+SharedTracer = Tracer()
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 from PySide6.QtCore import QPointF
+from PySide6.QtGui import QPolygonF
 
 
 def vector2f(data: list[float]):
     return QPointF(data[0], -data[1])
+
+
+def polygon2f(points: list[float], offset: QPointF | None = None) -> QPolygonF:
+    """Builds a polygon from a flat [x0, y0, x1, y1, ...] list, inverting the y axis like vector2f."""
+    offset = offset if offset is not None else QPointF()
+    return QPolygonF([offset + QPointF(points[i], -points[i + 1]) for i in range(0, len(points) - 1, 2)])
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QFont, QPainter, QPen
+from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
+
+from dreaditor.level_of_detail import CLUSTER_CELL_PX, is_clustered, level_of_detail
+from dreaditor.tracing import traced
+from dreaditor.widgets.scenario_actor_dot import COLOR_ENTITY, COLOR_LIGHT, COLOR_SOUND, COLOR_UNDEFINED, DOT_Z
+
+if TYPE_CHECKING:
+    from dreaditor.actor import Actor
+
+LAYER_COLORS = [COLOR_ENTITY, COLOR_SOUND, COLOR_LIGHT, COLOR_UNDEFINED]
+LAYER_CODES = {"rEntitiesLayer": 0, "rSoundsLayer": 1, "rLightsLayer": 2}
+TEXT_COLOR = QColor(255, 255, 255, 255)
+
+# marker radius in screen pixels, growing with the number of actors in the cluster
+MARKER_RADIUS_PX = 3.0
+MARKER_GROWTH_PX = 1.5
+LABEL_PX = 10
+# markers are sized in screen pixels, so at the edges of the scene they reach past the actors
+BOUNDS_PADDING = 2000.0
+
+
+class ActorClusterItem(QGraphicsItem):
+    """
+    Stands in for the actor dots when the view is zoomed far out.
+
+    Checked actors are grouped into screen-space cells and each cell is drawn as a single marker, colored by the layer
+    most of its actors are in. Selected and hovered actors are left to their own dots, so they stay visible.
+    """
+
+    actors: list[Actor]
+    rect: QRectF
+
+    def __init__(self, parent: QGraphicsItem | None = ...):
+        super().__init__(parent)
+        self.setZValue(DOT_Z)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.actors = []
+        self.rect = QRectF()
+        self._positions: np.ndarray | None = None
+        self._layers: np.ndarray | None = None
+        # which actors are drawn in a cluster: shown, and neither selected nor hovered. Cleared when one changes
+        self._clustered: np.ndarray | None = None
+        # the level of detail of the last paint, to know how big the markers are
+        self._lod: float | None = None
+
+    def add_actors(self, actors: list[Actor]):
+        rect = QRectF(self.rect)
+        for actor in actors:
+            rect = rect.united(actor.actor_rect)
+
+        if rect != self.rect:
+            self.prepareGeometryChange()
+            self.rect = rect
+        self.actors.extend(actors)
+        self._positions = None
+        self._clustered = None
+
+    def _arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._positions is None:
+            self._positions = np.array([[a.position.x(), a.position.y()] for a in self.actors], dtype=np.float64)
+            self._layers = np.array([LAYER_CODES.get(a.ref.layer, 3) for a in self.actors], dtype=np.int64)
+        return self._positions, self._layers
+
+    def _clustered_mask(self) -> np.ndarray:
+        if self._clustered is None:
+            self._clustered = np.fromiter(
+                (a.is_shown and not a.is_selected and not a.is_hovered for a in self.actors),
+                dtype=bool,
+                count=len(self.actors),
+            )
+        return self._clustered
+
+    def invalidate_actor(self, actor: Actor):
+        """
+        Called when actor is shown, hidden, selected or hovered. Repaints the cluster containing actor, rather than
+        every cluster.
+        """
+        self._clustered = None
+        if self._lod is None:
+            return
+
+        cell = CLUSTER_CELL_PX / self._lod
+        # the marker is centered in the cell, and never bigger than a cluster of every actor
+        margin = (MARKER_RADIUS_PX + MARKER_GROWTH_PX * math.log2(max(len(self.actors), 1))) / self._lod
+        x = math.floor(actor.position.x() / cell) * cell
+        y = math.floor(actor.position.y() / cell) * cell
+        self.update(QRectF(x, y, cell, cell).adjusted(-margin, -margin, margin, margin))
+
+    def boundingRect(self) -> QRectF:
+        return self.rect.adjusted(-BOUNDS_PADDING, -BOUNDS_PADDING, BOUNDS_PADDING, BOUNDS_PADDING)
+
+    @traced("paint")
+    def paint(
+        self, painter: QPainter | None, option: QStyleOptionGraphicsItem | None, widget: QWidget | None = ...
+    ) -> None:
+        lod = level_of_detail(painter, option)
+        if not self.actors or not is_clustered(lod):
+            self._lod = None
+            return
+
+        self._lod = lod
+
+        positions, layers = self._arrays()
+        cell = CLUSTER_CELL_PX / lod
+        exposed = option.exposedRect.adjusted(-cell, -cell, cell, cell)
+        mask = self._clustered_mask().copy()
+        mask &= (positions[:, 0] >= exposed.left()) & (positions[:, 0] <= exposed.right())
+        mask &= (positions[:, 1] >= exposed.top()) & (positions[:, 1] <= exposed.bottom())
+        if not mask.any():
+            return
+
+        points = positions[mask]
+        _, cluster_ids, counts = np.unique(
+            np.floor(points / cell).astype(np.int64), axis=0, return_inverse=True, return_counts=True
+        )
+        cluster_ids = cluster_ids.reshape(-1)
+        centers_x = np.bincount(cluster_ids, weights=points[:, 0]) / counts
+        centers_y = np.bincount(cluster_ids, weights=points[:, 1]) / counts
+        dominant = np.bincount(cluster_ids * 4 + layers[mask], minlength=len(counts) * 4).reshape(-1, 4).argmax(axis=1)
+
+        radii = [MARKER_RADIUS_PX + MARKER_GROWTH_PX * math.log2(count) for count in counts.tolist()]
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        for (x, y), radius_px, layer in zip(zip(centers_x.tolist(), centers_y.tolist()), radii, dominant.tolist()):
+            painter.setBrush(LAYER_COLORS[layer])
+            painter.drawEllipse(QPointF(x, y), radius_px / lod, radius_px / lod)
+
+        # label the clusters whose marker is big enough to hold their actor count
+        font = QFont(painter.font())
+        font.setPixelSize(max(1, round(LABEL_PX / lod)))
+        painter.setFont(font)
+        painter.setPen(QPen(TEXT_COLOR))
+        for (x, y), radius_px, count in zip(zip(centers_x.tolist(), centers_y.tolist()), radii, counts.tolist()):
+            if count > 1 and 2 * radius_px >= LABEL_PX:
+                radius = radius_px / lod
+                painter.drawText(
+                    QRectF(x - radius, y - radius, 2 * radius, 2 * radius), Qt.AlignmentFlag.AlignCenter, str(count)
+                )
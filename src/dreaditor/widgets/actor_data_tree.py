@@ -1,18 +1,22 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QWidget
 
 from dreaditor.actor import Actor, ActorSelectionState
 from dreaditor.actor_reference import ActorRef
-from dreaditor.widgets.actor_data_tree_item import ActorDataTreeItem
+from dreaditor.tracing import traced
+from dreaditor.widgets.actor_data_tree_item import ActorDataTreeItem, LazyDataTreeItem
 
 if TYPE_CHECKING:
     from dreaditor.rom_manager import RomManager
 
+# maximum number of children created at once when expanding a large list
+PAGE_SIZE = 1000
+
 
 class ActorDataTreeWidget(QTreeWidget):
     rom_manager: RomManager
@@ -25,7 +29,9 @@ class ActorDataTreeWidget(QTreeWidget):
         self.setHeaderLabels(["name", "value"])
         self.setColumnCount(2)
         self.itemDoubleClicked.connect(self.onItemDoubleClicked)
+        self.itemExpanded.connect(self.onItemExpanded)
 
+    @traced("tree", "load actor data")
     def LoadActor(self, actor: Actor):
         # guard against loading actor multiple times
         idx = self.FindActor(actor)
@@ -40,42 +46,38 @@ class ActorDataTreeWidget(QTreeWidget):
             cc_data.addChild(subarea_widget)
         top_actor.addChild(cc_data)
 
-        # load the level data from the brfld
-        level_data = QTreeWidgetItem(["Level Data"])
-        self.AddKeysToActor(level_data, actor.level_data)
-        top_actor.addChild(level_data)
+        # the data below is only fetched and converted once its item is expanded
+        top_actor.addChild(
+            LazyDataTreeItem(["Level Data"], lambda: self.CreateChildItems(self.rom_manager.get_level_data(actor.ref)))
+        )
+        top_actor.addChild(LazyDataTreeItem(["Actordef Data"], lambda: self.CreateActordefItems(actor)))
+
+        if actor.actordef.collision_file is not None:
+            top_actor.addChild(LazyDataTreeItem(["BMSCC"], lambda: self.CreateCollisionItems(actor)))
+
+        self.addTopLevelItem(top_actor)
+
+    def CreateCollisionItems(self, actor: Actor) -> list[QTreeWidgetItem]:
+        return self.CreateChildItems(self.rom_manager.get_collision_file(actor.actordef.collision_file).raw)
 
+    def CreateActordefItems(self, actor: Actor) -> list[QTreeWidgetItem]:
         # load the bmsad components, actionsets, soundfx
-        if actor.bmsad is not None:
-            bmsad = actor.bmsad
-            bmsad_data = QTreeWidgetItem(["Actordef Data"])
-            bmsad_comps = QTreeWidgetItem(["Components"])
-            self.AddKeysToActor(bmsad_comps, bmsad.raw.components)
-            bmsad_actionsets = QTreeWidgetItem(["Action Sets"])
-            bmsad_actionsets.addChildren([QTreeWidgetItem(["", item]) for item in bmsad.raw.action_sets])
-            bmsad_soundfx = QTreeWidgetItem(["Sound FX"])
-            bmsad_soundfx.addChildren(
-                [QTreeWidgetItem(["", f"{item[0]} (VOL {item[1]})"]) for item in bmsad.raw.sound_fx]
-            )
-            bmsad_data.addChildren([bmsad_comps, bmsad_actionsets, bmsad_soundfx])
-            top_actor.addChild(bmsad_data)
-        else:
+        bmsad = self.rom_manager.get_actor_def(actor.data.actordef)
+        if bmsad is None:
             self.logger.warning(
                 "The BMSAD for actor %s/%s/%s cannot be accessed due to a bug in mercury-engine-data-structures",
                 actor.ref.layer,
                 actor.ref.sublayer,
                 actor.ref.name,
             )
+            return []
 
-        if actor.bmscc is not None:
-            bmscc_item = QTreeWidgetItem(["BMSCC"])
-            self.AddKeysToActor(bmscc_item, actor.bmscc.raw)
-            top_actor.addChild(bmscc_item)
-
-        # add top actor, expand recursively but make the root item unexpanded
-        self.addTopLevelItem(top_actor)
-        self.expandRecursively(self.indexFromItem(top_actor))
-        top_actor.setExpanded(False)
+        bmsad_comps = LazyDataTreeItem(["Components"], lambda: self.CreateChildItems(bmsad.raw.components))
+        bmsad_actionsets = QTreeWidgetItem(["Action Sets"])
+        bmsad_actionsets.addChildren([QTreeWidgetItem(["", item]) for item in bmsad.raw.action_sets])
+        bmsad_soundfx = QTreeWidgetItem(["Sound FX"])
+        bmsad_soundfx.addChildren([QTreeWidgetItem(["", f"{item[0]} (VOL {item[1]})"]) for item in bmsad.raw.sound_fx])
+        return [bmsad_comps, bmsad_actionsets, bmsad_soundfx]
 
     def FindActor(self, actor: Actor) -> int:
         # find actor in top-level elements
@@ -100,32 +102,47 @@ class ActorDataTreeWidget(QTreeWidget):
 
         self.takeTopLevelItem(idx)
 
-    def AddKeysToActor(self, item: QTreeWidgetItem, val: dict):
-        for k, v in val.items():
-            if k in ["_io"]:
-                continue
-
-            if isinstance(v, dict):
-                child = QTreeWidgetItem([k, ""])
-                self.AddKeysToActor(child, v)
-                item.addChild(child)
-
-            elif isinstance(v, list):
-                child = QTreeWidgetItem([k, ""])
-
-                if len(v) > 0 and len(v) <= 4 and isinstance(v[0], int | float):
-                    res = "["
-                    for va in v:
-                        res += f"{va:.3f}"
-                        res += ", "
-                    res = res[:-2] + "]"
-                    item.addChild(QTreeWidgetItem([k, res]))
-                else:
-                    self.AddKeysToActor(child, {str(i): value for i, value in enumerate(v)})
-                    item.addChild(child)
-
-            else:
-                item.addChild(QTreeWidgetItem([k, str(v)]))
+    def CreateChildItems(self, val: dict | list) -> list[QTreeWidgetItem]:
+        entries = val.items() if isinstance(val, dict) else enumerate(val)
+        return self.CreateEntryItems([(str(k), v) for k, v in entries if k != "_io"])
+
+    def CreateEntryItems(self, entries: list[tuple[str, Any]]) -> list[QTreeWidgetItem]:
+        # split large containers into pages, so expanding them only creates PAGE_SIZE items at a time
+        if len(entries) > PAGE_SIZE:
+            pages = []
+            for page_start in range(0, len(entries), PAGE_SIZE):
+                page = entries[page_start : page_start + PAGE_SIZE]
+                pages.append(
+                    LazyDataTreeItem(
+                        [f"items {page_start}–{page_start + len(page) - 1}", ""],
+                        lambda page=page: self.CreateEntryItems(page),
+                    )
+                )
+            return pages
+
+        return [self.CreateValueItem(k, v) for k, v in entries]
+
+    def CreateValueItem(self, k: str, v) -> QTreeWidgetItem:
+        if isinstance(v, dict):
+            return LazyDataTreeItem([k, ""], lambda: self.CreateChildItems(v))
+
+        if isinstance(v, list):
+            if len(v) > 0 and len(v) <= 4 and isinstance(v[0], int | float):
+                res = "["
+                for va in v:
+                    res += f"{va:.3f}"
+                    res += ", "
+                res = res[:-2] + "]"
+                return QTreeWidgetItem([k, res])
+
+            return LazyDataTreeItem([k, ""], lambda: self.CreateChildItems(v))
+
+        return QTreeWidgetItem([k, str(v)])
+
+    @Slot(QTreeWidgetItem)
+    def onItemExpanded(self, item: QTreeWidgetItem):
+        if isinstance(item, LazyDataTreeItem):
+            item.populate()
 
     @Slot(QTreeWidgetItem, int)
     def onItemDoubleClicked(self, item: QTreeWidgetItem, col):
@@ -146,7 +163,8 @@ class ActorDataTreeWidget(QTreeWidget):
                     # select actor
                     ref = ActorRef(self.rom_manager.scenario, elements[2], elements[4], elements[6])
                     actor = self.rom_manager.get_actor_from_ref(ref)
-                    actor.OnSelected(ActorSelectionState.Selected)
+                    if actor is not None:
+                        actor.OnSelected(ActorSelectionState.Selected)
             elif (
                 item.parent() is not None
                 and item.parent().parent() is not None
@@ -4,7 +4,11 @@ from typing import TYPE_CHECKING
 
 from PySide6.QtWidgets import QTreeWidgetItem
 
+from dreaditor.tracing import traced
+
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     from dreaditor.actor import Actor
 
 
@@ -14,3 +18,24 @@ class ActorDataTreeItem(QTreeWidgetItem):
     def __init__(self, actor: Actor) -> None:
         super().__init__([actor.ref.name])
         self.actor = actor
+
+
+class LazyDataTreeItem(QTreeWidgetItem):
+    """An item that only creates its children the first time it is expanded."""
+
+    loader: Callable[[], Iterable[QTreeWidgetItem]] | None
+
+    def __init__(self, texts: list[str], loader: Callable[[], Iterable[QTreeWidgetItem]]) -> None:
+        super().__init__(texts)
+        self.loader = loader
+        self.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+
+    @traced("tree", "populate actor data")
+    def populate(self):
+        if self.loader is None:
+            return
+
+        loader = self.loader
+        self.loader = None
+        self.addChildren(list(loader()))
+        self.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicatorWhenChildless)
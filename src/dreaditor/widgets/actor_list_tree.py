@@ -3,88 +3,113 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from PySide6.QtCore import Qt, Slot
-from PySide6.QtWidgets import QAbstractItemView, QTreeWidget, QTreeWidgetItem, QWidget
+from PySide6.QtCore import QModelIndex, Qt, Slot
+from PySide6.QtWidgets import QAbstractItemView, QLineEdit, QTreeView, QVBoxLayout, QWidget
 
-from dreaditor.widgets.entity_list_tree_item import EntityListTreeWidgetItem
+from dreaditor.widgets.actor_tree_model import ActorTreeModel, ActorTreeNode
 
 if TYPE_CHECKING:
     from dreaditor.actor import Actor
     from dreaditor.widgets.actor_data_tree import ActorDataTreeWidget
 
+# while filtering, the groups containing the matches are expanded if there are at most this many
+FILTER_EXPAND_LIMIT = 200
 
-class ActorListTree(QTreeWidget):
-    root_node: QTreeWidgetItem
-    actors: list[EntityListTreeWidgetItem]
+
+class ActorListTree(QTreeView):
+    tree_model: ActorTreeModel
     actor_data_tree: ActorDataTreeWidget
+    # whether to expand the groups of the actors matching a filter. expanding has side effects in some trees
+    expand_filter_matches: bool = True
 
     def __init__(self, actor_data_tree: ActorDataTreeWidget, root_name: str, parent: QWidget | None = ...) -> None:
         super().__init__(parent)
         self.logger = logging.getLogger(type(self).__name__)
 
         self.setHeaderHidden(True)
-        self.setSortingEnabled(True)
-        self.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.setUniformRowHeights(True)
         self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.itemChanged.connect(self.onItemChanged)
-        self.itemDoubleClicked.connect(self.onItemDoubleClicked)
+        self.doubleClicked.connect(self.onItemDoubleClicked)
+        self.expanded.connect(self._apply_pending_filter)
         # TODO set hover state, or possibly single-click state
 
         self.actor_data_tree = actor_data_tree
-        self.actors = []
-
-        self.root_node = QTreeWidgetItem([root_name])
-        self.root_node.setFlags(
-            self.root_node.flags() | Qt.ItemFlag.ItemIsAutoTristate | Qt.ItemFlag.ItemIsUserCheckable
-        )
-        self.root_node.setCheckState(0, Qt.CheckState.Unchecked)
+        # collapsed group -> children whose filter state changed, applied when the group is expanded
+        self._pending_filter: dict[ActorTreeNode, set[ActorTreeNode]] = {}
 
-        self.addTopLevelItem(self.root_node)
-        self.root_node.setExpanded(True)
+        self.tree_model = ActorTreeModel(root_name, self)
+        self.setModel(self.tree_model)
+        self.expand(self.tree_model.index_of(self.tree_model.top))
 
     def on_new_scenario_selected(self):
-        self.actors = []
-        self.root_node.takeChildren()
-
-    def add_actor(self, path: list[str], actor: Actor) -> EntityListTreeWidgetItem:
-        item = self.root_node
-        for p in path:
-            item = self.select_child_of_widget_item(item, p, True)
-
-        actor_item = EntityListTreeWidgetItem(actor)
-        item.addChild(actor_item)
-        return actor_item
-
-    def select_child_of_widget_item(
-        self, item: QTreeWidgetItem, text: str, create_if_nonexistent=False
-    ) -> QTreeWidgetItem | None:
-        for childIdx in range(item.childCount()):
-            if item.child(childIdx).text(0) == text:
-                return item.child(childIdx)
-
-        if create_if_nonexistent:
-            newChild = QTreeWidgetItem(item, [text])
-            newChild.setFlags(newChild.flags() | Qt.ItemFlag.ItemIsAutoTristate | Qt.ItemFlag.ItemIsUserCheckable)
-            newChild.setCheckState(0, Qt.CheckState.Unchecked)
-            return newChild
-
-        return None
-
-    def item_depth(self, item: QTreeWidgetItem):
-        depth = 0
-        curr_item = item.parent()  # so root is 0 depth
-        while curr_item:
-            depth += 1
-            curr_item = curr_item.parent()
-        return depth
-
-    @Slot(QTreeWidgetItem, int)
-    def onItemChanged(self, item: QTreeWidgetItem, col):
-        if isinstance(item, EntityListTreeWidgetItem):
-            item.actor.UpdateCheckState(item.checkState(0) == Qt.CheckState.Checked)
-
-    @Slot(QTreeWidgetItem, int)
-    def onItemDoubleClicked(self, item: QTreeWidgetItem, col):
-        if isinstance(item, EntityListTreeWidgetItem):
-            item.actor.OnSelected()
+        self._pending_filter.clear()
+        self.tree_model.clear()
+        self.expand(self.tree_model.index_of(self.tree_model.top))
+
+    def on_scenario_loaded(self):
+        # items are appended in load order; sort once instead of on every insertion
+        self.tree_model.sort(0, Qt.SortOrder.AscendingOrder)
+
+    def add_actors(self, entries: list[tuple[list[str], Actor]]):
+        self.tree_model.add_actors(entries)
+
+    def on_actors_filtered(self, actors: list[Actor], matches: set[Actor] | None):
+        """
+        Shows or hides the rows of actors whose filter state changed, without touching the rest of the tree.
+
+        Rows inside collapsed groups can't be seen, so they are only updated once their group is expanded.
+        """
+        expanded: dict[ActorTreeNode, bool] = {}
+        for node in self.tree_model.on_actors_filtered(actors):
+            parent = node.parent
+            if parent not in expanded:
+                expanded[parent] = parent is self.tree_model.root or self.isExpanded(self.tree_model.index_of(parent))
+
+            if expanded[parent]:
+                self.setRowHidden(node.row, self.tree_model.index_of(parent), node.is_filtered())
+            else:
+                self._pending_filter.setdefault(parent, set()).add(node)
+
+        if self.expand_filter_matches and matches is not None and len(matches) <= FILTER_EXPAND_LIMIT:
+            for actor in matches:
+                for node in actor.tree_nodes:
+                    if node.model is self.tree_model:
+                        self.expand_to(node)
+
+    @Slot(QModelIndex)
+    def _apply_pending_filter(self, index: QModelIndex):
+        parent = self.tree_model.node(index)
+        for node in self._pending_filter.pop(parent, ()):
+            self.setRowHidden(node.row, index, node.is_filtered())
+
+    def expand_to(self, node: ActorTreeNode):
+        node = node.parent
+        while node is not None and node is not self.tree_model.root:
+            self.expand(self.tree_model.index_of(node))
+            node = node.parent
+
+    @Slot(QModelIndex)
+    def onItemDoubleClicked(self, index: QModelIndex):
+        actor = self.tree_model.node(index).actor
+        if actor is not None:
+            actor.OnSelected()
+
+
+class ActorListPanel(QWidget):
+    """An actor tree with a filter box above it."""
+
+    filter_edit: QLineEdit
+    tree: ActorListTree
+
+    def __init__(self, tree: ActorListTree, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name, actordef or component")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.tree = tree
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.filter_edit)
+        layout.addWidget(self.tree)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QPersistentModelIndex, Qt, QThread, Signal, Slot
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from dreaditor.actor_database import ActorDatabase, QueryError
+
+if TYPE_CHECKING:
+    from dreaditor.actor_database import ActorRecord
+    from dreaditor.rom_manager import RomManager
+
+COLUMNS = ["Scenario", "Layer", "Sublayer", "Name", "Actordef"]
+QUERY_PLACEHOLDER = "component:CBreakableTileGroupComponent aGridTiles.eTileType=5"
+
+
+class ActorDatabaseBuilder(QObject):
+    """Opens the actor database of a RomFS on a worker thread, indexing the scenarios that changed."""
+
+    progress = Signal(int, int, str)
+    finished = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, romfs: Path):
+        super().__init__(None)
+        self.logger = logging.getLogger(type(self).__name__)
+        self.romfs = romfs
+
+    @Slot()
+    def run(self):
+        try:
+            self.finished.emit(ActorDatabase.open(self.romfs, progress=self.progress.emit))
+        except Exception as e:
+            self.logger.exception("Failed to build the actor database")
+            self.failed.emit(str(e))
+
+
+class ActorQueryModel(QAbstractTableModel):
+    records: list[ActorRecord]
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self.records = []
+
+    def set_records(self, records: list[ActorRecord]):
+        self.beginResetModel()
+        self.records = records
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+
+        record = self.records[index.row()]
+        return [
+            record.ref.scenario.long_name,
+            record.layer,
+            record.sublayer,
+            record.name,
+            record.actordef,
+        ][index.column()]
+
+
+class ActorQueryWidget(QWidget):
+    """Searches every scenario of the selected RomFS, see ActorDatabase.query for the syntax."""
+
+    # emitted with the ActorRef of a result that was double-clicked
+    actor_activated = Signal(object)
+
+    rom_manager: RomManager
+    database: ActorDatabase | None
+    results: ActorQueryModel
+    _build_thread: QThread | None
+
+    def __init__(self, rom_manager: RomManager, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(type(self).__name__)
+        self.rom_manager = rom_manager
+        self.database = None
+        self._build_thread = None
+        self._builder = None
+        self._pending_query = False
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText(QUERY_PLACEHOLDER)
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.returnPressed.connect(self.run_query)
+
+        self.results = ActorQueryModel(self)
+        self.result_view = QTableView()
+        self.result_view.setModel(self.results)
+        self.result_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.result_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.result_view.verticalHeader().hide()
+        self.result_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.result_view.doubleClicked.connect(self.on_result_double_clicked)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        self.rebuild_button = QPushButton("Update Index")
+        self.rebuild_button.clicked.connect(self.build_database)
+
+        status_row = QHBoxLayout()
+        status_row.addWidget(self.status_label, 1)
+        status_row.addWidget(self.rebuild_button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.result_view, 1)
+        layout.addLayout(status_row)
+
+    def on_rom_selected(self):
+        # the database belongs to the previous RomFS
+        self.database = None
+        self.results.set_records([])
+        self.status_label.clear()
+
+    def build_database(self):
+        if self._build_thread is not None:
+            return
+        if not self.rom_manager.assert_rom_selected():
+            self.status_label.setText("No RomFS selected!")
+            return
+
+        self._builder = ActorDatabaseBuilder(Path(self.rom_manager.path))
+        self._build_thread = QThread()
+        self._builder.moveToThread(self._build_thread)
+        self._build_thread.started.connect(self._builder.run)
+        self._builder.progress.connect(self.on_build_progress)
+        self._builder.finished.connect(self.on_build_finished)
+        self._builder.failed.connect(self.on_build_failed)
+        self._builder.finished.connect(self._build_thread.quit)
+        self._builder.failed.connect(self._build_thread.quit)
+        self._build_thread.finished.connect(self.on_build_thread_finished)
+
+        self.rebuild_button.setEnabled(False)
+        self.status_label.setText("Indexing scenarios...")
+        self._build_thread.start()
+
+    def shutdown(self):
+        if self._build_thread is not None:
+            self._build_thread.quit()
+            self._build_thread.wait()
+
+    @Slot(int, int, str)
+    def on_build_progress(self, done: int, total: int, message: str):
+        self.status_label.setText(f"{message} ({done}/{total})")
+
+    @Slot(object)
+    def on_build_finished(self, database: ActorDatabase):
+        self.database = database
+        self.status_label.setText(f"Indexed {len(database)} actors in {len(database.scenarios())} scenarios")
+        if self._pending_query:
+            self._pending_query = False
+            self.run_query()
+
+    @Slot(str)
+    def on_build_failed(self, message: str):
+        self._pending_query = False
+        self.status_label.setText(f"Indexing failed: {message}")
+
+    @Slot()
+    def on_build_thread_finished(self):
+        self._build_thread = None
+        self._builder = None
+        self.rebuild_button.setEnabled(True)
+
+    @Slot()
+    def run_query(self):
+        if self.database is None:
+            # the first query builds the database, and runs once it's done
+            self._pending_query = True
+            self.build_database()
+            return
+
+        try:
+            records = self.database.query(self.query_edit.text())
+        except QueryError as e:
+            self.status_label.setText(f"Invalid query: {e}")
+            return
+
+        self.results.set_records(records)
+        self.status_label.setText(f"{len(records)} of {len(self.database)} actors")
+
+    @Slot(QModelIndex)
+    def on_result_double_clicked(self, index: QModelIndex):
+        self.actor_activated.emit(self.results.records[index.row()].ref)
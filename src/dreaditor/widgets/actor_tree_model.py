@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, QPersistentModelIndex, Qt, QTimer
+from PySide6.QtGui import QColor, QFont
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from dreaditor.actor import Actor
+    from dreaditor.widgets.collision_camera_item import CollisionCameraItem
+
+HIGHLIGHTED_BACKGROUND = QColor(0x666666)
+
+
+class ActorTreeNode:
+    """A row in an ActorTreeModel: either a group (layer, sublayer, setup, ...) or a single actor."""
+
+    __slots__ = (
+        "model",
+        "name",
+        "parent",
+        "children",
+        "child_index",
+        "row",
+        "actor",
+        "collision_camera_item",
+        "actor_count",
+        "checked_count",
+        "match_count",
+        "shown_count",
+    )
+
+    model: ActorTreeModel
+    name: str
+    parent: ActorTreeNode | None
+    children: list[ActorTreeNode]
+    child_index: dict[str, ActorTreeNode]
+    row: int
+    actor: Actor | None
+    collision_camera_item: CollisionCameraItem | None
+    # number of actors below this node, and how many of them are checked. Kept up to date incrementally, so the
+    # tristate of a group never has to walk its children
+    actor_count: int
+    checked_count: int
+    # number of actors below this node that aren't filtered out. groups without any are hidden while filtering
+    match_count: int
+    # number of actors below this node that are checked and not filtered out, so shown in the scene
+    shown_count: int
+
+    def __init__(self, model: ActorTreeModel, name: str, parent: ActorTreeNode | None, actor: Actor | None = None):
+        self.model = model
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.child_index = {}
+        self.row = 0
+        self.actor = actor
+        self.collision_camera_item = None
+        self.actor_count = 0
+        self.checked_count = 0
+        self.match_count = 0
+        self.shown_count = 0
+
+    def child(self, name: str) -> ActorTreeNode | None:
+        return self.child_index.get(name)
+
+    def actors(self) -> Iterator[Actor]:
+        if self.actor is not None:
+            yield self.actor
+        for child in self.children:
+            yield from child.actors()
+
+    def depth(self) -> int:
+        # the top-level node is at depth 0
+        depth = -1
+        node = self.parent
+        while node is not None:
+            depth += 1
+            node = node.parent
+        return depth
+
+    def is_filtered(self) -> bool:
+        if self.actor is not None:
+            return self.actor.is_filtered
+        # the top-level node stays visible, so there is somewhere to show that nothing matched
+        return self.match_count == 0 and self.parent is not None and self.parent.parent is not None
+
+    def check_state(self) -> Qt.CheckState:
+        if self.actor is not None:
+            return Qt.CheckState.Checked if self.actor.is_checked else Qt.CheckState.Unchecked
+
+        if self.checked_count == 0:
+            return Qt.CheckState.Unchecked
+        if self.checked_count == self.actor_count:
+            return Qt.CheckState.Checked
+        return Qt.CheckState.PartiallyChecked
+
+
+class ActorTreeModel(QAbstractItemModel):
+    """
+    A checkable tree of actors grouped by a path of names.
+
+    Children are looked up by name in constant time, actors are inserted in batches per parent, and sorting happens
+    once when loading is done rather than on every insertion. Display updates caused by actor state changes are
+    coalesced and emitted on the next event loop iteration.
+    """
+
+    root: ActorTreeNode
+    top: ActorTreeNode
+
+    def __init__(self, root_name: str, parent=None):
+        super().__init__(parent)
+        self.root = ActorTreeNode(self, "", None)
+        self.top = ActorTreeNode(self, root_name, self.root)
+        self.root.children.append(self.top)
+        self._dirty: set[ActorTreeNode] = set()
+        self._flush_scheduled = False
+
+    # QAbstractItemModel
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+
+        return self.createIndex(row, column, self.node(parent).children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+
+        return self.index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).children)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        node: ActorTreeNode = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return node.check_state()
+        if node.actor is not None:
+            if role == Qt.ItemDataRole.FontRole and node.actor.is_selected:
+                font = QFont()
+                font.setBold(True)
+                return font
+            if role == Qt.ItemDataRole.BackgroundRole and node.actor.is_hovered:
+                return HIGHLIGHTED_BACKGROUND
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        node: ActorTreeNode = index.internalPointer()
+        for actor in list(node.actors()):
+            actor.UpdateCheckState(checked)
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        self.layoutAboutToBeChanged.emit()
+        old_indices = self.persistentIndexList()
+        old_nodes = [index.internalPointer() for index in old_indices]
+
+        def _sort(node: ActorTreeNode):
+            node.children.sort(key=lambda n: n.name, reverse=order == Qt.SortOrder.DescendingOrder)
+            for row, child in enumerate(node.children):
+                child.row = row
+                _sort(child)
+
+        _sort(self.root)
+        self.changePersistentIndexList(
+            old_indices,
+            [self.createIndex(n.row, i.column(), n) for i, n in zip(old_indices, old_nodes)],
+        )
+        self.layoutChanged.emit()
+
+    # tree access
+    def node(self, index: QModelIndex | QPersistentModelIndex) -> ActorTreeNode:
+        if not index.isValid():
+            return self.root
+        return index.internalPointer()
+
+    def index_of(self, node: ActorTreeNode) -> QModelIndex:
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def find(self, path: list[str]) -> ActorTreeNode | None:
+        node = self.top
+        for name in path:
+            node = node.child(name)
+            if node is None:
+                return None
+        return node
+
+    def group(self, path: list[str]) -> ActorTreeNode:
+        """Returns the group node at path below the top-level node, creating any missing groups."""
+        node = self.top
+        for name in path:
+            child = node.child(name)
+            if child is None:
+                child = ActorTreeNode(self, name, node)
+                self._insert_children(node, [child])
+            node = child
+        return node
+
+    def add_actors(self, entries: list[tuple[list[str], Actor]]):
+        """Adds an actor below each group path, inserting all actors of the same group at once."""
+        pending: dict[ActorTreeNode, list[ActorTreeNode]] = {}
+        for path, actor in entries:
+            parent = self.group(path)
+            node = ActorTreeNode(self, actor.ref.name, parent, actor)
+            actor.tree_nodes.append(node)
+            pending.setdefault(parent, []).append(node)
+
+        for parent, nodes in pending.items():
+            self._insert_children(parent, nodes)
+
+    def clear(self):
+        self.beginResetModel()
+        self.top.children = []
+        self.top.child_index = {}
+        self.top.actor_count = 0
+        self.top.checked_count = 0
+        self.top.match_count = 0
+        self.top.shown_count = 0
+        self._dirty.clear()
+        self.endResetModel()
+
+    def _insert_children(self, parent: ActorTreeNode, nodes: list[ActorTreeNode]):
+        first = len(parent.children)
+        self.beginInsertRows(self.index_of(parent), first, first + len(nodes) - 1)
+        for row, node in enumerate(nodes, first):
+            node.row = row
+            parent.children.append(node)
+            parent.child_index[node.name] = node
+
+        added = sum(1 for node in nodes if node.actor is not None)
+        checked = sum(1 for node in nodes if node.actor is not None and node.actor.is_checked)
+        matched = sum(1 for node in nodes if node.actor is not None and not node.actor.is_filtered)
+        shown = sum(1 for node in nodes if node.actor is not None and node.actor.is_shown)
+        ancestor = parent
+        while ancestor is not None:
+            ancestor.actor_count += added
+            ancestor.checked_count += checked
+            ancestor.match_count += matched
+            ancestor.shown_count += shown
+            ancestor = ancestor.parent
+        self.endInsertRows()
+
+        self._mark_dirty(parent)
+
+    # actor state updates
+    def on_actor_check_changed(self, node: ActorTreeNode, checked: bool):
+        delta = 1 if checked else -1
+        shown_delta = 0 if node.actor.is_filtered else delta
+        ancestor = node.parent
+        while ancestor is not None:
+            ancestor.checked_count += delta
+            ancestor.shown_count += shown_delta
+            ancestor = ancestor.parent
+        self._mark_dirty(node)
+
+    def on_actors_filtered(self, actors: list[Actor]) -> list[ActorTreeNode]:
+        """
+        Updates the match counts for actors whose filter state changed, and returns the nodes that have to be shown or
+        hidden as a result. Only the changed actors and their groups are visited.
+        """
+        changed: dict[ActorTreeNode, bool] = {}
+        for actor in actors:
+            delta = -1 if actor.is_filtered else 1
+            shown_delta = delta if actor.is_checked else 0
+            for node in actor.tree_nodes:
+                if node.model is not self:
+                    continue
+
+                changed[node] = True
+                ancestor = node.parent
+                while ancestor is not None:
+                    ancestor.match_count += delta
+                    ancestor.shown_count += shown_delta
+                    # a group is shown or hidden when its first actor matches or its last one stops matching. it can
+                    # flip back within the same batch, so toggle rather than set
+                    if ancestor.match_count == (1 if delta > 0 else 0):
+                        changed[ancestor] = not changed.get(ancestor, False)
+                    ancestor = ancestor.parent
+
+        # the root and top-level node are never hidden
+        return [node for node, flipped in changed.items() if flipped and node.depth() >= 0]
+
+    def on_actor_changed(self, node: ActorTreeNode):
+        self._dirty.add(node)
+        self._schedule_flush()
+
+    def _mark_dirty(self, node: ActorTreeNode):
+        while node is not None and node is not self.root:
+            self._dirty.add(node)
+            node = node.parent
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        dirty = self._dirty
+        self._dirty = set()
+        for node in dirty:
+            index = self.index_of(node)
+            self.dataChanged.emit(index, index)
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from PySide6.QtCore import QPointF, QRectF, Qt
 from PySide6.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPen, QPolygonF
 from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
 
 from dreaditor.config import CurrentConfiguration
+from dreaditor.level_of_detail import MIN_TEXT_PX, level_of_detail
+from dreaditor.tile_cache import tile_cache_enabled
+from dreaditor.tracing import traced
+from dreaditor.utils import polygon2f
+
+if TYPE_CHECKING:
+    from dreaditor.scenario_data import CollisionCameraData
 
 COLLISION_CAMERA_COLOR = QColor(255, 200, 255, 255)
 PADDING_PCT = 0.95
+CAMERA_PEN_WIDTH = 20
 
 
 class CollisionCameraItem(QGraphicsItem):
@@ -16,22 +26,28 @@ class CollisionCameraItem(QGraphicsItem):
     bounding_rect: QRectF
     num_active_cameras: int
 
-    def __init__(self, cc: str):
+    def __init__(self, cc: CollisionCameraData):
         super().__init__(None)
         self.name = cc.name
         self.polys = []
         self.bounding_rect = QRectF()
         self.num_active_cameras = 0
 
-        pos = QPointF(cc.data.position[0], -cc.data.position[1])
-        for p in cc.data.polys:
-            poly = QPolygonF([pos + QPointF(pt.x, -pt.y) for pt in p.points])
+        for p in cc.polys:
+            poly = polygon2f(p)
             self.polys.append(poly)
             self.bounding_rect = self.bounding_rect.united(poly.boundingRect())
+        margin = CAMERA_PEN_WIDTH / 2
+        self.bounding_rect.adjust(-margin, -margin, margin, margin)
 
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = ...) -> None:
+        if not tile_cache_enabled():
+            self.paint_tile(painter, option)
+
+    @traced("paint")
+    def paint_tile(self, painter: QPainter, option: QStyleOptionGraphicsItem) -> None:
         if self.num_active_cameras > 0 or CurrentConfiguration["paintCollisionCameras"]:
-            painter.setPen(QPen(COLLISION_CAMERA_COLOR, 20))
+            painter.setPen(QPen(COLLISION_CAMERA_COLOR, CAMERA_PEN_WIDTH))
             font = QFont()
             font.setPointSize(100)
             painter.setFont(font)
@@ -39,7 +55,11 @@ class CollisionCameraItem(QGraphicsItem):
             for p in self.polys:
                 painter.drawPolygon(p)
 
-            name_halfsize = QFontMetricsF(font).size(0, self.name) / 2
+            metrics = QFontMetricsF(font)
+            if metrics.height() * level_of_detail(painter, option) < MIN_TEXT_PX:
+                return
+
+            name_halfsize = metrics.size(0, self.name) / 2
             poly_center = self.polys[0].boundingRect().center()
             painter.drawText(poly_center - QPointF(name_halfsize.width(), name_halfsize.height()), self.name)
 
@@ -49,13 +69,18 @@ class CollisionCameraItem(QGraphicsItem):
     def request_enable(self):
         self.num_active_cameras += 1
         if self.num_active_cameras == 1:
-            self.update()
+            self._on_visibility_changed()
 
         scene_view = self.scene().views()[0]
         scene_view.fitInView(self, Qt.AspectRatioMode.KeepAspectRatio)
         scene_view.scale(PADDING_PCT, PADDING_PCT)
+        scene_view.on_view_transformed()
 
     def request_disable(self):
         self.num_active_cameras -= 1
         if self.num_active_cameras == 0:
-            self.update()
+            self._on_visibility_changed()
+
+    def _on_visibility_changed(self):
+        self.scene().views()[0].tile_cache.invalidate(self.sceneBoundingRect())
+        self.update()
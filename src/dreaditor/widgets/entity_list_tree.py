@@ -9,15 +9,13 @@ if TYPE_CHECKING:
 
     from dreaditor.actor import Actor
     from dreaditor.widgets.actor_data_tree import ActorDataTreeWidget
-    from dreaditor.widgets.entity_list_tree_item import EntityListTreeWidgetItem
 
 
 class EntityListTreeWidget(ActorListTree):
-    actors: list[EntityListTreeWidgetItem]
     actor_data_tree: ActorDataTreeWidget
 
     def __init__(self, actor_data_tree: ActorDataTreeWidget, parent: QWidget | None = ...) -> None:
         super().__init__(actor_data_tree, "BRFLD", parent)
 
-    def add_actor(self, actor: Actor) -> EntityListTreeWidgetItem:
-        return super().add_actor([actor.ref.layer, actor.ref.sublayer], actor)
+    def add_actors(self, actors: list[Actor]):
+        super().add_actors([([actor.ref.layer, actor.ref.sublayer], actor) for actor in actors])
@@ -1,85 +1,180 @@
 from __future__ import annotations
 
-import math
+import logging
+from typing import TYPE_CHECKING
 
-from PySide6.QtCore import QPointF, QRectF
-from PySide6.QtGui import QBrush, QColor, QPainter, QPen, QPolygonF
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QBrush, QColor, QPainter, QPainterPath, QPen, QPolygonF
 from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
 
 from dreaditor.config import CurrentConfiguration
-from dreaditor.utils import vector2f
+from dreaditor.tile_cache import tile_cache_enabled
+from dreaditor.tracing import traced
+
+if TYPE_CHECKING:
+    from dreaditor.scenario_data import NavmeshData
+
+LOGGER = logging.getLogger(__name__)
 
 PEN = QPen(QColor(0, 0, 0, 255), 5.0)
 BRUSH = QBrush(QColor(64, 64, 64, 128))
 DEFAULT_COLOR = QColor(76, 87, 91, 255)
 
 
+def _to_polygon(points: np.ndarray) -> QPolygonF:
+    return QPolygonF([QPointF(x, y) for x, y in points.tolist()])
+
+
+def mesh_outlines(vertices: list[list[float]], indices: list[int]) -> list[np.ndarray] | None:
+    """
+    The boundary loops of a triangle mesh, as (n, 2) arrays in scene coordinates.
+
+    Edges shared by two triangles are interior, every other edge is on the outline (outer border or a hole). Returns
+    None if the boundary edges don't form closed loops, which happens if the triangles are not wound consistently.
+    """
+    if len(indices) % 3 != 0:
+        raise ValueError(f"Index Buffer should be divisible by 3! len={len(indices)}")
+
+    tris = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+    if len(tris) == 0:
+        return []
+    verts = np.asarray(vertices, dtype=np.float64)[:, :2]
+
+    # weld duplicated vertices, so neighboring triangles share edge indices
+    points, weld = np.unique(verts, axis=0, return_inverse=True)
+    tris = weld.reshape(-1)[tris]
+
+    edges = np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]])
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    _, edge_ids, counts = np.unique(np.sort(edges, axis=1), axis=0, return_inverse=True, return_counts=True)
+    boundary = edges[counts[edge_ids.reshape(-1)] == 1]
+
+    # chain the directed boundary edges into loops
+    successors: dict[int, list[int]] = {}
+    for a, b in boundary.tolist():
+        successors.setdefault(a, []).append(b)
+
+    loops = []
+    while successors:
+        start = next(iter(successors))
+        loop = [start]
+        current = start
+        while True:
+            ends = successors.get(current)
+            if not ends:
+                return None
+
+            nxt = ends.pop()
+            if not ends:
+                del successors[current]
+            if nxt == start:
+                break
+            loop.append(nxt)
+            current = nxt
+
+        if len(loop) >= 3:
+            loops.append(points[loop])
+
+    # Qt's y axis points down, so invert it
+    for loop in loops:
+        loop[:, 1] *= -1
+    return loops
+
+
+def mesh_triangles(vertices: list[list[float]], indices: list[int]) -> list[np.ndarray]:
+    """Every triangle of a mesh as a (3, 2) array in scene coordinates."""
+    verts = np.asarray(vertices, dtype=np.float64)[:, :2] * (1.0, -1.0)
+    return list(verts[np.asarray(indices, dtype=np.int64).reshape(-1, 3)])
+
+
 class MapGeometry(QGraphicsItem):
-    polybuf: list[QPolygonF]
+    """
+    The navmesh of a scenario, drawn as a single layer.
+
+    With mergeNavmeshOutlines, the triangles of each navmesh geometry are merged into one path made of their outline
+    loops, so drawing the whole layer takes one drawPath per geometry instead of one drawPolygon per triangle. It only
+    changes with that option, so it is usually drawn from the ScenarioViewer's tile cache.
+    """
+
+    navmeshes: list[NavmeshData]
+    paths: list[QPainterPath]
+    # the triangles of every geometry, drawn one by one when mergeNavmeshOutlines is off
+    triangles: list[QPolygonF]
     rect: QRectF
     color: QColor
 
     def __init__(
         self,
-        verts: list[list[float]],
-        indices: list[list[int]],
+        navmeshes: list[NavmeshData],
         color: QColor | None,
         z: float,
         parent: QGraphicsItem | None = ...,
     ):
         super().__init__(parent)
-
-        if len(indices) % 3 != 0:
-            raise ValueError("Index Buffer should be divisible by 3! len=%s", len(indices))
-
         self.setZValue(z)
-
-        minimum = QPointF(math.inf, math.inf)
-        maximum = QPointF(-math.inf, -math.inf)
-        vbuf = []
-
         self.color = color if color else DEFAULT_COLOR
-
-        # convert all verts to QPointF, get the min/max for the bounding rect
-        for v in verts:
-            vbuf.append(vector2f(v))
-
-            if v[0] < minimum.x():
-                minimum.setX(v[0])
-            if v[0] > maximum.x():
-                maximum.setX(v[0])
-            if v[1] < minimum.y():
-                minimum.setY(v[1])
-            if v[1] > maximum.y():
-                maximum.setY(v[1])
-
-        # generate the polys from the index buffer
-        polys = []
-        for i in range(len(indices) // 3):
-            poly = QPolygonF()
-            poly.append(vbuf[indices[i * 3]])
-            poly.append(vbuf[indices[i * 3 + 1]])
-            poly.append(vbuf[indices[i * 3 + 2]])
-            polys.append(poly)
-
-        self.polybuf = polys
-        self.vertex_buffer = vbuf
-
-        minimum = minimum - QPointF(0.1, 0.1)
-        maximum = maximum + QPointF(0.1, 0.1)
-        self.rect = QRectF(minimum, maximum)
+        self.navmeshes = navmeshes
+        self.paths = []
+        self.triangles = []
+        self.rect = QRectF()
+        self.compile()
+
+    @traced("compile")
+    def compile(self):
+        """Builds the shapes to draw, merged or not according to mergeNavmeshOutlines."""
+        self.prepareGeometryChange()
+        self.paths = []
+        self.triangles = []
+        self.rect = QRectF()
+
+        for geo in self.navmeshes:
+            if not CurrentConfiguration["mergeNavmeshOutlines"]:
+                self.triangles.extend(_to_polygon(tri) for tri in mesh_triangles(geo.vertices, geo.indices))
+                continue
+
+            loops = mesh_outlines(geo.vertices, geo.indices)
+            if loops is None:
+                LOGGER.info("Navmesh outline is not closed, drawing its triangles instead")
+                self.triangles.extend(_to_polygon(tri) for tri in mesh_triangles(geo.vertices, geo.indices))
+                continue
+
+            # the loops are wound consistently, holes against their outer border, so the holes stay unfilled
+            path = QPainterPath()
+            path.setFillRule(Qt.FillRule.WindingFill)
+            for loop in loops:
+                path.addPolygon(_to_polygon(loop))
+                path.closeSubpath()
+
+            if not path.isEmpty():
+                self.paths.append(path)
+
+        for path in self.paths:
+            self.rect = self.rect.united(path.boundingRect())
+        for tri in self.triangles:
+            self.rect = self.rect.united(tri.boundingRect())
+
+        # include the 1 unit wide outline
+        self.rect = self.rect.adjusted(-1, -1, 1, 1)
 
     def paint(
         self, painter: QPainter | None, option: QStyleOptionGraphicsItem | None, widget: QWidget | None = ...
     ) -> None:
+        if not tile_cache_enabled():
+            self.paint_tile(painter, option)
+
+    @traced("paint")
+    def paint_tile(self, painter: QPainter, option: QStyleOptionGraphicsItem) -> None:
         if not CurrentConfiguration["paintGeometry"]:
             return
 
         painter.setPen(QPen(self.color))
         painter.setBrush(QBrush(self.color))
 
-        for poly in self.polybuf:
-            painter.drawPolygon(poly)
+        for path in self.paths:
+            painter.drawPath(path)
+        for tri in self.triangles:
+            painter.drawPolygon(tri)
 
     def boundingRect(self) -> QRectF:
         return self.rect
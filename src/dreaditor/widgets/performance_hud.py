@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+from PySide6.QtCore import QRect, QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QFont, QPainter
+from PySide6.QtWidgets import QWidget
+
+from dreaditor.asset_cache import SharedAssetCache, SharedScenarioAssets
+from dreaditor.memory import format_mib, process_memory
+from dreaditor.tracing import SharedTracer
+from dreaditor.widgets.scenario_actor_dot import ScenarioActorDot
+
+if TYPE_CHECKING:
+    from dreaditor.widgets.scenario_viewer import ScenarioViewer
+
+REFRESH_MS = 250
+# frames averaged for the frame time
+FRAMES_AVERAGED = 30
+# painters listed, slowest first
+PAINTERS_SHOWN = 8
+BACKGROUND_COLOR = QColor(0, 0, 0)
+TEXT_COLOR = QColor(220, 220, 220)
+FONT_SIZE = 9
+PADDING = 4
+MARGIN = 8
+
+
+class PerformanceHud(QWidget):
+    """
+    An overlay in the corner of the ScenarioViewer showing what the last frames cost: the frame time, the paint calls
+    of each kind of item with their time, how many actors are in view, and the memory used.
+
+    It counts the paint spans of dreaditor.tracing, so it only costs anything while shown. The text is refreshed on a
+    timer rather than every frame. It paints its own opaque background, since Qt treats a stylesheet background as
+    see-through, so refreshing it never repaints the scene below it.
+    """
+
+    viewer: ScenarioViewer
+    active: bool
+    frame_times: deque[float]
+    lines: list[str]
+    # painter -> (paint calls, total ns) in the last frame
+    painter_counts: dict[str, tuple[int, int]]
+    # the actors in view, and the view rect and counts it was taken with. Only taken again once one of them changes
+    _in_view: int
+    _in_view_key: tuple[QRectF, int, int]
+
+    def __init__(self, viewer: ScenarioViewer):
+        # a child of the view rather than its viewport, which is scrolled when panning
+        super().__init__(viewer)
+        self.viewer = viewer
+        self.active = False
+        self.frame_times = deque(maxlen=FRAMES_AVERAGED)
+        self.painter_counts = {}
+        self.lines = []
+        self._in_view = 0
+        self._in_view_key = (QRectF(), 0, 0)
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        font = QFont("Consolas", FONT_SIZE)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.setFont(font)
+        self.move(MARGIN, MARGIN)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_active(self, active: bool):
+        if active == self.active:
+            return
+
+        self.active = active
+        SharedTracer.set_counting(active)
+        self.frame_times.clear()
+        self.painter_counts = {}
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def begin_frame(self):
+        # drop whatever was painted outside of a frame, e.g. while rendering offscreen
+        SharedTracer.take_counts("paint")
+
+    def end_frame(self, seconds: float):
+        self.frame_times.append(seconds)
+        self.painter_counts = SharedTracer.take_counts("paint")
+
+    def refresh(self):
+        lines = []
+        if self.frame_times:
+            average = sum(self.frame_times) / len(self.frame_times)
+            lines.append(f"frame {self.frame_times[-1] * 1000:6.1f} ms   avg {average * 1000:6.1f} ms")
+        else:
+            lines.append("frame      - ms")
+
+        painters = sorted(self.painter_counts.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (calls, ns) in painters[:PAINTERS_SHOWN]:
+            lines.append(f"  {name:<24} {calls:>6} {ns / 1e6:8.2f} ms")
+        if len(painters) > PAINTERS_SHOWN:
+            lines.append(f"  {len(painters) - PAINTERS_SHOWN} more")
+
+        lines.append(self._actor_counts())
+        lines.append(self._memory())
+
+        if lines == self.lines:
+            return
+
+        self.lines = lines
+        metrics = self.fontMetrics()
+        width = max(metrics.horizontalAdvance(line) for line in lines)
+        self.resize(width + 2 * PADDING, metrics.lineSpacing() * len(lines) + 2 * PADDING)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND_COLOR)
+        painter.setPen(TEXT_COLOR)
+        metrics = self.fontMetrics()
+        for i, line in enumerate(self.lines):
+            rect = QRect(PADDING, PADDING + i * metrics.lineSpacing(), self.width() - PADDING, metrics.lineSpacing())
+            painter.drawText(rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, line)
+        painter.end()
+
+    def _actor_counts(self) -> str:
+        rom_manager = self.viewer.rom_manager
+        if rom_manager is None:
+            return "actors 0 in view, 0 shown, 0 total, 0 not built"
+
+        shown = rom_manager.shown_actor_count()
+        total = len(rom_manager.actors)
+        pending = len(self.viewer.pending_actors)
+
+        view_rect = self.viewer.mapToScene(self.viewer.viewport().rect()).boundingRect()
+        key = (view_rect, shown, len(self.viewer.spatial_index))
+        if key != self._in_view_key:
+            self._in_view_key = key
+            self._in_view = sum(
+                1
+                for item in self.viewer.spatial_index.query_rect(view_rect)
+                if isinstance(item, ScenarioActorDot) and item.actor.is_shown
+            )
+        return f"actors {self._in_view} in view, {shown} shown, {total} total, {pending} not built"
+
+    def _memory(self) -> str:
+        parts = [
+            f"tiles {format_mib(self.viewer.tile_cache.used)}",
+            f"assets ~{format_mib(SharedAssetCache.used)}",
+            f"retained ~{format_mib(SharedScenarioAssets.used)}",
+        ]
+        process = process_memory()
+        if process is not None:
+            parts.append(f"process {format_mib(process)}")
+        return "memory " + ", ".join(parts)
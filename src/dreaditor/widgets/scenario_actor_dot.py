@@ -1,17 +1,16 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from PySide6.QtCore import QRectF, Qt
 from PySide6.QtGui import QColor, QPainter, QPen
 from PySide6.QtWidgets import (
     QGraphicsEllipseItem,
     QGraphicsItem,
-    QGraphicsSceneHoverEvent,
-    QGraphicsSceneMouseEvent,
     QStyleOptionGraphicsItem,
     QWidget,
 )
 
-from dreaditor.actor import Actor, ActorSelectionState
 from dreaditor.painters.collision import (
     BasePainterWidget,
     BmsadCollisionWidget,
@@ -24,6 +23,12 @@ from dreaditor.painters.logicpath import LogicPathWidget
 from dreaditor.painters.logicshape import LogicShapeWidget
 from dreaditor.painters.positionalsound import PositionalSoundWidget
 from dreaditor.painters.worldgraph import WorldGraphWidget
+from dreaditor.tracing import traced
+
+if TYPE_CHECKING:
+    from PySide6.QtCore import QPointF
+
+    from dreaditor.actor import Actor
 
 COLOR_ENTITY = QColor(0, 255, 0, 128)
 COLOR_SOUND = QColor(0, 255, 255, 128)
@@ -34,6 +39,7 @@ OUTLINE_SELECTED = QColor(255, 0, 0, 255)
 OUTLINE_HOVERED = QColor(255, 255, 255, 255)
 OUTLINE_UNSELECTED = QColor(0, 0, 0, 0)
 OUTLINE_WIDTH = 10
+DOT_Z = 100
 
 
 class ScenarioActorDot(QGraphicsEllipseItem):
@@ -44,7 +50,7 @@ class ScenarioActorDot(QGraphicsEllipseItem):
 
     def __init__(self, actor: Actor, parent: QGraphicsItem | None = ...) -> None:
         super().__init__(parent)
-        self.setZValue(100)
+        self.setZValue(DOT_Z)
         self.painter_widgets = []
 
         pen = QPen(OUTLINE_UNSELECTED)
@@ -64,7 +70,12 @@ class ScenarioActorDot(QGraphicsEllipseItem):
         self.setRect(actor.actor_rect)
         self.bounding_rect = actor.actor_rect
         self.actor = actor
-        self.setAcceptHoverEvents(True)
+        self.clustered = False
+        self.setToolTip(f"{actor.ref.layer}/{actor.ref.sublayer}/{actor.ref.name}")
+
+        # hover and clicks are hit-tested by the ScenarioViewer's spatial index, see ScenarioViewer.items_at
+        self.setAcceptHoverEvents(False)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
 
     def assign_painter_widgets(self):
         for pw in self.painter_widgets:
@@ -73,71 +84,44 @@ class ScenarioActorDot(QGraphicsEllipseItem):
         self.painter_widgets = []
 
         if (
-            self.actor.getComponent("CDoorLifeComponent")
-            or self.actor.getComponent("CDoorEmmyFXComponent")
-            or self.actor.getComponent("CDoorCentralUnitLifeComponent")
+            self.actor.has_component("CDoorLifeComponent")
+            or self.actor.has_component("CDoorEmmyFXComponent")
+            or self.actor.has_component("CDoorCentralUnitLifeComponent")
         ):
             self.painter_widgets.append(DoorPainterWidget(self.actor, self))
 
-        elif self.actor.getComponent("CDoorShieldLifeComponent") or self.actor.getComponent("CBeamDoorLifeComponent"):
+        elif self.actor.has_component("CDoorShieldLifeComponent") or self.actor.has_component("CBeamDoorLifeComponent"):
             self.painter_widgets.append(ShieldPainterWidget(self.actor, self))
         else:
-            if self.actor.bmscc:
+            if self.actor.actordef.collision:
                 self.painter_widgets.append(CollisionDataFileWidget(self.actor, self))
 
-            if (
-                self.actor.bmsad
-                and self.actor.bmsad.components.get("COLLISION")
-                and self.actor.bmsad.components.get("COLLISION").functions
-            ):
+            if self.actor.actordef.colliders:
                 self.painter_widgets.append(BmsadCollisionWidget(self.actor, self))
 
-        if self.actor.getComponent("CBreakableTileGroupComponent"):
+        if self.actor.has_component("CBreakableTileGroupComponent"):
             self.painter_widgets.append(TilegroupPainterWidget(self.actor, self))
 
-        if self.actor.getComponent("CLogicShapeComponent"):
+        if self.actor.has_component("CLogicShapeComponent"):
             self.painter_widgets.append(LogicShapeWidget(self.actor, self))
 
-        if self.actor.getComponent("CLogicPathComponent"):
+        if self.actor.has_component("CLogicPathComponent"):
             self.painter_widgets.append(LogicPathWidget(self.actor, self))
 
-        if self.actor.getComponent("CWorldGraph"):
+        if self.actor.has_component("CWorldGraph"):
             self.painter_widgets.append(WorldGraphWidget(self.actor, self))
 
-        if self.actor.ref.layer == "rSoundsLayer" and self.actor.getComponent("CPositionalSoundComponent"):
+        if self.actor.ref.layer == "rSoundsLayer" and self.actor.has_component("CPositionalSoundComponent"):
             self.painter_widgets.append(PositionalSoundWidget(self.actor, self))
 
-    def hoverEnterEvent(self, event: QGraphicsSceneHoverEvent | None) -> None:
-        self.actor.OnHovered(True)
-        self.setToolTip(f"{self.actor.ref.layer}/{self.actor.ref.sublayer}/{self.actor.ref.name}")
-        self.update()
-
-    def hoverLeaveEvent(self, event: QGraphicsSceneHoverEvent) -> None:
-        self.actor.OnHovered(False)
-        self.update()
-
-    def mousePressEvent(self, event: QGraphicsSceneMouseEvent | None) -> None:
-        if not self.actor.is_checked:
-            event.ignore()
-            return
-
-        if event.button() == Qt.MouseButton.RightButton:
-            # clear selection on all items below cursor if right clicked
-            self.actor.OnSelected(ActorSelectionState.Unselected)
-            event.ignore()
-        else:
-            return super().mousePressEvent(event)
-
-    def mouseDoubleClickEvent(self, event: QGraphicsSceneMouseEvent | None) -> None:
-        if event.button() == Qt.MouseButton.LeftButton and self.actor.is_checked:
-            self.actor.OnSelected()
-
-        event.ignore()
+    def hit_test(self, point: QPointF) -> bool:
+        return self.actor.is_shown and self.shape().contains(point)
 
+    @traced("paint")
     def paint(
         self, painter: QPainter | None, option: QStyleOptionGraphicsItem | None, widget: QWidget | None = ...
     ) -> None:
-        if not self.actor.is_checked:
+        if not self.actor.is_shown:
             return
 
         painter.setBrush(self.base_color)
@@ -153,10 +137,24 @@ class ScenarioActorDot(QGraphicsEllipseItem):
 
         painter.drawEllipse(self.actor.actor_rect)
 
+    def set_clustered(self, clustered: bool):
+        self.clustered = clustered
+        self._update_visibility()
+
+    def _update_visibility(self):
+        # zoomed out, the ActorClusterItem draws this actor unless it needs to stand out. hiding the dot (and its
+        # painters with it) keeps Qt from calling into paint at all
+        self.setVisible(not self.clustered or self.actor.is_selected or self.actor.is_hovered)
+
     def update(self):
+        self._update_visibility()
         super().update()
         for pw in self.painter_widgets:
-            pw.update()
+            pw.request_update()
+
+        self.scene().views()[0].cluster_item.invalidate_actor(self.actor)
 
     def boundingRect(self) -> QRectF:
-        return self.actor.actor_rect
+        # include the outline, which is centered on the edge of the dot
+        margin = OUTLINE_WIDTH / 2
+        return self.actor.actor_rect.adjusted(-margin, -margin, margin, margin)
@@ -1,20 +1,31 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import TYPE_CHECKING
 
-from PySide6.QtCore import QPointF, QRectF, Qt
-from PySide6.QtGui import QBrush, QColor, QPen, QWheelEvent
+from PySide6.QtCore import QEvent, QPointF, QRectF, Qt, QTimer
+from PySide6.QtGui import QBrush, QColor, QMouseEvent, QPainter, QPaintEvent, QPen, QResizeEvent, QWheelEvent
 from PySide6.QtWidgets import QGraphicsPixmapItem, QGraphicsView
 
+from dreaditor.actor import ActorSelectionState
+from dreaditor.config import CurrentConfiguration
+from dreaditor.level_of_detail import is_clustered
+from dreaditor.painters.base_painter import BasePainterWidget
+from dreaditor.spatial_index import SpatialIndex
+from dreaditor.tile_cache import TileCache, tile_cache_enabled
+from dreaditor.tracing import SharedTracer, traced
+from dreaditor.widgets.actor_cluster_item import ActorClusterItem
 from dreaditor.widgets.collision_camera_item import CollisionCameraItem
 from dreaditor.widgets.map_geometry import MapGeometry
+from dreaditor.widgets.performance_hud import PerformanceHud
 from dreaditor.widgets.scenario_actor_dot import ScenarioActorDot
 
 if TYPE_CHECKING:
     from dreaditor.actor import Actor
     from dreaditor.constants import Scenario
     from dreaditor.rom_manager import RomManager
+    from dreaditor.scenario_data import CollisionCameraData, NavmeshData
     from dreaditor.widgets.scenario_scene import ScenarioScene
 
 DOT_RADIUS = 100
@@ -24,13 +35,47 @@ BACKGROUND = QColor(16, 31, 54, 255)
 PEN = QPen(QColor(255, 255, 255, 255))
 BRUSH = QBrush(QColor(0, 0, 0, 0))
 COLLISION_CAM_COLOR = QColor(255, 200, 255, 255)
+# with lazyActors, actors are built once their dot is within this much of the view, in scene units, so the painters
+# reaching past their dot (logic shapes, positional sounds, ...) are there before the dot scrolls into view
+LAZY_MARGIN = 3000.0
+# painting options that only change the painters of actors with these components, see on_paint_options_changed
+PAINT_OPTION_COMPONENTS = {
+    "paintDoors": [
+        "CDoorLifeComponent",
+        "CDoorEmmyFXComponent",
+        "CDoorCentralUnitLifeComponent",
+        "CDoorShieldLifeComponent",
+        "CBeamDoorLifeComponent",
+    ],
+    "paintBreakables": ["CBreakableTileGroupComponent"],
+    "paintLogicShapes": ["CLogicShapeComponent"],
+    "paintLogicPaths": ["CLogicPathComponent"],
+    "paintWorldGraph": ["CWorldGraph"],
+    "paintPositionalSound": ["CPositionalSoundComponent"],
+}
+# actors built per pass of the event loop, so zooming out over a large scenario builds them over a few passes rather
+# than one long one
+LAZY_BATCH_SIZE = 500
 
 
 class ScenarioViewer(QGraphicsView):
-    rom_manager: RomManager
+    # None when rendering without a window, see dreaditor.render
+    rom_manager: RomManager | None
     mapitem: QGraphicsPixmapItem
+    # actor dots and painter widgets, by their scene bounds
+    spatial_index: SpatialIndex[ScenarioActorDot | BasePainterWidget]
+    # with lazyActors, the actors whose dot and painters aren't built yet, by the bounds of their dot
+    pending_actors: SpatialIndex[Actor]
+    # the area of the scene the pending actors were last built for
+    _built_rect: QRectF
+    hovered_dot: ScenarioActorDot | None
+    map_geometry: MapGeometry | None
+    cluster_item: ActorClusterItem
+    # the navmesh, collision cameras and actor collision, drawn as the background of the scene
+    tile_cache: TileCache
+    hud: PerformanceHud
 
-    def __init__(self, scene: ScenarioScene, rom_manager: RomManager):
+    def __init__(self, scene: ScenarioScene, rom_manager: RomManager | None):
         super().__init__(scene)
         self.logger = logging.getLogger(type(self).__name__)
         self.logger.info("Initialized ScenarioViewer!")
@@ -40,26 +85,147 @@ class ScenarioViewer(QGraphicsView):
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setBackgroundBrush(BACKGROUND)
-        self.setViewportUpdateMode(self.ViewportUpdateMode.FullViewportUpdate)
+        # only repaint the regions of items that changed, and scroll the already rendered pixels when panning
+        self.setViewportUpdateMode(self.ViewportUpdateMode.SmartViewportUpdate)
         self.setTransformationAnchor(self.ViewportAnchor.AnchorUnderMouse)
+        self.spatial_index = SpatialIndex()
+        self.pending_actors = SpatialIndex()
+        self._built_rect = QRectF()
+        self._build_scheduled = False
+        # the view moves with its scroll bars, even hidden; zooming and resizing are caught in their events
+        self.horizontalScrollBar().valueChanged.connect(self.schedule_build_pending_actors)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_build_pending_actors)
+        self.hovered_dot = None
+        self.map_geometry = None
+        self.cluster_item = ActorClusterItem(None)
+        self.scene().addItem(self.cluster_item)
+        self.clustered = False
+        self.tile_cache = TileCache(CurrentConfiguration["tileCacheBudgetMB"] * 1024 * 1024)
+        self.hud = PerformanceHud(self)
+        self.update_hud()
 
     def on_new_scenario_selected(self, scenario: Scenario):
+        self.hovered_dot = None
+        self.spatial_index.clear()
+        self.pending_actors.clear()
+        self._built_rect = QRectF()
+        self.map_geometry = None
+        self.tile_cache.clear()
         self.scene().clear()
+        self.cluster_item = ActorClusterItem(None)
+        self.scene().addItem(self.cluster_item)
+        self.update_level_of_detail()
 
     def add_actor(self, actor: Actor):
+        """
+        Adds the actor to the scene. With lazyActors, its dot and painters are only built once it comes near the view or
+        is selected, see build_pending_actors and Actor.build.
+        """
+        self.cluster_item.add_actors([actor])
+        if not CurrentConfiguration["lazyActors"]:
+            self.build_actor(actor)
+            return
+
+        self.pending_actors.insert(actor, actor.actor_rect)
+        if self._built_rect.isEmpty() or self._built_rect.intersects(actor.actor_rect):
+            # build it once control returns to the event loop if it's near the view
+            self._built_rect = QRectF()
+            self.schedule_build_pending_actors()
+
+    def build_actor(self, actor: Actor):
+        """Creates the dot and painters of actor, if they don't exist yet."""
+        if actor.actor_dot is not None:
+            return
+
+        self.pending_actors.remove(actor)
         actor.actor_dot = ScenarioActorDot(actor, None)
         self.scene().addItem(actor.actor_dot)
         actor.actor_dot.assign_painter_widgets()
+        actor.actor_dot.set_clustered(self.clustered)
 
-    def add_map_geo(self, verts: list[list[float]], indices: list[int], color: QColor | None, z: float):
-        geo = MapGeometry(verts, indices, color, z, None)
-        self.scene().addItem(geo)
+        self.spatial_index.insert(actor.actor_dot, actor.actor_dot.sceneBoundingRect())
+        for pw in actor.actor_dot.painter_widgets:
+            self.spatial_index.insert(pw, pw.sceneBoundingRect())
+            if pw.tile_cached:
+                self.tile_cache.add_item(pw)
 
-    def add_collision_camera(self, cc: dict) -> CollisionCameraItem:
+    def add_map_geo(self, navmeshes: list[NavmeshData], color: QColor | None, z: float):
+        self.map_geometry = MapGeometry(navmeshes, color, z, None)
+        self.scene().addItem(self.map_geometry)
+        self.tile_cache.add_item(self.map_geometry)
+
+    def add_collision_camera(self, cc: CollisionCameraData) -> CollisionCameraItem:
         res = CollisionCameraItem(cc)
         self.scene().addItem(res)
+        self.tile_cache.add_item(res)
         return res
 
+    def update_item_bounds(self, item: ScenarioActorDot | BasePainterWidget):
+        if item in self.spatial_index:
+            self.spatial_index.insert(item, item.sceneBoundingRect())
+        self.tile_cache.update_item_bounds(item)
+
+    def schedule_build_pending_actors(self):
+        """Calls build_pending_actors once control returns to the event loop, after the view moved or zoomed."""
+        if len(self.pending_actors) and not self._build_scheduled:
+            self._build_scheduled = True
+            QTimer.singleShot(0, self.build_pending_actors)
+
+    def build_pending_actors(self):
+        """Builds the pending actors near the view, at most LAZY_BATCH_SIZE at a time."""
+        self._build_scheduled = False
+        if not len(self.pending_actors):
+            return
+
+        view_rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        if self._built_rect.contains(view_rect):
+            return
+
+        rect = view_rect.adjusted(-LAZY_MARGIN, -LAZY_MARGIN, LAZY_MARGIN, LAZY_MARGIN)
+        actors = self.pending_actors.query_rect(rect)
+        with SharedTracer.span("build actors", "load", {"count": min(len(actors), LAZY_BATCH_SIZE)}):
+            for actor in actors[:LAZY_BATCH_SIZE]:
+                self.build_actor(actor)
+
+        if len(actors) > LAZY_BATCH_SIZE:
+            self.schedule_build_pending_actors()
+        else:
+            self._built_rect = rect
+
+    def on_paint_options_changed(self, option: str | None = None):
+        self.update_level_of_detail()
+        if not CurrentConfiguration["lazyActors"]:
+            for actor in list(self.pending_actors):
+                self.build_actor(actor)
+        self.update_hud()
+        if option == "mergeNavmeshOutlines" and self.map_geometry is not None:
+            self.map_geometry.compile()
+            self.tile_cache.update_item_bounds(self.map_geometry)
+
+        components = PAINT_OPTION_COMPONENTS.get(option)
+        if components is None or self.rom_manager is None:
+            self.tile_cache.invalidate()
+            # every tile is drawn again, so the painters' record of being in them has to be too
+            for item in self.spatial_index:
+                if isinstance(item, BasePainterWidget):
+                    item.in_tiles = item.is_in_tiles()
+            self.viewport().update()
+            return
+
+        # only repaint the painters the option applies to, and the tiles they are in, rather than the whole scene
+        index = self.rom_manager.actor_index
+        actors = dict.fromkeys(actor for component in components for actor in index.with_component(component))
+        for actor in actors:
+            if actor.actor_dot is None:
+                continue
+            for pw in actor.actor_dot.painter_widgets:
+                if pw.config_val == option:
+                    pw.request_update()
+
+    def update_hud(self):
+        # only in the editor, renders don't show widgets
+        self.hud.set_active(self.rom_manager is not None and CurrentConfiguration["performanceHud"])
+
     def set_bounds(self, min: list[float], max: list[float]):
         self.scene().addRect(
             QRectF(
@@ -70,6 +236,112 @@ class ScenarioViewer(QGraphicsView):
             BRUSH,
         )
 
+    def items_at(self, scene_pos: QPointF) -> list[ScenarioActorDot | BasePainterWidget]:
+        """Visible actor dots and painter widgets under scene_pos."""
+        return [item for item in self.spatial_index.query_point(scene_pos) if item.hit_test(scene_pos)]
+
+    def dot_at(self, scene_pos: QPointF) -> ScenarioActorDot | None:
+        """The actor dot under scene_pos. If dots overlap, the one closest to scene_pos."""
+        dots = [item for item in self.items_at(scene_pos) if isinstance(item, ScenarioActorDot)]
+        if not dots:
+            return None
+
+        def _distance(dot: ScenarioActorDot) -> float:
+            delta = dot.actor.position - scene_pos
+            return QPointF.dotProduct(delta, delta)
+
+        return min(dots, key=_distance)
+
+    def set_hovered_dot(self, dot: ScenarioActorDot | None):
+        if dot is self.hovered_dot:
+            return
+
+        if self.hovered_dot is not None:
+            self.hovered_dot.actor.OnHovered(False)
+            self.hovered_dot.update()
+
+        self.hovered_dot = dot
+        if dot is not None:
+            dot.actor.OnHovered(True)
+            dot.update()
+
+    def _actors_at(self, scene_pos: QPointF, skip_painters_on_dot: bool = False) -> list[Actor]:
+        actors = []
+        for item in self.items_at(scene_pos):
+            if (
+                skip_painters_on_dot
+                and not isinstance(item, ScenarioActorDot)
+                and item.actor.actor_rect.contains(scene_pos)
+            ):
+                continue
+
+            if item.actor not in actors:
+                actors.append(item.actor)
+        return actors
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        super().mouseMoveEvent(event)
+        self.set_hovered_dot(self.dot_at(self.mapToScene(event.position().toPoint())))
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.MouseButton.RightButton:
+            # clear selection on all items below cursor if right clicked
+            for actor in self._actors_at(self.mapToScene(event.position().toPoint())):
+                actor.OnSelected(ActorSelectionState.Unselected)
+
+        super().mousePressEvent(event)
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.MouseButton.LeftButton:
+            for actor in self._actors_at(self.mapToScene(event.position().toPoint()), skip_painters_on_dot=True):
+                actor.OnSelected()
+
+        super().mouseDoubleClickEvent(event)
+
+    def leaveEvent(self, event: QEvent) -> None:
+        self.set_hovered_dot(None)
+        super().leaveEvent(event)
+
+    def update_level_of_detail(self):
+        """
+        Switches the actor dots to the ActorClusterItem and back, once the zoom or the levelOfDetail option crosses the
+        clustering threshold. Not called while painting, as it shows and hides items.
+        """
+        clustered = CurrentConfiguration["levelOfDetail"] and is_clustered(self.transform().m11())
+        if clustered == self.clustered:
+            return
+
+        self.clustered = clustered
+        for item in self.spatial_index:
+            if isinstance(item, ScenarioActorDot):
+                item.set_clustered(clustered)
+
+    def drawBackground(self, painter: QPainter, rect: QRectF) -> None:
+        super().drawBackground(painter, rect)
+        if tile_cache_enabled():
+            self.tile_cache.draw(painter, rect, BACKGROUND)
+
+    @traced("frame", "paint viewport")
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if not self.hud.active:
+            super().paintEvent(event)
+            return
+
+        self.hud.begin_frame()
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.hud.end_frame(time.perf_counter() - start)
+
     def wheelEvent(self, event: QWheelEvent | None) -> None:
         zoomFactor = ZOOM_FACTOR if event.angleDelta().y() > 0 else 1 / ZOOM_FACTOR
         self.scale(zoomFactor, zoomFactor)
+        self.on_view_transformed()
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self.schedule_build_pending_actors()
+
+    def on_view_transformed(self):
+        """Called after the view is zoomed, by scale or fitInView, which Qt doesn't signal."""
+        self.update_level_of_detail()
+        self.schedule_build_pending_actors()
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+import pytest
+
+# dreaditor reads its config from APPDATA on import; keep the tests away from the real one
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="dreaditor-tests-")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from construct import Container
+
+from dreaditor.widgets.actor_data_tree import PAGE_SIZE, ActorDataTreeWidget
+
+
+def test_paged_container_keeps_every_entry(qapp):
+    tree = ActorDataTreeWidget(None, None)
+    # construct puts _io ahead of the parsed fields
+    container = Container(_io=None)
+    for i in range(2 * PAGE_SIZE + 5):
+        container[f"key{i}"] = i
+
+    pages = tree.CreateChildItems(container)
+    assert len(pages) == 3
+
+    names = []
+    for page in pages:
+        page.populate()
+        names.extend(page.child(i).text(0) for i in range(page.childCount()))
+
+    assert names == [f"key{i}" for i in range(2 * PAGE_SIZE + 5)]
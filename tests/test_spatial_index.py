@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import random
+
+from PySide6.QtCore import QRectF
+
+from dreaditor.spatial_index import SpatialIndex
+
+
+def _brute_force(items: dict[int, QRectF], rect: QRectF) -> set[int]:
+    return {item for item, bounds in items.items() if bounds.intersects(rect)}
+
+
+def test_query_rect_matches_a_scan():
+    rng = random.Random(0)
+    index = SpatialIndex()
+    items = {}
+    for i in range(500):
+        items[i] = QRectF(rng.uniform(-20000, 20000), rng.uniform(-20000, 20000), 50, 50)
+        index.insert(i, items[i])
+    for i in range(0, 500, 3):
+        index.remove(i)
+        del items[i]
+
+    for _ in range(200):
+        size = rng.choice([100, 5000, 1e7])
+        rect = QRectF(rng.uniform(-30000, 30000), rng.uniform(-30000, 30000), size, size)
+        found = index.query_rect(rect)
+        assert len(found) == len(set(found))
+        assert set(found) == _brute_force(items, rect)
+
+    assert set(index.query_rect(QRectF(-1e9, -1e9, 2e9, 2e9))) == set(items)
+
+
+def test_query_rect_when_empty():
+    index = SpatialIndex()
+    index.insert("a", QRectF(0, 0, 10, 10))
+    index.remove("a")
+    assert index.query_rect(QRectF(-1e9, -1e9, 2e9, 2e9)) == []
@@ -0,0 +1,395 @@
+"""
+Scenario assets for tools/benchmark_scenario_load.py, without a RomFS.
+
+Assets are stored as loose files in a folder, with a manifest.json naming the game version and scenario they belong to,
+and read through LooseAssetEditor, a stand-in for FileTreeEditor. The assets are either generated (synthetic) or copied
+from an extracted RomFS (recorded).
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from typing import TYPE_CHECKING
+
+from construct import Container, ListContainer
+from mercury_engine_data_structures.common_types import Vec2, Vec3
+from mercury_engine_data_structures.formats.bmmap import Bmmap
+from mercury_engine_data_structures.formats.bmsad import Bmsad
+from mercury_engine_data_structures.formats.bmscc import Bmscc
+from mercury_engine_data_structures.formats.brfld import Brfld
+from mercury_engine_data_structures.formats.brsa import Brsa
+from mercury_engine_data_structures.game_check import Game, GameVersion
+
+from dreaditor.constants import Scenario
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from mercury_engine_data_structures.base_resource import BaseResource
+
+MANIFEST_NAME = "manifest.json"
+LAYERS = ["rEntitiesLayer", "rSoundsLayer", "rLightsLayer"]
+# share of the actors in each layer
+LAYER_SHARES = [0.6, 0.25, 0.15]
+SUBLAYERS_PER_LAYER = 8
+ACTORS_PER_COLLISION_CAMERA = 60
+# distinct actordefs of props without anything to paint, each one is parsed once per scenario
+PROP_ACTORDEFS = 60
+# area of the scenario covered per actor, in game units
+AREA_PER_ACTOR = 1500.0**2
+NAVMESH_TRIANGLES_PER_ACTOR = 4
+NAVMESH_TRIANGLES_PER_GEO = 10000
+
+
+class LooseAssetEditor:
+    """
+    The part of FileTreeEditor the editor uses, reading loose assets from a folder.
+
+    Assets are parsed with the real formats, so parsing costs the same as with a RomFS. Every asset is its own file, so
+    the scenario cache fingerprints them instead of the pkgs they would be in.
+    """
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        manifest = json.loads(folder.joinpath(MANIFEST_NAME).read_text())
+        self.version = GameVersion[manifest["version"]]
+        self.scenario = Scenario(manifest["scenario"])
+        self.target_game = Game.DREAD
+
+    def get_raw_asset(self, name: str, *, in_pkg: str | None = None) -> bytes:
+        path = self.folder.joinpath(name)
+        if not path.is_file():
+            raise ValueError(f"Unknown asset: {name}")
+        return path.read_bytes()
+
+    def get_parsed_asset(self, name: str, *, in_pkg: str | None = None, type_hint: type[BaseResource]) -> BaseResource:
+        return type_hint.parse(self.get_raw_asset(name), target_game=self.target_game, editor=self)
+
+    def find_pkgs(self, name: str) -> Iterator[str]:
+        yield from ()
+
+    def does_asset_exists(self, name: str) -> bool:
+        return self.folder.joinpath(name).is_file()
+
+
+def _write_manifest(folder: Path, version: GameVersion, scenario: Scenario, description: str):
+    manifest = {"version": version.name, "scenario": scenario.value, "description": description}
+    folder.joinpath(MANIFEST_NAME).write_text(json.dumps(manifest, indent=4))
+
+
+def _write_asset(folder: Path, name: str, data: bytes):
+    path = folder.joinpath(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def record_scenario(editor, scenario: Scenario, folder: Path):
+    """Copies every asset the editor reads to load scenario from a RomFS's editor into folder."""
+    # imported here, so generating synthetic scenarios doesn't need a QApplication
+    from dreaditor.scenario_loader import ScenarioLoader
+
+    data = ScenarioLoader(scenario, editor, folder, None, None)._parse_scenario()
+    for name in data.source_assets():
+        _write_asset(folder, name, editor.get_raw_asset(name))
+    _write_manifest(folder, editor.version, scenario, f"{scenario.value} recorded from {editor.version.name}")
+
+
+# synthetic scenarios
+def _box_collision(name: str, layer: str, entries: list[tuple[str, float, float]]) -> bytes:
+    raw = Container(
+        _version="1.16.0",
+        layers=ListContainer(
+            [
+                Container(
+                    name=layer,
+                    entries=ListContainer(
+                        [
+                            Container(
+                                name=entry_name,
+                                prop1="",
+                                prop2="",
+                                prop3="",
+                                flag=0,
+                                type="AABOX2D",
+                                data=Container(position=Vec3(0.0, height / 2, 0.0), size=Vec2(width, height)),
+                            )
+                            for entry_name, width, height in entries
+                        ]
+                    ),
+                )
+            ]
+        ),
+        parts=None,
+    )
+    return Bmscc(raw, Game.DREAD).build()
+
+
+def _poly(points: list[tuple[float, float]]) -> Container:
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return Container(
+        num_points=len(points),
+        unk=0,
+        points=ListContainer([Container(x=x, y=y, material_attribute=0) for x, y in points]),
+        loop=True,
+        boundings=ListContainer([min(xs), min(ys), max(xs), max(ys)]),
+    )
+
+
+def _poly_collision(layer: str, entries: list[tuple[str, float, float, list[list[tuple[float, float]]]]]) -> bytes:
+    raw = Container(
+        _version="1.16.0",
+        layers=ListContainer(
+            [
+                Container(
+                    name=layer,
+                    entries=ListContainer(
+                        [
+                            Container(
+                                name=name,
+                                prop1="",
+                                prop2="",
+                                prop3="",
+                                flag=0,
+                                type="POLYCOLLECTION2D",
+                                data=Container(
+                                    position=Vec3(x, y, 0.0),
+                                    polys=ListContainer([_poly(points) for points in polys]),
+                                    total_boundings=ListContainer(
+                                        [
+                                            min(px for points in polys for px, _ in points),
+                                            min(py for points in polys for _, py in points),
+                                            max(px for points in polys for px, _ in points),
+                                            max(py for points in polys for _, py in points),
+                                        ]
+                                    ),
+                                    binary_search_trees=None,
+                                ),
+                            )
+                            for name, x, y, polys in entries
+                        ]
+                    ),
+                )
+            ]
+        ),
+        parts=None,
+    )
+    return Bmscc(raw, Game.DREAD).build()
+
+
+def _component(type_: str, collision_file: str | None = None, functions: list[Container] = ()) -> Container:
+    return Container(
+        type=type_,
+        unk_1=-1,
+        unk_2=-1,
+        fields=None,
+        extra_fields=Container(),
+        functions=ListContainer(functions),
+        dependencies=None if collision_file is None else Container(file=collision_file, unk=1),
+    )
+
+
+def _collider(width: float, height: float) -> Container:
+    params = ["AABOX2D", 0.0, height / 2, 0.0, width, height]
+    types = {str: "s", float: "f"}
+    return Container(
+        name="CreateCollider",
+        unk1=True,
+        unk2=False,
+        params=Container(
+            {f"Param{i}": Container(type=types[type(value)], value=value) for i, value in enumerate(params, 5)}
+        ),
+    )
+
+
+def _actordef(name: str, components: dict[str, Container]) -> bytes:
+    raw = Container(
+        version="15.0.2",
+        name=name,
+        type="CActorDef",
+        header=Container(unk_1=True, unk_2=False, unk_3=0, unk_4=False, unk_5=False, sub_actors=ListContainer()),
+        unk=False,
+        components=Container(components),
+        action_sets=ListContainer(),
+        sound_fx=ListContainer(),
+    )
+    return Bmsad(raw, Game.DREAD).build()
+
+
+def _synthetic_actordefs(folder: Path) -> dict[str, list[str]]:
+    """Writes the actordefs and their collision files, and returns the actordef links by layer."""
+    door = "actors/props/doorpowerpower/charclasses/doorpowerpower.bmsad"
+    door_collision = "actors/props/doorpowerpower/collisions/doorpowerpower.bmscc"
+    _write_asset(folder, door_collision, _box_collision("door", "collision_layer", [("door", 50.0, 300.0)]))
+    _write_asset(
+        folder,
+        door,
+        _actordef(
+            "doorpowerpower",
+            {"COLLISION": _component("CCollisionComponent", door_collision), "LIFE": _component("CDoorLifeComponent")},
+        ),
+    )
+
+    breakable = "actors/props/breakabletilegroup/charclasses/breakabletilegroup.bmsad"
+    tiles = _component("CBreakableTileGroupComponent")
+    _write_asset(folder, breakable, _actordef("breakabletilegroup", {"TILES": tiles}))
+
+    trigger = "actors/logic/trigger/charclasses/trigger.bmsad"
+    _write_asset(
+        folder,
+        trigger,
+        _actordef(
+            "trigger",
+            {
+                "LOGICSHAPE": _component("CLogicShapeComponent"),
+                "COLLISION": _component("CCollisionComponent", "Unassigned", [_collider(100.0, 100.0)]),
+            },
+        ),
+    )
+
+    entities = [door, breakable, trigger]
+    for i in range(PROP_ACTORDEFS):
+        name = f"prop_{i:03}"
+        link = f"actors/props/{name}/charclasses/{name}.bmsad"
+        components = {"MODELUPDATER": _component("CModelUpdaterComponent")}
+        if i % 3 == 0:
+            collision = f"actors/props/{name}/collisions/{name}.bmscc"
+            square = [(0.0, 0.0), (200.0, 0.0), (200.0, 200.0), (0.0, 200.0)]
+            _write_asset(folder, collision, _poly_collision("default", [("poly", 0.0, 0.0, [square])]))
+            components["COLLISION"] = _component("CCollisionComponent", collision)
+        _write_asset(folder, link, _actordef(name, components))
+        entities.append(link)
+
+    sound = "actors/sounds/positionalsound/charclasses/positionalsound.bmsad"
+    _write_asset(folder, sound, _actordef("positionalsound", {"SOUND": _component("CPositionalSoundComponent")}))
+    light = "actors/lights/omnilight/charclasses/omnilight.bmsad"
+    _write_asset(folder, light, _actordef("omnilight", {"LIGHT": _component("COmniLightComponent")}))
+
+    return {"rEntitiesLayer": entities, "rSoundsLayer": [sound], "rLightsLayer": [light]}
+
+
+def _entity_components(actordef: str, rnd: random.Random) -> Container:
+    if "doorpowerpower" in actordef:
+        return Container(LIFE=Container({"@type": "CDoorLifeComponent"}))
+    if "breakabletilegroup" in actordef:
+        tiles = [
+            Container(vGridCoords=Vec2(float(x), 0.0), eTileType=rnd.randint(1, 9)) for x in range(rnd.randint(1, 6))
+        ]
+        return Container(TILES=Container({"@type": "CBreakableTileGroupComponent", "aGridTiles": ListContainer(tiles)}))
+    if "trigger" in actordef:
+        size = rnd.uniform(100.0, 800.0)
+        shape = Container(
+            {
+                "@type": "game::logic::collision::CAABoxShape2D",
+                "vPos": Vec3(0.0, 0.0, 0.0),
+                "v2Min": Vec2(-size, -size),
+                "v2Max": Vec2(size, size),
+            }
+        )
+        return Container(LOGICSHAPE=Container({"@type": "CLogicShapeComponent", "pLogicShape": shape}))
+    return Container(MODELUPDATER=Container({"@type": "CModelUpdaterComponent"}))
+
+
+def _layer_components(layer: str, actordef: str, rnd: random.Random) -> Container:
+    if layer == "rSoundsLayer":
+        min_att = rnd.uniform(100.0, 500.0)
+        return Container(
+            SOUND=Container({"@type": "CPositionalSoundComponent", "fMinAtt": min_att, "fMaxAtt": min_att * 3})
+        )
+    if layer == "rLightsLayer":
+        return Container(LIGHT=Container({"@type": "COmniLightComponent", "fAttMin": 100.0, "fAttMax": 400.0}))
+    return _entity_components(actordef, rnd)
+
+
+def generate_scenario(folder: Path, scenario: Scenario, actor_count: int, seed: int = 0):
+    """
+    Writes a synthetic scenario of about actor_count actors, with the same mix of painted actors, actordefs, collision
+    cameras and subareas as a real one, to folder.
+    """
+    rnd = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+    actordefs = _synthetic_actordefs(folder)
+    half_size = (actor_count * AREA_PER_ACTOR) ** 0.5 / 2
+
+    # actors, grouped in one actor group per collision camera and layer
+    cameras_per_row = max(1, round((actor_count / ACTORS_PER_COLLISION_CAMERA) ** 0.5))
+    camera_count = cameras_per_row**2
+    camera_size = 2 * half_size / cameras_per_row
+    layers = {}
+    for layer, share in zip(LAYERS, LAYER_SHARES):
+        sublayers = Container()
+        groups: dict[str, list[str]] = {}
+        count = round(actor_count * share)
+        for i in range(count):
+            sublayer = f"sublayer_{i % SUBLAYERS_PER_LAYER:02}"
+            name = f"{layer[1:-5].lower()}_{i:05}"
+            actordef = rnd.choice(actordefs[layer])
+            x, y = rnd.uniform(-half_size, half_size), rnd.uniform(-half_size, half_size)
+            actor = Container(
+                {"@type": "CActor"},
+                sName=name,
+                oActorDefLink=f"actordef:{actordef}",
+                vPos=Vec3(x, y, 0.0),
+                vAng=Vec3(0.0, rnd.choice([-90.0, 90.0]), 0.0),
+                pComponents=_layer_components(layer, actordef, rnd),
+            )
+            sublayers.setdefault(sublayer, Container(sName=sublayer, dctActors=Container())).dctActors[name] = actor
+
+            column = min(cameras_per_row - 1, int((x + half_size) / camera_size))
+            row = min(cameras_per_row - 1, int((y + half_size) / camera_size))
+            group = f"eg_{layer[1:-5]}_camera_{row * cameras_per_row + column:03}"
+            groups.setdefault(group, []).append(f"Root:pScenario:{layer}:dctSublayers:{sublayer}:dctActors:{name}")
+
+        layers[layer] = Container(
+            dctSublayers=sublayers,
+            dctActorGroups=Container({group: ListContainer(links) for group, links in groups.items()}),
+        )
+
+    brfld = Container(
+        _version="49.0.2",
+        Root=Container(pScenario=Container(sLevelID="c10_samus", sScenarioID=scenario.value, **layers)),
+    )
+    _write_asset(folder, scenario.scenario_file("brfld"), Brfld(brfld, Game.DREAD).build())
+
+    # navmesh, as loose triangles like the minimap has. indices are 16 bit, so it's split into several geos
+    geos = []
+    for start in range(0, actor_count * NAVMESH_TRIANGLES_PER_ACTOR, NAVMESH_TRIANGLES_PER_GEO):
+        vertices = []
+        for _ in range(min(NAVMESH_TRIANGLES_PER_GEO, actor_count * NAVMESH_TRIANGLES_PER_ACTOR - start)):
+            x, y = rnd.uniform(-half_size, half_size), rnd.uniform(-half_size, half_size)
+            size = rnd.uniform(100.0, 600.0)
+            vertices.extend([Vec3(x, y, 0.0), Vec3(x + size, y, 0.0), Vec3(x, y + size, 0.0)])
+        geos.append(Container(aVertex=ListContainer(vertices), aIndex=ListContainer(range(len(vertices)))))
+    bmmap = Container(
+        _version="1.0.2",
+        Root=Container(
+            gridDef=Container(vGridMin=Vec2(-half_size, -half_size), vGridMax=Vec2(half_size, half_size)),
+            aNavmeshGeos=ListContainer(geos),
+        ),
+    )
+    _write_asset(folder, scenario.scenario_file("bmmap"), Bmmap(bmmap, Game.DREAD).build())
+
+    # one collision camera per cell of a grid over the scenario
+    cameras = []
+    square = [(0.0, 0.0), (camera_size, 0.0), (camera_size, camera_size), (0.0, camera_size)]
+    for i in range(camera_count):
+        row, column = divmod(i, cameras_per_row)
+        x, y = -half_size + column * camera_size, -half_size + row * camera_size
+        cameras.append((f"collision_camera_{i:03}", x, y, [square]))
+    _write_asset(folder, scenario.scenario_file("bmscc"), _poly_collision("default", cameras))
+
+    setups = []
+    for setup in ["Default", "PostXRelease"]:
+        configs = []
+        for i in range(camera_count):
+            # lights, sounds and entities, see ScenarioLoader._parse_scenario
+            items = ["", f"eg_Lights_camera_{i:03}", f"eg_Sounds_camera_{i:03}", ""]
+            items += [f"eg_Entities_camera_{i:03}", "", ""]
+            configs.append(Container(sId=f"collision_camera_{i:03}", asItemsIds=ListContainer(items)))
+        setups.append(Container(sId=setup, vSubareaConfigs=ListContainer(configs)))
+    brsa = Container(_version="2.1.2", Root=Container(pSubareaManager=Container(vSubareaSetups=ListContainer(setups))))
+    _write_asset(folder, scenario.scenario_file("brsa"), Brsa(brsa, Game.DREAD).build())
+
+    _write_manifest(folder, GameVersion.DREAD_2_1_0, scenario, f"synthetic, {actor_count} actors, seed {seed}")
@@ -0,0 +1,352 @@
+"""
+Benchmarks loading a scenario, phase by phase, without a RomFS.
+
+    python tools/benchmark_scenario_load.py run --output before.json
+    python tools/benchmark_scenario_load.py compare before.json after.json
+    python tools/benchmark_scenario_load.py record --romfs path/to/romfs s010_cave recorded/s010_cave
+
+Scenarios are synthetic (see benchmark_assets.generate_scenario) or recorded from a RomFS with the record command and
+passed to run with --recorded. Every phase is timed over several repeats, then run once more under tracemalloc for its
+peak memory on top of what was allocated when it started. The editor runs offscreen, with its appdata in a temporary
+folder.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# the editor's config and caches live in appdata, which has to be set before dreaditor is imported
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="dreaditor-benchmark-")
+atexit.register(shutil.rmtree, os.environ["APPDATA"], ignore_errors=True)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmark_assets import LooseAssetEditor, generate_scenario, record_scenario  # noqa: E402
+from PySide6 import __version__ as PYSIDE_VERSION  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from dreaditor import setup_logging  # noqa: E402
+from dreaditor.actor import Actor  # noqa: E402
+from dreaditor.actor_reference import ActorRef  # noqa: E402
+from dreaditor.asset_cache import SharedAssetCache, SharedScenarioAssets  # noqa: E402
+from dreaditor.constants import Scenario  # noqa: E402
+from dreaditor.scenario_cache import SharedScenarioCache  # noqa: E402
+from dreaditor.scenario_loader import ACTOR_BATCH_SIZE, ScenarioLoader  # noqa: E402
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from dreaditor.main_window import DreaditorWindow
+    from dreaditor.scenario_data import ScenarioData
+
+RESULT_FORMAT_VERSION = 1
+# name -> actor count of the synthetic scenarios. small and medium are about the size of the smallest and largest
+# scenarios in the game, large is a stress test
+SYNTHETIC_CASES = {"small": 300, "medium": 2000, "large": 10000}
+DEFAULT_CASES = ["small", "medium"]
+# actors selected in the actor data tree per repeat
+SELECTED_ACTORS = 500
+OPEN_TIMEOUT = 600.0
+# ratios outside of this range are highlighted by compare
+SIGNIFICANT_CHANGE = 0.1
+
+
+class Benchmark:
+    """Runs the phases of loading one scenario in an editor window, the same way the editor does."""
+
+    def __init__(self, window: DreaditorWindow, editor: LooseAssetEditor):
+        self.window = window
+        self.editor = editor
+        self.scenario = editor.scenario
+        self.rom_manager = window.rom_manager
+        self.rom_manager.editor = editor
+        self.rom_manager.path = str(editor.folder)
+        self.data: ScenarioData | None = None
+        self.actors: list[Actor] = []
+
+    def phases(self) -> list[tuple[str, Callable[[], None]]]:
+        return [
+            ("parse_cold", self.parse_cold),
+            ("parse_cached", self.parse_cached),
+            ("create_actors", self.create_actors),
+            ("show_map", self.show_map),
+            ("add_actors", self.add_actors),
+            ("populate_subareas", self.populate_subareas),
+            ("finish_scenario", self.finish_scenario),
+            ("select_actors", self.select_actors),
+            ("expand_actor_data", self.expand_actor_data),
+            ("open_scenario_cold", self.open_scenario_cold),
+            ("open_scenario_warm", self.open_scenario_warm),
+        ]
+
+    def _loader(self) -> ScenarioLoader:
+        return ScenarioLoader(self.scenario, self.editor, self.editor.folder, None, None)
+
+    def _clear_caches(self):
+        SharedAssetCache.clear()
+        SharedScenarioAssets.clear()
+        SharedScenarioCache.clear()
+
+    def parse_cold(self):
+        self._clear_caches()
+        self._loader().load_data()
+
+    def parse_cached(self):
+        SharedAssetCache.clear()
+        self.data = self._loader().load_data()
+
+    def create_actors(self):
+        data = self.data
+        window = self.window
+        self.actors = [
+            Actor(
+                ActorRef(self.scenario, actor_data.layer, actor_data.sublayer, actor_data.name),
+                actor_data,
+                data.actordefs[actor_data.actordef],
+                window.actor_data_tree,
+                window.scenario_viewer,
+            )
+            for actor_data in data.actors
+        ]
+
+    def show_map(self):
+        window = self.window
+        window.entity_list_tree.on_new_scenario_selected()
+        window.subareas_list_tree.on_new_scenario_selected()
+        window.scenario_viewer.on_new_scenario_selected(self.scenario)
+        window.actor_data_tree.clear()
+        self.rom_manager.reset_scenario(self.scenario)
+        self.rom_manager.show_map(self.data)
+
+    def add_actors(self):
+        for i in range(0, len(self.actors), ACTOR_BATCH_SIZE):
+            self.rom_manager.add_actors(self.actors[i : i + ACTOR_BATCH_SIZE])
+
+    def populate_subareas(self):
+        self.rom_manager.populate_subareas(self.data)
+
+    def finish_scenario(self):
+        self.rom_manager.finish_scenario()
+        QApplication.processEvents()
+
+    def select_actors(self):
+        tree = self.window.actor_data_tree
+        tree.clear()
+        # the first selection parses the brfld for the actor's level data
+        SharedScenarioAssets.clear()
+        for actor in self.actors[:SELECTED_ACTORS]:
+            tree.LoadActor(actor)
+
+    def expand_actor_data(self):
+        tree = self.window.actor_data_tree
+        for i in range(tree.topLevelItemCount()):
+            top = tree.topLevelItem(i)
+            for j in range(top.childCount()):
+                child = top.child(j)
+                if hasattr(child, "populate"):
+                    child.populate()
+
+    def open_scenario_cold(self):
+        self._clear_caches()
+        self._open_scenario()
+
+    def open_scenario_warm(self):
+        self._open_scenario()
+
+    def _open_scenario(self):
+        rm = self.rom_manager
+        self.window.open_region(self.scenario)
+        deadline = time.perf_counter() + OPEN_TIMEOUT
+        while rm.is_loading():
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Opening {self.scenario.name} took more than {OPEN_TIMEOUT}s")
+            QApplication.processEvents()
+            time.sleep(0.001)
+        QApplication.processEvents()
+        if len(rm.actors) != len(self.data.actors):
+            raise RuntimeError(f"Opened {len(rm.actors)} of {len(self.data.actors)} actors")
+
+
+@contextmanager
+def _measure_memory() -> Iterator[dict[str, int]]:
+    res = {}
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    yield res
+    _, peak = tracemalloc.get_traced_memory()
+    res["peak_kib"] = max(0, peak - start) // 1024
+
+
+def run_case(window: DreaditorWindow, editor: LooseAssetEditor, repeat: int, memory: bool) -> dict:
+    benchmark = Benchmark(window, editor)
+    times: dict[str, list[float]] = {name: [] for name, _ in benchmark.phases()}
+    for _ in range(repeat):
+        for name, phase in benchmark.phases():
+            gc.collect()
+            start = time.perf_counter()
+            phase()
+            times[name].append(time.perf_counter() - start)
+
+    peaks = {}
+    if memory:
+        tracemalloc.start()
+        for name, phase in benchmark.phases():
+            gc.collect()
+            with _measure_memory() as res:
+                phase()
+            peaks[name] = res["peak_kib"]
+        tracemalloc.stop()
+
+    return {
+        "actors": len(benchmark.data.actors),
+        "actordefs": len(benchmark.data.actordefs),
+        "phases": {
+            name: {
+                "min": min(runs),
+                "median": statistics.median(runs),
+                "runs": runs,
+                "peak_kib": peaks.get(name),
+            }
+            for name, runs in times.items()
+        },
+    }
+
+
+def _commit() -> str | None:
+    try:
+        res = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return res.stdout.strip()
+
+
+def _print_case(name: str, case: dict):
+    print(f"{name}: {case['actors']} actors, {case['actordefs']} actordefs")
+    for phase, res in case["phases"].items():
+        peak = "" if res["peak_kib"] is None else f"{res['peak_kib']:>10} KiB"
+        print(f"  {phase:<20} {res['min'] * 1000:>10.1f} ms min {res['median'] * 1000:>10.1f} ms median{peak}")
+
+
+def run(args: argparse.Namespace) -> int:
+    from dreaditor.main_window import DreaditorWindow
+
+    setup_logging("WARNING", "WARNING", None)
+    app = QApplication(sys.argv)
+    window = DreaditorWindow()
+    window.resize(1280, 800)
+    window.show()
+
+    folders: dict[str, Path] = {}
+    assets = Path(tempfile.mkdtemp(prefix="assets-", dir=os.environ["APPDATA"]))
+    for name in args.case:
+        folder = assets.joinpath(name)
+        print(f"Generating {name}...", flush=True)
+        generate_scenario(folder, Scenario.ARTARIA, SYNTHETIC_CASES[name], args.seed)
+        folders[name] = folder
+    for folder in args.recorded:
+        folders[f"recorded:{folder.name}"] = folder
+
+    results = {}
+    for name, folder in folders.items():
+        print(f"Running {name}...", flush=True)
+        results[name] = run_case(window, LooseAssetEditor(folder), args.repeat, not args.no_memory)
+        _print_case(name, results[name])
+
+    window.rom_manager.shutdown()
+    window.close()
+    app.processEvents()
+
+    if args.output is not None:
+        output = {
+            "format": RESULT_FORMAT_VERSION,
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "pyside": PYSIDE_VERSION,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "cases": results,
+        }
+        args.output.write_text(json.dumps(output, indent=4))
+        print(f"Wrote {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    base = json.loads(args.base.read_text())
+    new = json.loads(args.new.read_text())
+    print(f"{args.base} ({base['commit']}) -> {args.new} ({new['commit']}), median times")
+
+    for name, new_case in new["cases"].items():
+        base_case = base["cases"].get(name)
+        if base_case is None:
+            continue
+        print(f"{name}: {new_case['actors']} actors")
+        for phase, res in new_case["phases"].items():
+            base_res = base_case["phases"].get(phase)
+            if base_res is None:
+                continue
+            ratio = res["median"] / base_res["median"] if base_res["median"] else float("inf")
+            mark = "" if abs(ratio - 1) < SIGNIFICANT_CHANGE else (" slower" if ratio > 1 else " faster")
+            print(
+                f"  {phase:<20} {base_res['median'] * 1000:>10.1f} ms -> {res['median'] * 1000:>10.1f} ms"
+                f" {ratio:>6.2f}x{mark}"
+            )
+    return 0
+
+
+def record(args: argparse.Namespace) -> int:
+    from dreaditor.render import parse_scenario
+    from dreaditor.rom_manager import open_romfs
+
+    setup_logging("WARNING", "WARNING", None)
+    editor = open_romfs(args.romfs)
+    record_scenario(editor, parse_scenario(args.scenario), args.output)
+    print(f"Recorded {args.scenario} to {args.output}")
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--case", nargs="*", choices=list(SYNTHETIC_CASES), default=DEFAULT_CASES)
+    run_parser.add_argument(
+        "--recorded", action="append", type=Path, default=[], help="Folder of a scenario saved with record"
+    )
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic scenarios")
+    run_parser.add_argument("--no-memory", action="store_true", help="Skip measuring the peak memory of each phase")
+    run_parser.add_argument("--output", type=Path, help="File to write the results to, as json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the results of two runs")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.set_defaults(func=compare)
+
+    record_parser = subparsers.add_parser("record", help="Save the assets of a scenario from a RomFS")
+    record_parser.add_argument("--romfs", type=Path, required=True)
+    record_parser.add_argument("scenario", help="Scenario name (ARTARIA) or id (s010_cave)")
+    record_parser.add_argument("output", type=Path)
+    record_parser.set_defaults(func=record)
+    return parser
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    sys.exit(args.func(args))